@@ -0,0 +1,113 @@
+"""
+Admission control for MCP tool calls.
+
+A global cap on concurrently running tool calls, optional per-tool caps and a
+bounded wait queue. When the queue is full, or a call waits longer than the
+queue timeout, the call is rejected with ToolBusyError right away instead of
+piling more work onto the embedding model and LanceDB.
+"""
+
+import asyncio
+from collections import Counter
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+
+class ToolBusyError(Exception):
+    """Raised when a tool call cannot be admitted because the server is busy."""
+
+
+class ToolLimiter:
+    """Concurrency limits with a bounded queue for async tool handlers."""
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queued: int,
+        queue_timeout: float,
+        per_tool: dict[str, int] | None = None,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.per_tool = dict(per_tool or {})
+        self._running: Counter[str] = Counter()
+        self._queued = 0
+        self._condition: asyncio.Condition | None = None
+
+    @property
+    def running(self) -> int:
+        """Number of tool calls currently admitted."""
+        return sum(self._running.values())
+
+    @property
+    def queued(self) -> int:
+        """Number of tool calls waiting for a slot."""
+        return self._queued
+
+    def _check_queue(self) -> None:
+        if self._queued >= self.max_queued:
+            raise ToolBusyError(
+                f"Server busy: {self.running} calls running and {self._queued} "
+                "queued. Retry shortly."
+            )
+
+    def _can_run(self, tool_name: str) -> bool:
+        if self.running >= self.max_concurrent:
+            return False
+        cap = self.per_tool.get(tool_name)
+        return cap is None or self._running[tool_name] < cap
+
+    @asynccontextmanager
+    async def slot(self, tool_name: str) -> AsyncIterator[None]:
+        """
+        Hold a slot for one call of tool_name for the duration of the block.
+
+        Raises:
+            ToolBusyError: If the queue is full or no slot frees up within
+                queue_timeout seconds.
+        """
+        if self._condition is None:
+            # Created lazily so the condition binds to the server's event loop
+            self._condition = asyncio.Condition()
+        condition = self._condition
+
+        if not self._can_run(tool_name):
+            self._check_queue()
+            self._queued += 1
+            try:
+                async with condition:
+                    await asyncio.wait_for(
+                        condition.wait_for(lambda: self._can_run(tool_name)),
+                        self.queue_timeout,
+                    )
+            except asyncio.TimeoutError:
+                raise ToolBusyError(
+                    f"Server busy: no free slot for {tool_name} within "
+                    f"{self.queue_timeout:g}s. Retry shortly."
+                ) from None
+            finally:
+                self._queued -= 1
+
+        self._running[tool_name] += 1
+        try:
+            yield
+        finally:
+            self._running[tool_name] -= 1
+            async with condition:
+                condition.notify_all()
+
+    @asynccontextmanager
+    async def queued_wait(self) -> AsyncIterator[None]:
+        """
+        Count the block as a queued call, e.g. a call waiting for server warmup.
+
+        Raises:
+            ToolBusyError: If the queue is already full.
+        """
+        self._check_queue()
+        self._queued += 1
+        try:
+            yield
+        finally:
+            self._queued -= 1
@@ -0,0 +1,248 @@
+"""
+Library catalog: one row per (library, version) with chunk and page counts.
+
+The catalog lives in a small LanceDB table next to the documents table and is
+updated whenever a library version is ingested, updated or deleted, so listing
+libraries costs O(libraries) instead of a scan over every chunk.
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, TypedDict
+
+if TYPE_CHECKING:
+    import lancedb
+    import lancedb.table
+    import pyarrow as pa
+
+from openground.sql import library_version_filter
+
+CATALOG_TABLE_SUFFIX = "_catalog"
+
+
+class CatalogEntry(TypedDict):
+    library_name: str
+    version: str
+    chunk_count: int
+    page_count: int
+    source: str
+    updated_at: str
+
+
+def get_catalog_table_name(table_name: str) -> str:
+    """Return the name of the catalog table for a documents table."""
+    return f"{table_name}{CATALOG_TABLE_SUFFIX}"
+
+
+def _connect(db_path: Path) -> "lancedb.DBConnection":
+    import lancedb
+
+    return lancedb.connect(str(db_path))
+
+
+def _catalog_schema():
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            pa.field("library_name", pa.string()),
+            pa.field("version", pa.string()),
+            pa.field("chunk_count", pa.int64()),
+            pa.field("page_count", pa.int64()),
+            pa.field("source", pa.string()),
+            pa.field("updated_at", pa.string()),
+        ]
+    )
+
+
+def _open_catalog(
+    db: "lancedb.DBConnection", table_name: str
+) -> "lancedb.table.Table | None":
+    catalog_name = get_catalog_table_name(table_name)
+    if catalog_name in db.table_names():
+        return db.open_table(catalog_name)
+    return None
+
+
+def _open_or_rebuild_catalog(
+    db_path: Path, table_name: str
+) -> "lancedb.table.Table | None":
+    """
+    Open the catalog, backfilling it first if the database predates it.
+
+    Creating an empty catalog here would make the library being written the
+    only one listed, hiding every other library already in the database.
+    """
+    db = _connect(db_path)
+    catalog = _open_catalog(db, table_name)
+    if catalog is None:
+        rebuild_catalog(db_path, table_name)
+        catalog = _open_catalog(db, table_name)
+    return catalog
+
+
+def count_library_version(
+    table: "lancedb.table.Table", library_name: str, version: str
+) -> tuple[int, int]:
+    """Return (chunk_count, page_count) for a library version in the documents table."""
+    import pyarrow.compute as pc
+
+    filter_str = library_version_filter(library_name, version)
+    chunk_count = table.count_rows(filter=filter_str)
+    if chunk_count == 0:
+        return 0, 0
+    urls = table.search().where(filter_str).select(["url"]).to_arrow()["url"]
+    return chunk_count, pc.count_distinct(urls).as_py()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def refresh_catalog_entry(
+    library_name: str,
+    version: str,
+    db_path: Path,
+    table_name: str,
+    source: str | None = None,
+) -> CatalogEntry | None:
+    """
+    Recount a library version and upsert its catalog row.
+
+    The row is removed if the library version no longer has any chunks.
+
+    Args:
+        library_name: Library name
+        version: Version string
+        db_path: Path to LanceDB storage
+        table_name: Documents table name
+        source: Source URL or path; keeps the previously recorded source if None
+
+    Returns:
+        The new catalog entry, or None if the library version has no chunks.
+    """
+    from openground.query import clear_query_caches
+
+    db = _connect(db_path)
+    if table_name not in db.table_names():
+        return None
+
+    chunk_count, page_count = count_library_version(
+        db.open_table(table_name), library_name, version
+    )
+    catalog = _open_or_rebuild_catalog(db_path, table_name)
+    if catalog is None:
+        return None
+
+    filter_str = library_version_filter(library_name, version)
+    if chunk_count == 0:
+        catalog.delete(filter_str)
+        clear_query_caches()
+        return None
+
+    if source is None:
+        existing = catalog.search().where(filter_str).select(["source"]).to_list()
+        source = existing[0]["source"] if existing else ""
+
+    entry = CatalogEntry(
+        library_name=library_name,
+        version=version,
+        chunk_count=chunk_count,
+        page_count=page_count,
+        source=source,
+        updated_at=_now(),
+    )
+    (
+        catalog.merge_insert(["library_name", "version"])
+        .when_matched_update_all()
+        .when_not_matched_insert_all()
+        .execute([entry])
+    )
+    clear_query_caches()
+    return entry
+
+
+def remove_catalog_entry(
+    library_name: str, version: str, db_path: Path, table_name: str
+) -> None:
+    """Remove a library version from the catalog."""
+    from openground.query import clear_query_caches
+
+    catalog = _open_or_rebuild_catalog(db_path, table_name)
+    if catalog is None:
+        return
+    catalog.delete(library_version_filter(library_name, version))
+    clear_query_caches()
+
+
+def rebuild_catalog(db_path: Path, table_name: str) -> list[CatalogEntry]:
+    """
+    Rebuild the catalog from a full scan of the documents table.
+
+    Used once to backfill databases created before the catalog existed.
+
+    Returns:
+        The rebuilt catalog entries.
+    """
+    import pyarrow as pa
+
+    db = _connect(db_path)
+    if table_name not in db.table_names():
+        return []
+
+    counts = (
+        db.open_table(table_name)
+        .search()
+        .select(["library_name", "version", "url"])
+        .to_arrow()
+        .group_by(["library_name", "version"])
+        .aggregate([("url", "count"), ("url", "count_distinct")])
+    )
+    updated_at = _now()
+    entries = [
+        CatalogEntry(
+            library_name=row["library_name"],
+            version=row["version"],
+            chunk_count=row["url_count"],
+            page_count=row["url_count_distinct"],
+            source="",
+            updated_at=updated_at,
+        )
+        for row in counts.to_pylist()
+        if row["library_name"] is not None and row["version"] is not None
+    ]
+
+    db.create_table(
+        get_catalog_table_name(table_name),
+        data=pa.Table.from_pylist(entries, schema=_catalog_schema()),
+        mode="create",
+        exist_ok=True,
+    )
+    return entries
+
+
+def load_catalog(db_path: Path, table_name: str) -> list[CatalogEntry] | None:
+    """
+    Load all catalog entries.
+
+    Returns:
+        Catalog entries, or None if the database has no catalog yet.
+    """
+    catalog = _open_catalog(_connect(db_path), table_name)
+    if catalog is None:
+        return None
+    return catalog.search().to_arrow().to_pylist()  # type: ignore[return-value]
+
+
+def load_catalog_versions(db_path: Path, table_name: str) -> "pa.Table | None":
+    """
+    Load only the library_name and version columns of the catalog.
+
+    Returns:
+        An Arrow table with one row per library version, or None if the
+        database has no catalog yet.
+    """
+    catalog = _open_catalog(_connect(db_path), table_name)
+    if catalog is None:
+        return None
+    return catalog.search().select(["library_name", "version"]).to_arrow()
@@ -1,9 +1,11 @@
-import asyncio
 import json
 import platform
 import subprocess
 import sys
 import tempfile
+import threading
+import time
+from contextlib import nullcontext
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -21,10 +23,13 @@ from openground.config import (
     get_default_config,
     clear_config_cache,
     DEFAULT_LIBRARY_VERSION,
+    DEFAULT_SERVER_HOST,
+    DEFAULT_SERVER_PORT,
+    DEFAULT_UPDATE_CONCURRENCY,
+    get_server_url,
 )
 from openground.console import success, error, hint, warning
 from openground.extract.source import get_library_config, load_source_file
-from openground.query import library_version_exists, list_libraries_with_versions
 
 
 def is_local_path(source: str) -> bool:
@@ -81,6 +86,17 @@ def is_local_path(source: str) -> bool:
     return False
 
 
+# Serializes embedding and LanceDB writes when libraries are updated in parallel
+_ingest_lock = threading.Lock()
+
+
+def _status(console):
+    """Show a spinner, except off the main thread where Rich allows only one live display."""
+    if threading.current_thread() is not threading.main_thread():
+        return nullcontext()
+    return console.status("[bold green]")
+
+
 app = typer.Typer(
     help="Openground is a CLI for storing and querying documentation in a local vector database.",
     no_args_is_help=True,
@@ -313,6 +329,10 @@ def add(
             )
             raise typer.Exit(1)
 
+    import asyncio
+
+    from openground.extract.common import count_raw_pages
+
     # Extract
     # Determine version for directory path (always a string, defaults to "latest")
     output_dir = get_library_raw_data_dir(library, version=version)
@@ -320,10 +340,12 @@ def add(
     # Check if library version exists in LanceDB BEFORE extraction
     db_path = Path(config["db_path"]).expanduser()
     table_name = config["table_name"]
+    from openground.query import library_version_exists
+
     library_exists = library_version_exists(library, version, db_path, table_name)
 
     # Handle case where library doesn't exist in LanceDB but raw files do
-    if not library_exists and output_dir.exists() and list(output_dir.glob("*.json")):
+    if not library_exists and count_raw_pages(output_dir):
         warning(
             f"Found stale raw data files for '{library}' version '{version}' "
             "that are not in LanceDB. Cleaning up..."
@@ -343,7 +365,7 @@ def add(
     # Step 3: Run the appropriate extraction based on source_type
     async def _run_extract(extract_to_dir: Path):
         if source_type == "sitemap":
-            with console.status("[bold green]"):
+            with _status(console):
                 from openground.extract.sitemap import extract_pages as extract_main
 
             await extract_main(
@@ -356,7 +378,7 @@ def add(
                 trim_query_params=trim_query_params,
             )
         elif source_type == "git_repo":
-            with console.status("[bold green]"):
+            with _status(console):
                 from openground.extract.git import extract_repo
 
             await extract_repo(
@@ -367,7 +389,7 @@ def add(
                 version=version,
             )
         elif source_type == "local_path":
-            with console.status("[bold green]"):
+            with _status(console):
                 from openground.extract.local_path import extract_local_path
 
             await extract_local_path(
@@ -377,7 +399,7 @@ def add(
                 version=version,
             )
 
-    with console.status("[bold green]"):
+    with _status(console):
         from openground.ingest import ingest_to_lancedb, load_parsed_pages
 
     # For existing libraries, extract to temp directory for comparison
@@ -393,7 +415,7 @@ def add(
                     f"Extraction completed but temp directory not found at {temp_extract_dir}."
                 )
 
-            page_count = len(list(temp_extract_dir.glob("*.json")))
+            page_count = count_raw_pages(temp_extract_dir)
             success(f"\nExtraction complete: {page_count} pages extracted")
 
             from openground.update import perform_update
@@ -402,14 +424,16 @@ def add(
             pages = load_parsed_pages(temp_extract_dir)
 
             try:
-                summary = perform_update(
-                    extracted_pages=pages,
-                    library_name=library,
-                    version=version,
-                    db_path=db_path,
-                    table_name=table_name,
-                    raw_data_dir=output_dir,  # Permanent directory with existing files
-                )
+                with _ingest_lock:
+                    summary = perform_update(
+                        extracted_pages=pages,
+                        library_name=library,
+                        version=version,
+                        db_path=db_path,
+                        table_name=table_name,
+                        raw_data_dir=output_dir,  # Permanent directory with existing files
+                        source=final_source,
+                    )
 
                 print("\nUpdate Summary:")
                 print(f"  Added: {summary['added']} pages")
@@ -438,7 +462,7 @@ def add(
             f"Extraction completed but data directory not found at {output_dir}."
         )
 
-    page_count = len(list(output_dir.glob("*.json")))
+    page_count = count_raw_pages(output_dir)
     success(f"\nExtraction complete: {page_count} pages extracted to {output_dir}")
 
     if not yes:
@@ -450,7 +474,8 @@ def add(
             raise typer.Abort()
 
     pages = load_parsed_pages(output_dir)
-    ingest_to_lancedb(pages=pages)
+    with _ingest_lock:
+        ingest_to_lancedb(pages=pages, source=final_source)
     success(f"Embedding complete: Library {library} ({version}) added to LanceDB.")
 
     # Auto-add to local sources.json if configured and source was provided manually
@@ -479,13 +504,37 @@ def add(
         )
 
 
-def _update_all_libraries() -> None:
+def _update_library_version(library_name: str, version: str) -> float:
+    """Update one library version from its configured source. Returns elapsed seconds."""
+    start_time = time.perf_counter()
+    add(
+        library=library_name,
+        source=None,  # Use configured source
+        version=version,
+        docs_paths=[],
+        filter_keywords=[],
+        yes=True,  # Skip prompts
+        sources_file=None,
+        trim_query_params=False,
+    )
+    return time.perf_counter() - start_time
+
+
+def _update_all_libraries(jobs: int | None = None) -> None:
     """
     Update all libraries that have sources configured.
 
     Updates all versions of each library and displays a consolidated summary.
-    Continues on error if one library update fails.
+    Up to `jobs` extractions run concurrently; embedding and LanceDB writes
+    share one model and are serialized. Continues on error if one library
+    update fails.
+
+    Args:
+        jobs: Number of library versions to update concurrently. Defaults to
+            extraction.update_concurrency from config.
     """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
     # Load sources configuration
     sources = load_source_file()
 
@@ -497,6 +546,8 @@ def _update_all_libraries() -> None:
     config = get_effective_config()
     db_path = Path(config["db_path"]).expanduser()
     table_name = config["table_name"]
+    from openground.query import list_libraries_with_versions
+
     all_libraries = list_libraries_with_versions(db_path, table_name)
 
     if not all_libraries:
@@ -504,59 +555,93 @@ def _update_all_libraries() -> None:
         return
 
     # Filter to only libraries that have sources configured
-    libraries_to_update = {name: versions for name, versions in all_libraries.items() if name in sources}
+    libraries_to_update = {
+        name: versions for name, versions in all_libraries.items() if name in sources
+    }
 
     if not libraries_to_update:
         warning("No libraries with configured sources found in database.")
         return
 
+    if jobs is None:
+        jobs = config["extraction"].get(
+            "update_concurrency", DEFAULT_UPDATE_CONCURRENCY
+        )
+
+    # Load heavy modules once up front instead of racing imports in worker threads
+    from openground import ingest, update  # noqa: F401
+
     # Track results
-    total_versions = sum(len(versions) for versions in libraries_to_update.values())
-    successful_count = 0
+    pending = [
+        (library_name, version)
+        for library_name, versions in libraries_to_update.items()
+        for version in versions
+    ]
+    total_versions = len(pending)
+    timings: dict[tuple[str, str], float] = {}
     failures: list[tuple[str, str, str]] = []  # (library, version, error_message)
 
-    # Update each library and each version
-    for library_name, versions in libraries_to_update.items():
-        for version in versions:
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        futures = {
+            executor.submit(_update_library_version, library_name, version): (
+                library_name,
+                version,
+            )
+            for library_name, version in pending
+        }
+        for future in as_completed(futures):
+            library_name, version = futures[future]
             try:
-                add(
-                    library=library_name,
-                    source=None,  # Use configured source
-                    version=version,
-                    docs_paths=[],
-                    filter_keywords=[],
-                    yes=True,  # Skip prompts
-                    sources_file=None,
-                    trim_query_params=False,
-                )
-                successful_count += 1
+                timings[(library_name, version)] = future.result()
             except Exception as e:
                 error_msg = str(e)
                 failures.append((library_name, version, error_msg))
+    total_elapsed = time.perf_counter() - start_time
 
     # Display consolidated summary
     print()
     success("Update Summary for All Libraries:")
-    print(f"  Processed: {total_versions} library versions across {len(libraries_to_update)} libraries")
-    print(f"  Successful: {successful_count}")
+    print(
+        f"  Processed: {total_versions} library versions across {len(libraries_to_update)} libraries"
+    )
+    print(f"  Successful: {len(timings)}")
     print(f"  Failed: {len(failures)}")
+    print(f"  Total time: {total_elapsed:.1f}s ({jobs} concurrent)")
+
+    if timings:
+        print()
+        print("Timings:")
+        for (lib_name, version), elapsed in sorted(timings.items()):
+            print(f"  - {lib_name} (v{version}): {elapsed:.1f}s")
 
     if failures:
         print()
         error("Failures:")
-        for lib_name, version, err_msg in failures:
+        for lib_name, version, err_msg in sorted(failures):
             print(f"  - {lib_name} (v{version}): {err_msg}")
 
 
 @app.command("update")
 def update_library(
-    library: Optional[str] = typer.Argument(None, help="Name of the library to update."),
+    library: Optional[str] = typer.Argument(
+        None, help="Name of the library to update."
+    ),
     version: str = typer.Option("latest", "--version", "-v", help="Version to update."),
     source: Optional[str] = typer.Option(
         None, "--source", "-s", help="Override source URL."
     ),
     yes: bool = typer.Option(False, "--yes", "-y", help="Skip prompts."),
-    all_libraries: bool = typer.Option(False, "--all", help="Update all libraries with sources."),
+    all_libraries: bool = typer.Option(
+        False, "--all", help="Update all libraries with sources."
+    ),
+    jobs: int | None = typer.Option(
+        None,
+        "--jobs",
+        "-j",
+        help="Number of libraries to extract concurrently with --all. Defaults to extraction.update_concurrency.",
+        min=1,
+    ),
 ):
     """
     Update an existing library with changes from the source.
@@ -572,7 +657,7 @@ def update_library(
         if version != "latest":
             error("--all cannot be used with --version")
             raise typer.Exit(1)
-        _update_all_libraries()
+        _update_all_libraries(jobs=jobs)
         return
 
     # Require library argument if not using --all
@@ -624,6 +709,8 @@ def extract_sitemap(
 ):
     """Run the extraction pipeline to fetch and parse pages from a sitemap."""
 
+    import asyncio
+
     from openground.extract.sitemap import extract_pages
 
     config = get_effective_config()
@@ -674,6 +761,8 @@ def extract_git(
     ),
 ):
     """Extract documentation from a git repository using shallow clone and sparse checkout."""
+    import asyncio
+
     from openground.extract.git import extract_repo
 
     output_dir = get_library_raw_data_dir(library, version=version)
@@ -730,18 +819,64 @@ def query_cmd(
     version: str = typer.Option(
         DEFAULT_LIBRARY_VERSION, "--version", "-v", help="Version to filter results by."
     ),
-    library: Optional[str] = typer.Option(
+    library: list[str] | None = typer.Option(
         None,
         "--library",
         "-l",
-        help="Optional library name filter.",
+        help="Optional library name filter. Repeat it, or use name@version, to search "
+        "several libraries at once (latest version unless given).",
+    ),
+    all_libraries: bool = typer.Option(
+        False,
+        "--all-libraries",
+        help="Search the latest version of every library.",
     ),
     top_k: int | None = typer.Option(
         None, "--top-k", "-k", help="Number of results to return."
     ),
+    mode: str | None = typer.Option(
+        None,
+        "--mode",
+        "-m",
+        help="Retrieval mode: hybrid, vector, fts or auto. Defaults to query.mode.",
+    ),
+    max_chars: int | None = typer.Option(
+        None,
+        "--max-chars",
+        help="Maximum characters of output (0 = unlimited). Defaults to query.max_chars.",
+    ),
+    output_format: str | None = typer.Option(
+        None,
+        "--format",
+        "-f",
+        help="Output format: full or compact. Defaults to query.output_format.",
+    ),
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        help="Print per-stage timings to stderr and record them in `openground stats`.",
+    ),
 ):
     """Run a hybrid search (semantic + BM25) against the local db."""
-    from openground.query import search
+    from openground.query import (
+        OUTPUT_FORMATS,
+        SEARCH_MODES,
+        STAGE_NAMES,
+        list_libraries_with_versions,
+        resolve_libraries,
+        search,
+    )
+
+    if mode is not None and mode not in SEARCH_MODES:
+        error(
+            f"Error: Invalid mode '{mode}'. Must be one of: {', '.join(SEARCH_MODES)}."
+        )
+        raise typer.Exit(1)
+    if output_format is not None and output_format not in OUTPUT_FORMATS:
+        error(
+            f"Error: Invalid format '{output_format}'. Must be one of: {', '.join(OUTPUT_FORMATS)}."
+        )
+        raise typer.Exit(1)
 
     # Get config
     config = get_effective_config()
@@ -757,16 +892,60 @@ def query_cmd(
     # Ensure top_k is an int for the type checker
     k: int = top_k  # type: ignore
 
+    # Several libraries (or name@version) make this a multi-library search
+    library_specs = library or []
+    libraries = None
+    library_name = None
+    if (
+        all_libraries
+        or len(library_specs) > 1
+        or any("@" in entry for entry in library_specs)
+    ):
+        requested = None
+        if not all_libraries:
+            requested = []
+            for entry in library_specs:
+                name, _, lib_version = entry.partition("@")
+                requested.append((name, lib_version or None))
+        try:
+            libraries = resolve_libraries(
+                requested,
+                list_libraries_with_versions(db_path=db_path, table_name=table_name),
+            )
+        except ValueError as e:
+            error(f"Error: {e}")
+            raise typer.Exit(1)
+    elif library_specs:
+        library_name = library_specs[0]
+
+    timings: dict[str, float] | None = {} if profile else None
     results_md = search(
         query=query,
         version=version,
         db_path=db_path,
         table_name=table_name,
-        library_name=library,
+        library_name=library_name,
         top_k=k,
+        mode=mode,
+        max_chars=max_chars,
+        output_format=output_format,
+        timings=timings,
+        libraries=libraries,
+        split_hybrid=profile,
     )
     print(results_md)
 
+    if timings is not None:
+        from openground.stats import record_query_timings
+
+        record_query_timings(timings)
+        print("\nProfile (ms):", file=sys.stderr)
+        if "cache" in timings and "format" not in timings:
+            print("  (served from the result cache)", file=sys.stderr)
+        for stage in STAGE_NAMES:
+            if stage in timings:
+                print(f"  {stage:<12}{timings[stage]:>10.1f}", file=sys.stderr)
+
 
 @app.command("list-libraries")
 @app.command("ls")
@@ -807,6 +986,8 @@ def list_libraries_cmd():
 @app.command("list-raw-libraries")
 def list_raw_libraries_cmd():
     """List available libraries in the raw_data directory."""
+    from openground.extract.common import count_raw_pages, get_raw_data_format
+
     config = get_effective_config()
     raw_data_dir = Path(config["raw_data_dir"]).expanduser()
     if not raw_data_dir.exists():
@@ -817,9 +998,13 @@ def list_raw_libraries_cmd():
     for lib_dir in raw_data_dir.iterdir():
         if lib_dir.is_dir():
             lib_name = lib_dir.name
-            versions = [d.name for d in lib_dir.iterdir() if d.is_dir()]
+            versions = [
+                f"{d.name} ({count_raw_pages(d)} pages, {get_raw_data_format(d)})"
+                for d in sorted(lib_dir.iterdir())
+                if d.is_dir()
+            ]
             if versions:
-                libraries_with_versions[lib_name] = sorted(versions)
+                libraries_with_versions[lib_name] = versions
 
     if not libraries_with_versions:
         print("No libraries found in raw_data.")
@@ -886,8 +1071,12 @@ def remove_library_cmd(
                 success(f"Deleted raw library files at {raw_library_dir}.")
 
 
-def _install_to_claude_code() -> None:
-    """Install openground to Claude Code using the claude CLI."""
+def _install_to_claude_code(url: str | None = None) -> None:
+    """Install openground to Claude Code using the claude CLI.
+
+    Args:
+        url: URL of a shared HTTP server to register instead of the command.
+    """
     try:
         # First, remove any existing openground MCP config to ensure clean install
         print("Removing existing openground MCP config if it exists...")
@@ -906,18 +1095,31 @@ def _install_to_claude_code() -> None:
         )
 
         # Build the command - uses the openground-mcp entry point
-        cmd = [
-            "claude",
-            "mcp",
-            "add",
-            "--transport",
-            "stdio",
-            "--scope",
-            "user",
-            "openground",
-            "--",
-            "openground-mcp",
-        ]
+        if url:
+            cmd = [
+                "claude",
+                "mcp",
+                "add",
+                "--transport",
+                "http",
+                "--scope",
+                "user",
+                "openground",
+                url,
+            ]
+        else:
+            cmd = [
+                "claude",
+                "mcp",
+                "add",
+                "--transport",
+                "stdio",
+                "--scope",
+                "user",
+                "openground",
+                "--",
+                "openground-mcp",
+            ]
 
         result = subprocess.run(
             cmd,
@@ -984,8 +1186,12 @@ def _find_openground_mcp_command() -> str:
     return "openground-mcp"
 
 
-def _install_to_cursor() -> None:
-    """Safely install openground to Cursor's MCP configuration."""
+def _install_to_cursor(url: str | None = None) -> None:
+    """Safely install openground to Cursor's MCP configuration.
+
+    Args:
+        url: URL of a shared HTTP server to register instead of the command.
+    """
     config_path = _get_cursor_config_path()
 
     # Create parent directory if it doesn't exist
@@ -1030,10 +1236,13 @@ def _install_to_cursor() -> None:
             print("Proceeding without backup...")
 
     # Build new config - uses the openground-mcp entry point
-    mcp_command = _find_openground_mcp_command()
-    new_server_config = {
-        "command": mcp_command,
-    }
+    if url:
+        new_server_config = {"url": url}
+    else:
+        mcp_command = _find_openground_mcp_command()
+        new_server_config = {
+            "command": mcp_command,
+        }
 
     # Merge into existing config
     existing_config["mcpServers"]["openground"] = new_server_config
@@ -1082,8 +1291,12 @@ def _install_to_cursor() -> None:
         sys.exit(1)
 
 
-def _install_to_opencode() -> None:
-    """Safely install openground to OpenCode's MCP configuration."""
+def _install_to_opencode(url: str | None = None) -> None:
+    """Safely install openground to OpenCode's MCP configuration.
+
+    Args:
+        url: URL of a shared HTTP server to register instead of the command.
+    """
     config_path = _get_opencode_config_path()
 
     # Create parent directory if it doesn't exist
@@ -1128,12 +1341,15 @@ def _install_to_opencode() -> None:
             print("Proceeding without backup...")
 
     # Build new config - uses the openground-mcp entry point
-    mcp_command = _find_openground_mcp_command()
-    new_server_config = {
-        "type": "local",
-        "command": [mcp_command],
-        "enabled": True,
-    }
+    if url:
+        new_server_config = {"type": "remote", "url": url, "enabled": True}
+    else:
+        mcp_command = _find_openground_mcp_command()
+        new_server_config = {
+            "type": "local",
+            "command": [mcp_command],
+            "enabled": True,
+        }
 
     # Merge into existing config
     existing_config["mcp"]["openground"] = new_server_config
@@ -1204,17 +1420,39 @@ def install_cmd(
         "--wsl",
         help="Generate WSL-compatible configuration (uses wsl.exe wrapper).",
     ),
+    url: str | None = typer.Option(
+        None,
+        "--url",
+        help="Register a shared HTTP server (`openground-mcp --transport http`) at this URL instead of the command.",
+    ),
+    http: bool = typer.Option(
+        False,
+        "--http",
+        help="Like --url, with the URL built from server.host and server.port.",
+    ),
 ):
     """Generate MCP server configuration JSON for agents."""
+    if http and not url:
+        server_config = get_effective_config()["server"]
+        url = get_server_url(server_config["host"], server_config["port"])
+    if url and not url.startswith(("http://", "https://")):
+        error(
+            f"Error: Invalid URL '{url}'. Hint: use the address printed by "
+            f"`openground-mcp --transport http`, e.g. {get_server_url(DEFAULT_SERVER_HOST, DEFAULT_SERVER_PORT)}"
+        )
+        raise typer.Exit(1)
+
     if claude_code:
-        _install_to_claude_code()
+        _install_to_claude_code(url)
     elif cursor:
-        _install_to_cursor()
+        _install_to_cursor(url)
     elif opencode:
-        _install_to_opencode()
+        _install_to_opencode(url)
     else:
         # Default behavior: show JSON configuration
-        if wsl:
+        if url:
+            config = {"mcpServers": {"openground": {"url": url}}}
+        elif wsl:
             # For WSL, use wsl.exe wrapper to call the entry point
             config = {
                 "mcpServers": {
@@ -1318,6 +1556,60 @@ def config_set(
             )
             raise typer.Exit(1)
 
+    if key == "extraction.raw_data_format":
+        from openground.extract.common import RAW_DATA_FORMATS
+
+        if parsed_value not in RAW_DATA_FORMATS:
+            error(
+                f"Error: Invalid value for 'extraction.raw_data_format': '{parsed_value}'. Must be one of: {', '.join(RAW_DATA_FORMATS)}."
+            )
+            raise typer.Exit(1)
+
+    if key == "query.mode":
+        from openground.query import SEARCH_MODES
+
+        if parsed_value not in SEARCH_MODES:
+            error(
+                f"Error: Invalid value for 'query.mode': '{parsed_value}'. Must be one of: {', '.join(SEARCH_MODES)}."
+            )
+            raise typer.Exit(1)
+
+    if key == "query.output_format":
+        from openground.query import OUTPUT_FORMATS
+
+        if parsed_value not in OUTPUT_FORMATS:
+            error(
+                f"Error: Invalid value for 'query.output_format': '{parsed_value}'. Must be one of: {', '.join(OUTPUT_FORMATS)}."
+            )
+            raise typer.Exit(1)
+
+    if key == "query.fusion":
+        from openground.query import FUSION_METHODS
+
+        if parsed_value not in FUSION_METHODS:
+            error(
+                f"Error: Invalid value for 'query.fusion': '{parsed_value}'. Must be one of: {', '.join(FUSION_METHODS)}."
+            )
+            raise typer.Exit(1)
+
+    if key == "server.watch_poll_seconds" and (
+        not isinstance(parsed_value, (int, float)) or parsed_value <= 0
+    ):
+        error(
+            "Error: 'server.watch_poll_seconds' must be a positive number of seconds."
+        )
+        raise typer.Exit(1)
+
+    if key == "server.warmup_libraries" and not (
+        isinstance(parsed_value, list)
+        and all(isinstance(item, str) for item in parsed_value)
+    ):
+        error(
+            "Error: 'server.warmup_libraries' must be a JSON list of library names, "
+            'optionally with a version, e.g. \'["fastapi", "pydantic@v2"]\'.'
+        )
+        raise typer.Exit(1)
+
     # Navigate to the right place in the config (supports arbitrary depth).
     if not parts or any(not p for p in parts):
         error(f"Error: Invalid key format '{key}'.")
@@ -1586,6 +1878,35 @@ def stats_show():
         count = stats["tool_calls"][tool_name]
         print(f"  {tool_name}: {count}")
 
+    if stats["query_timings"]:
+        from openground.query import STAGE_NAMES
+
+        print("\nQuery stage timings (ms):")
+        print(f"  {'stage':<12}{'count':>8}{'avg':>10}{'max':>10}")
+        for stage in STAGE_NAMES:
+            entry = stats["query_timings"].get(stage)
+            if not entry or not entry["count"]:
+                continue
+            avg = entry["total_ms"] / entry["count"]
+            print(
+                f"  {stage:<12}{entry['count']:>8}{avg:>10.1f}{entry['max_ms']:>10.1f}"
+            )
+
+    if stats["tool_metrics"]:
+        from openground.stats import summarize_tool_metrics
+
+        print("\nTool latency (ms) and result size (chars):")
+        print(
+            f"  {'tool':<30}{'calls':>7}{'errors':>8}{'p50':>9}{'p95':>9}{'p99':>9}"
+            f"{'avg size':>10}"
+        )
+        for tool_name, row in summarize_tool_metrics(stats["tool_metrics"]).items():
+            print(
+                f"  {tool_name:<30}{row['calls']:>7}{row['errors']:>8}"
+                f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+                f"{row['avg_result_chars']:>10}"
+            )
+
 
 @stats_app.command("reset")
 def stats_reset(
@@ -28,6 +28,10 @@ DEFAULT_LIBRARY_NAME = "openground_docs"
 # Extraction defaults
 SITEMAP_URL = "https://docs.openground.ai/sitemap.xml"
 CONCURRENCY_LIMIT = 50
+# Library versions extracted concurrently by `openground update --all`
+DEFAULT_UPDATE_CONCURRENCY = 4
+# "json" (one file per page) or "parquet" (one compressed file per library version)
+DEFAULT_RAW_DATA_FORMAT = "json"
 
 
 DEFAULT_RAW_DATA_DIR_BASE = get_data_home() / "raw_data"
@@ -67,6 +71,47 @@ DEFAULT_CHUNK_SIZE = 800
 DEFAULT_CHUNK_OVERLAP = 200
 # Default values for query parameters
 DEFAULT_TOP_K = 5
+# Search result cache (entries; 0 disables) and entry lifetime
+DEFAULT_QUERY_CACHE_SIZE = 256
+DEFAULT_QUERY_CACHE_TTL_SECONDS = 900
+# hybrid, vector, fts or auto (identifier-like queries use fts, others hybrid)
+DEFAULT_QUERY_MODE = "hybrid"
+# Hybrid fusion: rrf (reciprocal rank) or linear (weighted vector/BM25 scores)
+DEFAULT_QUERY_FUSION = "rrf"
+# Vector weight for linear fusion; BM25 gets 1 - weight
+DEFAULT_LINEAR_WEIGHT = 0.7
+# Upper bound on characters per search response (0 = unlimited)
+DEFAULT_QUERY_MAX_CHARS = 12000
+# "full" (chunk text + tool hint per hit) or "compact" (short snippets)
+DEFAULT_OUTPUT_FORMAT = "full"
+
+# Default values for MCP server parameters
+# Table files read into the OS page cache at startup, in megabytes
+DEFAULT_WARMUP_PREFETCH_MB = 256
+# How long a search waits for startup warmup before running anyway
+DEFAULT_WARMUP_WAIT_SECONDS = 30
+DEFAULT_SERVER_HOST = "127.0.0.1"
+DEFAULT_SERVER_PORT = 8765
+# Path of the streamable-HTTP endpoint
+DEFAULT_SERVER_HTTP_PATH = "/mcp"
+# Concurrent HTTP connections before new ones get a 503
+DEFAULT_SERVER_MAX_CONNECTIONS = 64
+# Tool calls run at once; further calls wait in a bounded queue
+DEFAULT_MAX_CONCURRENT_TOOLS = 8
+DEFAULT_MAX_QUEUED_TOOLS = 32
+# Seconds a queued call waits for a slot before it is rejected as busy
+DEFAULT_TOOL_QUEUE_TIMEOUT_SECONDS = 10
+# Per-tool caps on concurrent calls, below the global limit
+DEFAULT_TOOL_CONCURRENCY = {"search_documents_batch_tool": 2}
+# Threads for blocking work (embedding, catalog reads) in tool handlers
+DEFAULT_SERVER_WORKER_THREADS = 4
+# Seconds between checks of db_path when watchfiles is not installed
+DEFAULT_DB_WATCH_POLL_SECONDS = 2.0
+
+
+def get_server_url(host: str, port: int) -> str:
+    """Return the streamable-HTTP URL of an openground server."""
+    return f"http://{host}:{port}{DEFAULT_SERVER_HTTP_PATH}"
 
 
 def get_config_path() -> Path:
@@ -149,6 +194,8 @@ def get_default_config() -> dict[str, Any]:
         "raw_data_dir": str(DEFAULT_RAW_DATA_DIR_BASE),
         "extraction": {
             "concurrency_limit": CONCURRENCY_LIMIT,
+            "raw_data_format": DEFAULT_RAW_DATA_FORMAT,
+            "update_concurrency": DEFAULT_UPDATE_CONCURRENCY,
         },
         "embeddings": {
             "batch_size": DEFAULT_BATCH_SIZE,
@@ -160,10 +207,36 @@ def get_default_config() -> dict[str, Any]:
         },
         "query": {
             "top_k": DEFAULT_TOP_K,
+            "mode": DEFAULT_QUERY_MODE,
+            "fusion": DEFAULT_QUERY_FUSION,
+            "linear_weight": DEFAULT_LINEAR_WEIGHT,
+            "max_chars": DEFAULT_QUERY_MAX_CHARS,
+            "output_format": DEFAULT_OUTPUT_FORMAT,
+            "cache_size": DEFAULT_QUERY_CACHE_SIZE,
+            "cache_ttl_seconds": DEFAULT_QUERY_CACHE_TTL_SECONDS,
+            "cache_persist": False,
         },
         "sources": {
             "auto_add_local": True,
         },
+        "server": {
+            "warmup": True,
+            "warmup_libraries": [],
+            "warmup_prefetch_mb": DEFAULT_WARMUP_PREFETCH_MB,
+            "warmup_wait_seconds": DEFAULT_WARMUP_WAIT_SECONDS,
+            "host": DEFAULT_SERVER_HOST,
+            "port": DEFAULT_SERVER_PORT,
+            "max_connections": DEFAULT_SERVER_MAX_CONNECTIONS,
+            "max_concurrent_tools": DEFAULT_MAX_CONCURRENT_TOOLS,
+            "max_queued_tools": DEFAULT_MAX_QUEUED_TOOLS,
+            "queue_timeout_seconds": DEFAULT_TOOL_QUEUE_TIMEOUT_SECONDS,
+            "tool_concurrency": dict(DEFAULT_TOOL_CONCURRENCY),
+            "worker_threads": DEFAULT_SERVER_WORKER_THREADS,
+            "metrics_endpoint": True,
+            "watch_db": True,
+            "watch_poll_seconds": DEFAULT_DB_WATCH_POLL_SECONDS,
+            "profile_hybrid": False,
+        },
     }
 
 
@@ -206,6 +279,13 @@ def _merge_with_defaults(user_config: dict[str, Any]) -> dict[str, Any]:
             )
         merged["sources"].update(user_config["sources"])
 
+    if "server" in user_config:
+        if not isinstance(user_config["server"], dict):
+            raise ValueError(
+                "Config key 'server' must be an object. Hint: If you need to reset the default config, run `openground config reset`."
+            )
+        merged["server"].update(user_config["server"])
+
     return merged
 
 
@@ -4,6 +4,7 @@ import sys
 from collections.abc import Iterable
 from functools import lru_cache
 from importlib.metadata import PackageNotFoundError, version
+from typing import Any
 
 from tqdm import tqdm
 
@@ -204,6 +205,27 @@ def _generate_embeddings_fastembed(
     return all_embeddings
 
 
+def load_embedding_model() -> Any:
+    """Load (or fetch from cache) the model for the configured backend.
+
+    Returns:
+        The fastembed or sentence-transformers model instance.
+    """
+    config = get_effective_config()
+    backend = config["embeddings"]["embedding_backend"]
+    model_name = config["embeddings"]["embedding_model"]
+
+    if backend == "fastembed":
+        return get_fastembed_model(model_name)
+    elif backend == "sentence-transformers":
+        return get_st_model(model_name)
+    else:
+        raise ValueError(
+            f"Invalid embedding backend: {backend}. Must be 'sentence-transformers' "
+            "or 'fastembed'."
+        )
+
+
 def generate_embeddings(
     texts: Iterable[str],
     show_progress: bool = True,
@@ -1,12 +1,21 @@
-from typing import TypedDict, Callable
-from pathlib import Path
-import shutil
+import asyncio
 import json
 import os
-import asyncio
+import shutil
+from collections.abc import Callable, Iterable, Iterator
+from itertools import chain
+from pathlib import Path
+from typing import Any, TypedDict
 from urllib.parse import urlparse
-from tqdm import tqdm
+
 import nbformat
+from tqdm import tqdm
+
+from openground.config import DEFAULT_RAW_DATA_FORMAT, get_effective_config
+
+# Single columnar file holding every page of a library version
+PARQUET_PAGES_FILE = "pages.parquet"
+RAW_DATA_FORMATS = ("json", "parquet")
 
 
 class ParsedPage(TypedDict):
@@ -19,6 +28,134 @@ class ParsedPage(TypedDict):
     content: str
 
 
+def get_json_loads() -> Callable[[bytes], Any]:
+    """Return orjson.loads if the optional orjson package is installed, else json.loads."""
+    try:
+        import orjson
+    except ImportError:
+        return json.loads
+    return orjson.loads
+
+
+def iter_raw_pages(directory: Path, skip_invalid: bool = False) -> Iterator[ParsedPage]:
+    """
+    Lazily yield parsed pages from a raw data directory.
+
+    Reads the Parquet pages file (memory-mapped, batch by batch) if present,
+    otherwise the per-page JSON files.
+
+    Args:
+        directory: Raw data directory for a library/version
+        skip_invalid: Skip files that are not valid JSON instead of raising
+
+    Yields:
+        Parsed pages, one file at a time, in filename order.
+    """
+    if get_raw_data_format(directory) == "parquet":
+        yield from _iter_parquet_pages(directory / PARQUET_PAGES_FILE)
+        return
+
+    loads = get_json_loads()
+    for path in sorted(directory.glob("*.json")):
+        try:
+            raw = loads(path.read_bytes())
+        except json.JSONDecodeError:
+            if skip_invalid:
+                continue
+            raise
+
+        yield ParsedPage(
+            url=raw.get("url", ""),
+            library_name=raw.get("library_name", ""),
+            version=raw.get("version", "latest"),
+            title=raw.get("title"),
+            description=raw.get("description"),
+            last_modified=raw.get("last_modified"),
+            content=raw.get("content", ""),
+        )
+
+
+def get_raw_data_format(directory: Path) -> str:
+    """Return the raw data format ("json" or "parquet") stored in a directory."""
+    if (directory / PARQUET_PAGES_FILE).exists():
+        return "parquet"
+    return "json"
+
+
+def get_configured_raw_data_format() -> str:
+    """Return the raw data format new extractions are written in."""
+    raw_data_format = get_effective_config()["extraction"].get(
+        "raw_data_format", DEFAULT_RAW_DATA_FORMAT
+    )
+    if raw_data_format not in RAW_DATA_FORMATS:
+        raise ValueError(
+            f"Invalid raw data format: {raw_data_format}. Must be one of "
+            f"{', '.join(RAW_DATA_FORMATS)}. Hint: run "
+            "`openground config set extraction.raw_data_format json`."
+        )
+    return raw_data_format
+
+
+def count_raw_pages(directory: Path) -> int:
+    """Count the pages stored in a raw data directory without loading them."""
+    if not directory.exists():
+        return 0
+    if get_raw_data_format(directory) == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(directory / PARQUET_PAGES_FILE).metadata.num_rows
+    return sum(1 for _ in directory.glob("*.json"))
+
+
+def _page_schema():
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            pa.field("url", pa.string()),
+            pa.field("library_name", pa.string()),
+            pa.field("version", pa.string()),
+            pa.field("title", pa.string()),
+            pa.field("description", pa.string()),
+            pa.field("last_modified", pa.string()),
+            pa.field("content", pa.string()),
+        ]
+    )
+
+
+def _iter_parquet_pages(path: Path) -> Iterator[ParsedPage]:
+    import pyarrow.parquet as pq
+
+    with pq.ParquetFile(path, memory_map=True) as parquet_file:
+        for batch in parquet_file.iter_batches(batch_size=256):
+            for row in batch.to_pylist():
+                yield ParsedPage(**row)
+
+
+def _write_parquet_pages(path: Path, pages: Iterable[ParsedPage]) -> None:
+    """Write pages to a zstd-compressed Parquet file, keeping the last page per URL."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    pages_by_url = {page["url"]: page for page in pages}
+    table = pa.Table.from_pylist(list(pages_by_url.values()), schema=_page_schema())
+
+    tmp_path = path.with_suffix(".tmp")
+    pq.write_table(table, tmp_path, compression="zstd")
+    tmp_path.replace(path)
+
+
+def _json_page_path(directory: Path, url: str) -> Path:
+    slug = urlparse(url).path.strip("/").replace("/", "-") or "home"
+    return directory / f"{slug}.json"
+
+
+def _write_json_pages(directory: Path, pages: Iterable[ParsedPage], desc: str) -> None:
+    for page in tqdm(pages, desc=desc, unit="file"):
+        with open(_json_page_path(directory, page["url"]), "w", encoding="utf-8") as f:
+            json.dump(page, f, indent=2)
+
+
 def filter_documentation_files(
     docs_dir: Path, allowed_extensions: set[str] | None = None
 ) -> list[Path]:
@@ -231,10 +368,14 @@ async def save_results(results: list[ParsedPage], output_dir: Path):
     """
     Save the results to a file.
 
+    Writes one JSON file per page, or a single Parquet file when
+    extraction.raw_data_format is "parquet".
+
     Args:
         results: The list of parsed pages to save
         output_dir: The raw data directory for the library/version
     """
+    raw_data_format = get_configured_raw_data_format()
 
     if output_dir.exists():
         print(f"Clearing existing raw data files in {output_dir}...")
@@ -248,13 +389,12 @@ async def save_results(results: list[ParsedPage], output_dir: Path):
 
     valid_results = [r for r in results if r is not None]
 
-    for result in tqdm(
-        valid_results, desc="Writing structured raw data files", unit="file"
-    ):
-        slug = urlparse(result["url"]).path.strip("/").replace("/", "-") or "home"
-        file_name = output_dir / f"{slug}.json"
-        with open(file_name, "w", encoding="utf-8") as f:
-            json.dump(result, f, indent=2)
+    if raw_data_format == "parquet":
+        print(f"Writing {len(valid_results)} pages to {PARQUET_PAGES_FILE}...")
+        _write_parquet_pages(output_dir / PARQUET_PAGES_FILE, valid_results)
+        return
+
+    _write_json_pages(output_dir, valid_results, "Writing structured raw data files")
 
 
 def load_page_hashes_from_directory(directory: Path) -> dict[str, str]:
@@ -262,7 +402,7 @@ def load_page_hashes_from_directory(directory: Path) -> dict[str, str]:
     Load pages and compute hashes without full ParsedPage objects.
 
     Args:
-        directory: Directory containing JSON page files
+        directory: Raw data directory (JSON page files or a Parquet pages file)
 
     Returns:
         Dictionary mapping URLs to content hashes
@@ -273,17 +413,11 @@ def load_page_hashes_from_directory(directory: Path) -> dict[str, str]:
     if not directory.exists():
         return hashes
 
-    for json_file in directory.glob("*.json"):
-        try:
-            with open(json_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                url = data.get("url")
-                content = data.get("content", "")
-                if url:
-                    hashes[url] = hashlib.sha256(content.encode("utf-8")).hexdigest()
-        except (json.JSONDecodeError, KeyError):
-            # Skip corrupted files
-            continue
+    for page in iter_raw_pages(directory, skip_invalid=True):
+        if page["url"]:
+            hashes[page["url"]] = hashlib.sha256(
+                page["content"].encode("utf-8")
+            ).hexdigest()
 
     return hashes
 
@@ -297,23 +431,40 @@ def update_raw_data_directory(
     """
     Update raw data folder - replace/add new, delete removed.
 
+    Keeps the directory's existing format; a missing or empty directory is
+    written in the configured format.
+
     Args:
         raw_data_dir: Path to raw data directory
         new_pages: List of new pages to add
         modified_pages: List of (url, page) tuples for modified pages
         deleted_urls: List of URLs to delete
     """
+    pages_to_save = new_pages + [page for _, page in modified_pages]
+    if not pages_to_save and not deleted_urls:
+        return
+
+    raw_data_format = get_raw_data_format(raw_data_dir)
+    if raw_data_format == "json" and count_raw_pages(raw_data_dir) == 0:
+        raw_data_format = get_configured_raw_data_format()
+
+    raw_data_dir.mkdir(parents=True, exist_ok=True)
+
+    if raw_data_format == "parquet":
+        removed = set(deleted_urls) | {page["url"] for page in pages_to_save}
+        kept = (
+            page for page in iter_raw_pages(raw_data_dir) if page["url"] not in removed
+        )
+        _write_parquet_pages(
+            raw_data_dir / PARQUET_PAGES_FILE, chain(kept, pages_to_save)
+        )
+        return
+
     # Delete JSON files for deleted_urls
     for url in deleted_urls:
-        slug = urlparse(url).path.strip("/").replace("/", "-") or "home"
-        file_name = raw_data_dir / f"{slug}.json"
+        file_name = _json_page_path(raw_data_dir, url)
         if file_name.exists():
             file_name.unlink()
 
     # Save new and modified pages
-    pages_to_save = new_pages + [page for _, page in modified_pages]
-    for page in tqdm(pages_to_save, desc="Updating raw data files", unit="file"):
-        slug = urlparse(page["url"]).path.strip("/").replace("/", "-") or "home"
-        file_name = raw_data_dir / f"{slug}.json"
-        with open(file_name, "w", encoding="utf-8") as f:
-            json.dump(page, f, indent=2)
+    _write_json_pages(raw_data_dir, pages_to_save, "Updating raw data files")
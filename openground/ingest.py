@@ -1,6 +1,7 @@
 from lancedb import Table
 from lancedb.db import DBConnection
-import json
+from collections.abc import Iterable, Iterator, Sized
+from itertools import chain
 from pathlib import Path
 
 import lancedb
@@ -8,44 +9,48 @@ import pyarrow as pa
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from tqdm import tqdm
 
-from openground.extract.common import ParsedPage
+from openground.catalog import refresh_catalog_entry
+from openground.extract.common import ParsedPage, iter_raw_pages
 from openground.config import (
     get_effective_config,
 )
 from openground.embeddings import generate_embeddings
+from openground.sql import url_filter
+from openground.update import compute_content_hash
+from openground.page_store import (
+    ensure_pages_table,
+    index_pages,
+    page_record,
+    upsert_pages,
+)
+
+# Number of chunks embedded and inserted per batch while streaming pages
+INGEST_BATCH_CHUNKS = 1024
 
+# Matched chunks are rewritten only when one of these columns differs
+_CHANGED_CHUNK = " OR ".join(
+    f"target.{column} != source.{column}"
+    for column in ("content", "title", "description", "last_modified", "vector")
+)
 
-def load_parsed_pages(directory: Path) -> list[ParsedPage]:
+
+def load_parsed_pages(directory: Path) -> Iterator[ParsedPage]:
     """
-    Load parsed pages from a directory.
+    Lazily load parsed pages from a directory.
+
+    Pages are read one file at a time, so callers can stream a whole library
+    without holding it in memory. Uses orjson when installed.
 
     Args:
         directory: Path to the directory containing JSON files
 
     Returns:
-        List of parsed pages.
+        Iterator of parsed pages.
     """
     if not directory.exists():
         raise FileNotFoundError(f"Data directory not found: {directory}")
 
-    pages: list[ParsedPage] = []
-    for path in sorted(list(directory.glob("*.md")) + list(directory.glob("*.json"))):
-        with path.open("r", encoding="utf-8") as f:
-            raw = json.load(f)
-
-        pages.append(
-            ParsedPage(
-                url=raw.get("url", ""),
-                library_name=raw.get("library_name", ""),
-                version=raw.get("version", "latest"),
-                title=raw.get("title"),
-                description=raw.get("description"),
-                last_modified=raw.get("last_modified"),
-                content=raw.get("content", ""),
-            )
-        )
-
-    return pages
+    return iter_raw_pages(directory)
 
 
 def chunk_document(
@@ -177,73 +182,206 @@ def ensure_table(
     return db.create_table(table_name, data=[], mode="create", schema=schema)
 
 
-def ingest_to_lancedb(
-    pages: list[ParsedPage],
-) -> None:
-    if not pages:
-        print("No pages to ingest.")
-        return
+def _embed_and_add(table: Table, records: list[dict]) -> int:
+    """
+    Embed a batch of chunk records and insert them into the table.
 
-    config = get_effective_config()
-    db_path = Path(config["db_path"]).expanduser()
-    table_name = config["table_name"]
-    embedding_dimensions = config["embeddings"]["embedding_dimensions"]
-    embedding_backend = config["embeddings"]["embedding_backend"]
-    embedding_model = config["embeddings"]["embedding_model"]
+    Returns:
+        Number of chunks embedded.
+    """
+    embeddings = generate_embeddings(
+        [rec["content"] for rec in records], show_progress=False
+    )
+    for rec, emb in zip(records, embeddings):
+        rec["vector"] = emb
+    table.add(records)
+    return len(records)
+
+
+def _replaced_pages_filter(page_records: list[dict]) -> str:
+    """WHERE clause matching all existing chunks of the given pages."""
+    urls_by_library: dict[tuple[str, str], list[str]] = {}
+    for rec in page_records:
+        key = (rec["library_name"], rec["version"])
+        urls_by_library.setdefault(key, []).append(rec["url"])
+    return " OR ".join(
+        f"({url_filter(library_name, version, urls)})"
+        for (library_name, version), urls in urls_by_library.items()
+    )
 
-    db = lancedb.connect(str(db_path))
-    table = ensure_table(
-        db,
-        table_name,
-        embedding_dimensions=embedding_dimensions,
-        embedding_backend=embedding_backend,
-        embedding_model=embedding_model,
+
+def _reuse_vectors(table: Table, stale_filter: str, records: list[dict]) -> list[dict]:
+    """
+    Copy vectors from existing chunks of the same pages with identical content.
+
+    Chunks are matched by content hash, so text that only moved (e.g. after an
+    edit earlier in the page) keeps its vector under its new chunk_index.
+
+    Returns:
+        The records that still need to be embedded.
+    """
+    existing = (
+        table.search().where(stale_filter).select(["content", "vector"]).to_arrow()
+    )
+    row_by_hash = {
+        compute_content_hash(content): row
+        for row, content in enumerate(existing["content"].to_pylist())
+    }
+    reused = {
+        idx: row_by_hash[content_hash]
+        for idx, rec in enumerate(records)
+        if (content_hash := compute_content_hash(rec["content"])) in row_by_hash
+    }
+    vectors = (
+        existing["vector"]
+        .take(pa.array(list(reused.values()), type=pa.int64()))
+        .to_pylist()
     )
+    for idx, vector in zip(reused, vectors):
+        records[idx]["vector"] = vector
+    return [rec for idx, rec in enumerate(records) if idx not in reused]
 
-    # Chunk documents with progress
-    all_records = []
-    for page in tqdm(pages, desc="Chunking documents", unit="page"):
-        all_records.extend(chunk_document(page))
 
-    if not all_records:
-        print("No chunks produced; skipping ingestion.")
-        return
+def _embed_and_upsert(
+    table: Table, records: list[dict], page_records: list[dict]
+) -> int:
+    """
+    Upsert a batch of chunk records keyed by (library, version, url, chunk_index).
 
-    # Generate embeddings with progress
-    content_texts = [rec["content"] for rec in all_records]
-    embeddings = generate_embeddings(content_texts)
+    Only chunks whose text is new to their page are embedded; the others reuse
+    the stored vector. Matched rows are rewritten only if their text, page
+    metadata or vector changed, so an edit leaves the fragments of untouched
+    chunks alone; chunks of the batch's pages that no longer exist (the page
+    got shorter) are deleted in the same merge.
 
-    # Add embeddings to records
-    for rec, emb in zip(all_records, embeddings):
-        rec["vector"] = emb
+    Returns:
+        Number of chunks embedded.
+    """
+    stale_filter = _replaced_pages_filter(page_records)
+    if not records:
+        table.delete(stale_filter)
+        return 0
+
+    to_embed = _reuse_vectors(table, stale_filter, records)
+    if to_embed:
+        embeddings = generate_embeddings(
+            [rec["content"] for rec in to_embed], show_progress=False
+        )
+        for rec, emb in zip(to_embed, embeddings):
+            rec["vector"] = emb
+    (
+        table.merge_insert(["library_name", "version", "url", "chunk_index"])
+        .when_matched_update_all(where=_CHANGED_CHUNK)
+        .when_not_matched_insert_all()
+        .when_not_matched_by_source_delete(stale_filter)
+        .execute(records)
+    )
+    return len(to_embed)
 
-    print(f"Inserting {len(all_records)} chunks into LanceDB...")
-    table.add(all_records)
 
-    try:
-        table.create_fts_index("content", replace=True)
-    except Exception as exc:  # best-effort; index may already exist
-        print(f"FTS index creation skipped: {exc}")
+def _ingest_pages(
+    table: Table,
+    pages: Iterable[ParsedPage],
+    pages_table: Table,
+    upsert: bool = False,
+) -> tuple[int, int, set[tuple[str, str]]]:
+    """
+    Chunk, embed and insert pages in bounded batches.
+
+    The original pages are upserted into the page store alongside their chunks.
+    A page's chunks always land in the same batch.
+
+    Args:
+        table: Table to insert chunks into
+        pages: Pages to ingest; may be a lazy iterator
+        pages_table: Page store table (see openground.page_store)
+        upsert: Replace existing chunks of these pages instead of appending
+
+    Returns:
+        Number of chunks written, how many of them were embedded, and the
+        (library_name, version) pairs seen.
+    """
+    total = len(pages) if isinstance(pages, Sized) else None
+    inserted = 0
+    embedded = 0
+    library_versions: set[tuple[str, str]] = set()
+    batch: list[dict] = []
+    page_batch: list[dict] = []
+
+    def write_chunks(records: list[dict], page_records: list[dict]) -> None:
+        nonlocal embedded
+        if upsert:
+            embedded += _embed_and_upsert(table, records, page_records)
+        else:
+            embedded += _embed_and_add(table, records)
+
+    for page in tqdm(pages, desc="Embedding documents", unit="page", total=total):
+        library_versions.add((page["library_name"], page["version"]))
+        batch.extend(chunk_document(page))
+        page_batch.append(page_record(page))
+        if len(batch) >= INGEST_BATCH_CHUNKS:
+            write_chunks(batch, page_batch)
+            upsert_pages(pages_table, page_batch)
+            inserted += len(batch)
+            batch = []
+            page_batch = []
+
+    if batch or (upsert and page_batch):
+        write_chunks(batch, page_batch)
+        inserted += len(batch)
+    upsert_pages(pages_table, page_batch)
+
+    return inserted, embedded, library_versions
+
+
+def ingest_to_lancedb(
+    pages: Iterable[ParsedPage],
+    source: str | None = None,
+) -> None:
+    """
+    Ingest pages into the configured LanceDB table.
+
+    Args:
+        pages: Pages to ingest; may be a lazy iterator (see load_parsed_pages)
+        source: Source URL or path recorded in the library catalog
+    """
+    config = get_effective_config()
+    ingest_pages_to_lancedb(
+        pages=pages,
+        db_path=Path(config["db_path"]).expanduser(),
+        table_name=config["table_name"],
+        source=source,
+    )
 
 
 def ingest_pages_to_lancedb(
-    pages: list[ParsedPage],
+    pages: Iterable[ParsedPage],
     db_path: Path,
     table_name: str,
+    source: str | None = None,
+    upsert: bool = False,
 ) -> None:
     """
     Ingest specific pages to LanceDB with explicit db/table params.
 
     Similar to ingest_to_lancedb but allows override for update flow.
+    Refreshes the library catalog for every library version ingested.
 
     Args:
-        pages: List of parsed pages to ingest
+        pages: Pages to ingest; may be a lazy iterator
         db_path: Path to LanceDB storage
         table_name: Name of the table to use
+        source: Source URL or path recorded in the library catalog
+        upsert: Merge chunks into existing rows of the same pages (used by
+            updates) instead of appending
     """
-    if not pages:
+    page_iter = iter(pages)
+    first = next(page_iter, None)
+    if first is None:
         print("No pages to ingest.")
         return
+    if not isinstance(pages, Sized):
+        pages = chain([first], page_iter)
 
     config = get_effective_config()
     embedding_dimensions = config["embeddings"]["embedding_dimensions"]
@@ -259,24 +397,33 @@ def ingest_pages_to_lancedb(
         embedding_model=embedding_model,
     )
 
-    all_records = []
-    for page in tqdm(pages, desc="Chunking documents", unit="page"):
-        all_records.extend(chunk_document(page))
+    pages_table = ensure_pages_table(db, table_name)
 
-    if not all_records:
+    inserted, embedded, library_versions = _ingest_pages(
+        table, pages, pages_table, upsert=upsert
+    )
+    index_pages(pages_table)
+    if not inserted:
         print("No chunks produced; skipping ingestion.")
+        if upsert:
+            for library_name, version in sorted(library_versions):
+                refresh_catalog_entry(
+                    library_name, version, db_path, table_name, source
+                )
         return
 
-    content_texts = [rec["content"] for rec in all_records]
-    embeddings = generate_embeddings(content_texts)
-
-    for rec, emb in zip(all_records, embeddings):
-        rec["vector"] = emb
-
-    print(f"Inserting {len(all_records)} chunks into LanceDB...")
-    table.add(all_records)
+    if upsert:
+        print(
+            f"Upserted {inserted} chunks into LanceDB "
+            f"({embedded} embedded, {inserted - embedded} reused)."
+        )
+    else:
+        print(f"Inserted {inserted} chunks into LanceDB.")
 
     try:
         table.create_fts_index("content", replace=True)
     except Exception as exc:  # best-effort; index may already exist
         print(f"FTS index creation skipped: {exc}")
+
+    for library_name, version in sorted(library_versions):
+        refresh_catalog_entry(library_name, version, db_path, table_name, source)
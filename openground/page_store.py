@@ -0,0 +1,117 @@
+"""
+Page store: one row per (library, version, url) with the original page text.
+
+Chunks overlap and repeat page metadata, so reconstructing a page from them is
+lossy and slow. The page store lives in a LanceDB table next to the documents
+table, with a BTree index on ``url`` so full-page lookups are a single indexed
+read.
+"""
+
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import lancedb
+    import lancedb.table
+
+    from openground.extract.common import ParsedPage
+
+from openground.sql import library_version_filter, url_filter
+
+PAGES_TABLE_SUFFIX = "_pages"
+
+
+def get_pages_table_name(table_name: str) -> str:
+    """Return the name of the page store table for a documents table."""
+    return f"{table_name}{PAGES_TABLE_SUFFIX}"
+
+
+def _pages_schema():
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            pa.field("url", pa.string()),
+            pa.field("library_name", pa.string()),
+            pa.field("version", pa.string()),
+            pa.field("title", pa.string()),
+            pa.field("description", pa.string()),
+            pa.field("last_modified", pa.string()),
+            pa.field("content", pa.string()),
+        ]
+    )
+
+
+def ensure_pages_table(
+    db: "lancedb.DBConnection", table_name: str
+) -> "lancedb.table.Table":
+    """Open the page store for a documents table, creating it if needed."""
+    pages_name = get_pages_table_name(table_name)
+    if pages_name in db.table_names():
+        return db.open_table(pages_name)
+    return db.create_table(pages_name, schema=_pages_schema(), mode="create")
+
+
+def page_record(page: "ParsedPage") -> dict:
+    """Convert a parsed page into a page store row."""
+    return {
+        "url": page["url"],
+        "library_name": page["library_name"],
+        "version": page["version"],
+        "title": page["title"] or "",
+        "description": page["description"] or "",
+        "last_modified": page["last_modified"] or "",
+        "content": page["content"],
+    }
+
+
+def upsert_pages(pages_table: "lancedb.table.Table", records: list[dict]) -> None:
+    """Insert or replace page rows keyed by (library_name, version, url)."""
+    if not records:
+        return
+    (
+        pages_table.merge_insert(["library_name", "version", "url"])
+        .when_matched_update_all()
+        .when_not_matched_insert_all()
+        .execute(records)
+    )
+
+
+def index_pages(pages_table: "lancedb.table.Table") -> None:
+    """(Re)build the BTree index on url so lookups stay indexed after writes."""
+    pages_table.create_scalar_index("url", replace=True)
+
+
+def delete_pages(
+    library_name: str,
+    version: str,
+    db_path: Path,
+    table_name: str,
+    urls: Iterable[str] | None = None,
+) -> None:
+    """
+    Delete pages of a library version from the page store.
+
+    Args:
+        library_name: Library name
+        version: Version string
+        db_path: Path to LanceDB storage
+        table_name: Documents table name
+        urls: URLs to delete; deletes the whole library version if None
+    """
+    import lancedb
+
+    db = lancedb.connect(str(db_path))
+    pages_name = get_pages_table_name(table_name)
+    if pages_name not in db.table_names():
+        return
+
+    if urls is None:
+        filter_str = library_version_filter(library_name, version)
+    else:
+        urls = list(urls)
+        if not urls:
+            return
+        filter_str = url_filter(library_name, version, urls)
+    db.open_table(pages_name).delete(filter_str)
@@ -1,18 +1,116 @@
+import asyncio
 import json
+import re
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Any, TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Optional
 
 if TYPE_CHECKING:
     import lancedb
     import lancedb.table
-
-from openground.config import DEFAULT_DB_PATH, DEFAULT_TABLE_NAME
-from openground.embeddings import generate_embeddings
-
-# Caches for database connection and table
+    import pyarrow as pa
+
+    from openground.result_cache import SearchResultCache
+
+from openground.config import (
+    DEFAULT_DB_PATH,
+    DEFAULT_LIBRARY_VERSION,
+    DEFAULT_LINEAR_WEIGHT,
+    DEFAULT_OUTPUT_FORMAT,
+    DEFAULT_QUERY_CACHE_SIZE,
+    DEFAULT_QUERY_CACHE_TTL_SECONDS,
+    DEFAULT_QUERY_FUSION,
+    DEFAULT_QUERY_MAX_CHARS,
+    DEFAULT_QUERY_MODE,
+    DEFAULT_TABLE_NAME,
+    get_data_home,
+    get_effective_config,
+)
+from openground.single_flight import AsyncSingleFlight, SingleFlight
+from openground.sql import escape_sql_string, url_filter
+
+# Caches for database connection and table. Table and metadata entries carry
+# the table version token they were loaded at, so writes from other processes
+# (e.g. the CLI adding a library while the MCP server runs) are picked up.
 _db_cache: dict[str, Any] = {}
-_table_cache: dict[tuple[str, str], Any] = {}
-_metadata_cache: dict[tuple[str, str], dict[str, Any]] = {}
+_table_cache: dict[tuple[str, str], tuple[Any, Any]] = {}
+_metadata_cache: dict[tuple[str, str], tuple[Any, dict[str, Any]]] = {}
+_result_cache: "SearchResultCache | None" = None
+# Async API handles (see _get_async_table), refreshed by the same version token
+_async_db_cache: dict[str, Any] = {}
+_async_table_cache: dict[tuple[str, str], tuple[Any, Any]] = {}
+# Guards the sync caches; `openground update --all` uses them from worker threads
+_cache_lock = threading.RLock()
+# Identical searches in flight at the same time share one embedding and search;
+# keyed like the result cache, so only calls with identical output are merged
+_search_flights = SingleFlight()
+_async_search_flights = AsyncSingleFlight()
+
+# Upper bound on concurrent LanceDB queries issued by search_many
+SEARCH_MANY_MAX_WORKERS = 4
+
+# Rows read to pick sample titles in get_library_stats
+STATS_TITLE_SAMPLE = 20
+
+SEARCH_MODES = ("hybrid", "vector", "fts", "auto")
+FUSION_METHODS = ("rrf", "linear")
+OUTPUT_FORMATS = ("full", "compact")
+# Snippet length per entry in the compact output format
+COMPACT_SNIPPET_CHARS = 300
+# Query searched once per library version by async_warmup
+WARMUP_QUERY = "getting started"
+# Read size used when prefetching table files into the page cache
+_PREFETCH_BLOCK_SIZE = 1 << 20
+# Stages reported by search(timings=...), in pipeline order. A search records
+# only the stages it ran; hybrid searches record one hybrid stage, or vector,
+# fts and fusion when run with split_hybrid.
+STAGE_NAMES = (
+    "cache",
+    "model_load",
+    "embed",
+    "vector",
+    "fts",
+    "fusion",
+    "hybrid",
+    "format",
+    "total",
+)
+
+
+# openground.embeddings (and tqdm/model backends behind it) is imported on first
+# use so commands and server startup that never embed do not pay for it.
+def generate_embeddings(
+    texts: Iterable[str], show_progress: bool = True
+) -> list[list[float]]:
+    """Embed texts with the configured backend; see openground.embeddings."""
+    from openground.embeddings import generate_embeddings as _generate_embeddings
+
+    return _generate_embeddings(texts, show_progress=show_progress)
+
+
+def load_embedding_model() -> Any:
+    """Load the configured embedding model; see openground.embeddings."""
+    from openground.embeddings import load_embedding_model as _load_embedding_model
+
+    return _load_embedding_model()
+
+
+@contextmanager
+def _stage(timings: dict[str, float] | None, name: str) -> Iterator[None]:
+    """Add the wall time of the block, in milliseconds, to ``timings[name]``."""
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        timings[name] = timings.get(name, 0.0) + elapsed
 
 
 def _get_db(db_path: Path) -> "lancedb.DBConnection":
@@ -20,49 +118,154 @@ def _get_db(db_path: Path) -> "lancedb.DBConnection":
     import lancedb
 
     path_str = str(db_path)
-    if path_str not in _db_cache:
-        _db_cache[path_str] = lancedb.connect(path_str)
-    return _db_cache[path_str]
+    with _cache_lock:
+        if path_str not in _db_cache:
+            _db_cache[path_str] = lancedb.connect(path_str)
+        return _db_cache[path_str]
+
+
+def table_version_token(db_path: Path, table_name: str) -> tuple[int, int] | None:
+    """
+    Return a cheap token that changes whenever a table is written to.
+
+    Every Lance commit adds a manifest to the table's ``_versions`` directory, so
+    the directory's mtime (plus inode, to catch drop-and-recreate) identifies the
+    current version with a single stat call.
+
+    Returns:
+        The token, or None if the table does not exist on disk.
+    """
+    try:
+        st = (Path(db_path) / f"{table_name}.lance" / "_versions").stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_ino
 
 
 def _get_table(db_path: Path, table_name: str) -> Optional["lancedb.table.Table"]:
-    """Get a cached table handle."""
+    """Get a cached table handle, refreshed when the table has changed on disk."""
     cache_key = (str(db_path), table_name)
-    if cache_key not in _table_cache:
+    token = table_version_token(db_path, table_name)
+    with _cache_lock:
+        cached = _table_cache.get(cache_key)
+        if cached is not None and cached[0] == token:
+            return cached[1]
+        # New commits get a fresh handle instead of checkout_latest(), since
+        # other threads may still be querying the old one
+        _table_cache.pop(cache_key, None)
+
         db = _get_db(db_path)
         if table_name not in db.table_names():
             return None
-        _table_cache[cache_key] = db.open_table(table_name)
-    return _table_cache[cache_key]
+        table = db.open_table(table_name)
+        _table_cache[cache_key] = (token, table)
+        return table
 
 
-def clear_query_caches():
-    """Clear all query-related caches."""
-    _db_cache.clear()
-    _table_cache.clear()
-    _metadata_cache.clear()
+async def _get_async_table(
+    db_path: Path, table_name: str
+) -> Optional["lancedb.table.AsyncTable"]:
+    """Async counterpart of _get_table using LanceDB's async API."""
+    import lancedb
 
+    cache_key = (str(db_path), table_name)
+    token = table_version_token(db_path, table_name)
+    cached = _async_table_cache.get(cache_key)
+    if cached is not None:
+        cached_token, table = cached
+        if token == cached_token:
+            return table
+        if token and cached_token and token[1] == cached_token[1]:
+            await table.checkout_latest()
+            _async_table_cache[cache_key] = (token, table)
+            return table
+        _async_table_cache.pop(cache_key, None)
 
-def _escape_sql_string(value: str) -> str:
-    """
-    Escape a string value for safe use in LanceDB SQL WHERE clauses.
+    path_str = str(db_path)
+    if path_str not in _async_db_cache:
+        _async_db_cache[path_str] = await lancedb.connect_async(path_str)
+    db = _async_db_cache[path_str]
+    if table_name not in await db.table_names():
+        return None
+    table = await db.open_table(table_name)
+    _async_table_cache[cache_key] = (token, table)
+    return table
 
-    This function escapes single quotes and backslashes to prevent SQL injection.
-    Note: LanceDB uses DataFusion which parses SQL, so proper escaping is critical.
 
-    Args:
-        value: The string value to escape
+def watched_table_names(table_name: str) -> list[str]:
+    """Return the documents table and the page store and catalog tables next to it."""
+    from openground.catalog import get_catalog_table_name
+    from openground.page_store import get_pages_table_name
 
-    Returns:
-        Escaped string safe for use in SQL string literals
+    return [
+        table_name,
+        get_pages_table_name(table_name),
+        get_catalog_table_name(table_name),
+    ]
+
+
+def refresh_table_caches(db_path: Path, table_name: str) -> None:
+    """
+    Bring cached table handles and the library listing up to date with disk.
+
+    Tables that did not change are left alone, so this is cheap to call
+    whenever the database directory may have been written to.
     """
-    # Remove null bytes (can cause string truncation in some parsers)
-    value = value.replace("\x00", "")
-    # Escape backslashes first (must be done before escaping quotes)
-    value = value.replace("\\", "\\\\")
-    # Escape single quotes (SQL standard: ' becomes '')
-    value = value.replace("'", "''")
-    return value
+    for name in watched_table_names(table_name):
+        _get_table(db_path, name)
+    list_libraries_with_versions(db_path, table_name)
+
+
+async def async_refresh_table_caches(db_path: Path, table_name: str) -> None:
+    """Async counterpart of refresh_table_caches() for the async table handles."""
+    from openground.page_store import get_pages_table_name
+
+    # The catalog is only read through the sync API
+    for name in (table_name, get_pages_table_name(table_name)):
+        await _get_async_table(db_path, name)
+
+
+def _get_result_cache() -> "SearchResultCache":
+    """Get the search result cache, configured from the ``query`` config section."""
+    global _result_cache
+    with _cache_lock:
+        if _result_cache is None:
+            from openground.result_cache import SearchResultCache
+
+            query_config = get_effective_config()["query"]
+            persist_path = None
+            if query_config.get("cache_persist"):
+                persist_path = get_data_home() / "search_cache.sqlite3"
+            _result_cache = SearchResultCache(
+                max_size=int(query_config.get("cache_size", DEFAULT_QUERY_CACHE_SIZE)),
+                ttl_seconds=float(
+                    query_config.get(
+                        "cache_ttl_seconds", DEFAULT_QUERY_CACHE_TTL_SECONDS
+                    )
+                ),
+                persist_path=persist_path,
+            )
+        return _result_cache
+
+
+def clear_query_caches():
+    """Clear all query-related caches."""
+    global _result_cache
+    with _cache_lock:
+        _db_cache.clear()
+        _table_cache.clear()
+        _metadata_cache.clear()
+        _async_db_cache.clear()
+        _async_table_cache.clear()
+        # Persisted results stay valid: their keys carry the table version token
+        if _result_cache is not None:
+            _result_cache.close()
+        _result_cache = None
+
+
+def _normalize_query(query: str) -> str:
+    """Collapse whitespace and case; the embedding model and BM25 are uncased."""
+    return " ".join(query.split()).casefold()
 
 
 def search(
@@ -73,68 +276,840 @@ def search(
     library_name: Optional[str] = None,
     top_k: int = 10,
     show_progress: bool = True,
+    mode: str | None = None,
+    max_chars: int | None = None,
+    output_format: str | None = None,
+    timings: dict[str, float] | None = None,
+    libraries: list[tuple[str, str]] | None = None,
+    split_hybrid: bool = False,
 ) -> str:
     """
-    Run a hybrid search (semantic + BM25) against the LanceDB table and return a
-    markdown-friendly summary string.
+    Search the LanceDB table and return a markdown-friendly summary string.
+
+    By default this is a hybrid search (semantic + BM25); see ``mode``.
+    Results are cached by normalized query, filters, top_k, mode and table
+    version; see the ``query.cache_*`` config keys. Identical searches running
+    at the same time share one embedding and search.
 
     Args:
         query: User query text.
-        version: Version to filter results by.
+        version: Version to filter results by (ignored when ``libraries`` is set).
         db_path: Path to LanceDB storage.
         table_name: Table name to search.
         library_name: Optional filter on library name column.
         top_k: Number of results to return.
         show_progress: Whether to show progress during embedding.
+        mode: "hybrid", "vector", "fts" or "auto"; defaults to ``query.mode``.
+        max_chars: Output size limit (0 = unlimited); defaults to ``query.max_chars``.
+        output_format: "full" or "compact"; defaults to ``query.output_format``.
+        timings: If given, filled with per-stage wall times in milliseconds
+            (see STAGE_NAMES).
+        libraries: (library, version) pairs to search together in one
+            prefiltered query with a single ranking; see resolve_libraries().
+            Overrides ``version`` and ``library_name``.
+        split_hybrid: Profiling only. Run the hybrid legs one after the other
+            and fuse them here, so the vector, fts and fusion stages can be
+            timed apart. Results are neither cached nor shared, since the
+            fusion only mirrors LanceDB's hybrid query.
+    """
+    with _stage(timings, "total"):
+        table = _get_table(db_path, table_name)
+        if table is None or libraries == []:
+            return "Found 0 matches."
+        filter_str = _search_filter(version, library_name, libraries)
+
+        mode = _resolve_search_mode(query, mode)
+        output_options = _resolve_output_options(max_chars, output_format)
+        result_cache = _get_result_cache()
+        with _stage(timings, "cache"):
+            cache_key = _search_cache_key(
+                query, filter_str, db_path, table_name, top_k, mode, output_options
+            )
+            cached = result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        split = split_hybrid and mode == "hybrid"
+
+        def run() -> str:
+            query_vec = None
+            if mode != "fts":
+                if timings is not None:
+                    # Keep a cold model load out of the embed stage
+                    with _stage(timings, "model_load"):
+                        load_embedding_model()
+                with _stage(timings, "embed"):
+                    query_vec = generate_embeddings(
+                        [query], show_progress=show_progress
+                    )[0]
+            if split:
+                results = _run_profiled_hybrid(
+                    table, query, query_vec, filter_str, top_k, timings
+                )
+            else:
+                with _stage(timings, mode):
+                    results = _run_search(
+                        table, query, query_vec, mode, filter_str, top_k
+                    )
+
+            with _stage(timings, "format"):
+                output = _format_search_results(results, version, *output_options)
+            if not split:
+                result_cache.put(cache_key, output)
+            return output
+
+        if timings is not None or split:
+            # A profiled search measures its own stages, so it is never shared
+            return run()
+        return _search_flights.do(cache_key, run)
+
+
+def search_many(
+    queries: list[str],
+    version: str,
+    db_path: Path = DEFAULT_DB_PATH,
+    table_name: str = DEFAULT_TABLE_NAME,
+    library_name: str | None = None,
+    top_k: int = 10,
+    show_progress: bool = True,
+    mode: str | None = None,
+    max_chars: int | None = None,
+    output_format: str | None = None,
+) -> list[str]:
+    """
+    Run several searches with a single batched embedding call.
+
+    Cached and duplicate queries are answered without re-embedding; the rest
+    are embedded together and searched concurrently.
+
+    Args:
+        queries: User query texts.
+        version: Version to filter results by.
+        db_path: Path to LanceDB storage.
+        table_name: Table name to search.
+        library_name: Optional filter on library name column.
+        top_k: Number of results to return per query.
+        show_progress: Whether to show progress during embedding.
+        mode: "hybrid", "vector", "fts" or "auto"; defaults to ``query.mode``.
+        max_chars: Output size limit per query (0 = unlimited); defaults to
+            ``query.max_chars``.
+        output_format: "full" or "compact"; defaults to ``query.output_format``.
+
+    Returns:
+        One markdown-friendly result string per query, in input order.
     """
     table = _get_table(db_path, table_name)
     if table is None:
-        return "Found 0 matches."
+        return ["Found 0 matches." for _ in queries]
 
-    query_vec = generate_embeddings([query], show_progress=show_progress)[0]
+    output_options = _resolve_output_options(max_chars, output_format)
+    filter_str = _search_filter(version, library_name)
+    keys, outputs, pending = _plan_search_many(
+        queries, filter_str, db_path, table_name, top_k, mode, output_options
+    )
 
-    search_builder = table.search(query_type="hybrid").text(query).vector(query_vec)
+    if pending:
+        vectors = _embed_pending(
+            pending,
+            lambda texts: generate_embeddings(texts, show_progress=show_progress),
+        )
+        workers = min(len(pending), SEARCH_MANY_MAX_WORKERS)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                key: executor.submit(
+                    _run_search,
+                    table,
+                    query,
+                    vectors.get(key),
+                    query_mode,
+                    filter_str,
+                    top_k,
+                )
+                for key, (query, query_mode) in pending.items()
+            }
+        _store_search_many(
+            outputs,
+            {key: future.result() for key, future in futures.items()},
+            version,
+            output_options,
+        )
 
-    safe_version = _escape_sql_string(version)
-    search_builder = search_builder.where(f"version = '{safe_version}'")
+    return [outputs[key] for key in keys]
 
-    if library_name:
-        safe_name = _escape_sql_string(library_name)
-        search_builder = search_builder.where(f"library_name = '{safe_name}'")
 
-    results = search_builder.limit(top_k).to_list()
+async def async_search(
+    query: str,
+    version: str,
+    db_path: Path = DEFAULT_DB_PATH,
+    table_name: str = DEFAULT_TABLE_NAME,
+    library_name: str | None = None,
+    top_k: int = 10,
+    mode: str | None = None,
+    max_chars: int | None = None,
+    output_format: str | None = None,
+    timings: dict[str, float] | None = None,
+    libraries: list[tuple[str, str]] | None = None,
+    split_hybrid: bool = False,
+) -> str:
+    """
+    Async variant of search() that never blocks the event loop.
 
-    if not results:
-        return "Found 0 matches."
+    The query is embedded in a worker thread and the search runs on LanceDB's
+    async API. Shares the result cache with search(). Identical concurrent
+    calls share one embedding and search; only the caller that started it
+    records the embed and search stages. With ``split_hybrid``, the two
+    hybrid legs run concurrently and are timed as the vector and fts stages.
+    """
+    with _stage(timings, "total"):
+        table = await _get_async_table(db_path, table_name)
+        if table is None or libraries == []:
+            return "Found 0 matches."
+        filter_str = _search_filter(version, library_name, libraries)
+
+        mode = _resolve_search_mode(query, mode)
+        output_options = _resolve_output_options(max_chars, output_format)
+        result_cache = _get_result_cache()
+        with _stage(timings, "cache"):
+            cache_key = _search_cache_key(
+                query, filter_str, db_path, table_name, top_k, mode, output_options
+            )
+            cached = result_cache.get(cache_key, load=False)
+            if cached is None and result_cache.persistent:
+                cached = await asyncio.to_thread(result_cache.get, cache_key)
+        if cached is not None:
+            return cached
+        split = split_hybrid and mode == "hybrid"
+
+        async def run() -> str:
+            query_vec = None
+            if mode != "fts":
+                if timings is not None:
+                    with _stage(timings, "model_load"):
+                        await asyncio.to_thread(load_embedding_model)
+                with _stage(timings, "embed"):
+                    query_vec = (
+                        await asyncio.to_thread(
+                            generate_embeddings, [query], show_progress=False
+                        )
+                    )[0]
+            if split:
+                results = await _async_run_profiled_hybrid(
+                    table, query, query_vec, filter_str, top_k, timings
+                )
+            else:
+                with _stage(timings, mode):
+                    results = await _async_run_search(
+                        table, query, query_vec, mode, filter_str, top_k
+                    )
+
+            with _stage(timings, "format"):
+                output = _format_search_results(results, version, *output_options)
+            if not split:
+                await _run_cache_io(result_cache.put, cache_key, output)
+            return output
+
+        if split:
+            return await run()
+        # Stages are recorded by whichever caller started the shared search
+        return await _async_search_flights.do(cache_key, run)
+
+
+async def async_search_many(
+    queries: list[str],
+    version: str,
+    db_path: Path = DEFAULT_DB_PATH,
+    table_name: str = DEFAULT_TABLE_NAME,
+    library_name: str | None = None,
+    top_k: int = 10,
+    mode: str | None = None,
+    max_chars: int | None = None,
+    output_format: str | None = None,
+) -> list[str]:
+    """Async variant of search_many(); the searches run concurrently on the event loop."""
+    table = await _get_async_table(db_path, table_name)
+    if table is None:
+        return ["Found 0 matches." for _ in queries]
+
+    output_options = _resolve_output_options(max_chars, output_format)
+    filter_str = _search_filter(version, library_name)
+    keys, outputs, pending = await _run_cache_io(
+        _plan_search_many,
+        queries,
+        filter_str,
+        db_path,
+        table_name,
+        top_k,
+        mode,
+        output_options,
+    )
 
-    lines = [f"Found {len(results)} match{'es' if len(results) != 1 else ''}."]
-    for idx, item in enumerate(results, start=1):
-        title = item.get("title") or "(no title)"
-        # Return the full chunk so downstream consumers (LLM) see the whole text.
-        snippet = (item.get("content") or "").strip()
-        source = item.get("url") or "unknown"
-        item_version = item.get("version") or version
-        score = item.get("_distance") or item.get("_score")
+    if pending:
+        vectors = await asyncio.to_thread(
+            _embed_pending,
+            pending,
+            lambda texts: generate_embeddings(texts, show_progress=False),
+        )
+        results = await asyncio.gather(
+            *(
+                _async_run_search(
+                    table,
+                    query,
+                    vectors.get(key),
+                    query_mode,
+                    filter_str,
+                    top_k,
+                )
+                for key, (query, query_mode) in pending.items()
+            )
+        )
+        await _run_cache_io(
+            _store_search_many,
+            outputs,
+            dict(zip(pending, results)),
+            version,
+            output_options,
+        )
+
+    return [outputs[key] for key in keys]
+
+
+def prefetch_table_files(db_path: Path, table_name: str, max_bytes: int) -> int:
+    """
+    Read a table's files into the OS page cache, newest first.
+
+    Index files (FTS postings) come before data files (where flat vector
+    search reads embeddings); superseded files from older versions are
+    usually older and so fall outside the budget.
+
+    Args:
+        db_path: Path to LanceDB storage.
+        table_name: Table whose files to read.
+        max_bytes: Stop after reading about this many bytes.
+
+    Returns:
+        Number of bytes read.
+    """
+    table_dir = Path(db_path) / f"{table_name}.lance"
+    groups = [table_dir / "_indices", table_dir / "data"]
+    read = 0
+    for group in groups:
+        if not group.is_dir():
+            continue
+        files = [path for path in group.rglob("*") if path.is_file()]
+        files.sort(key=lambda path: path.stat().st_mtime, reverse=True)
+        for path in files:
+            if read >= max_bytes:
+                return read
+            with open(path, "rb") as f:
+                while read < max_bytes:
+                    block = f.read(_PREFETCH_BLOCK_SIZE)
+                    if not block:
+                        break
+                    read += len(block)
+    return read
+
+
+async def async_warmup(
+    db_path: Path = DEFAULT_DB_PATH,
+    table_name: str = DEFAULT_TABLE_NAME,
+    libraries: list[tuple[str, str | None]] | None = None,
+) -> int:
+    """
+    Open the async table handles and run one hybrid search per library version.
+
+    The searches bypass the result cache; they exist to load the FTS index,
+    embeddings and page store so the first real query runs at steady state.
+
+    Args:
+        db_path: Path to LanceDB storage.
+        table_name: Table name to search.
+        libraries: (library, version) pairs to search; a version of None means
+            every version of that library. Defaults to every library version.
+
+    Returns:
+        Number of searches run.
+    """
+    from openground.page_store import get_pages_table_name
+
+    table = await _get_async_table(db_path, table_name)
+    if table is None:
+        return 0
+    await _get_async_table(db_path, get_pages_table_name(table_name))
+
+    available = await async_list_libraries_with_versions(db_path, table_name)
+    if libraries is None:
+        libraries = [(name, None) for name in available]
+    targets = [
+        (name, version)
+        for name, wanted in libraries
+        for version in available.get(name, [])
+        if wanted is None or version == wanted
+    ]
+    if not targets:
+        return 0
+
+    query_vec = (
+        await asyncio.to_thread(
+            generate_embeddings, [WARMUP_QUERY], show_progress=False
+        )
+    )[0]
+    top_k = get_effective_config()["query"]["top_k"]
+    for name, version in targets:
+        await _async_run_search(
+            table,
+            WARMUP_QUERY,
+            query_vec,
+            "hybrid",
+            _search_filter(version, name),
+            top_k,
+        )
+    return len(targets)
+
+
+def _plan_search_many(
+    queries: list[str],
+    filter_str: str,
+    db_path: Path,
+    table_name: str,
+    top_k: int,
+    mode: str | None,
+    output_options: tuple[int, str],
+) -> tuple[list[tuple], dict[tuple, str], dict[tuple, tuple[str, str]]]:
+    """
+    Split a batch into cache hits and unique pending searches.
+
+    Returns:
+        (cache key per query, cached outputs by key, (query, mode) by pending key)
+    """
+    result_cache = _get_result_cache()
+    keys = []
+    outputs: dict[tuple, str] = {}
+    pending: dict[tuple, tuple[str, str]] = {}
+    for query in queries:
+        query_mode = _resolve_search_mode(query, mode)
+        key = _search_cache_key(
+            query, filter_str, db_path, table_name, top_k, query_mode, output_options
+        )
+        keys.append(key)
+        if key in outputs or key in pending:
+            continue
+        cached = result_cache.get(key)
+        if cached is not None:
+            outputs[key] = cached
+        else:
+            pending[key] = (query, query_mode)
+    return keys, outputs, pending
+
+
+async def _run_cache_io(func: Any, *args: Any) -> Any:
+    """Call func, in a worker thread if it may read or write the SQLite cache."""
+    if _get_result_cache().persistent:
+        return await asyncio.to_thread(func, *args)
+    return func(*args)
+
+
+def _embed_pending(
+    pending: dict[tuple, tuple[str, str]], embed: Any
+) -> dict[tuple, list[float]]:
+    """Embed, in one call, the pending queries whose mode needs a vector."""
+    needs_vector = [key for key, (_, mode) in pending.items() if mode != "fts"]
+    if not needs_vector:
+        return {}
+    vectors = embed([pending[key][0] for key in needs_vector])
+    return dict(zip(needs_vector, vectors))
+
+
+def _store_search_many(
+    outputs: dict[tuple, str],
+    results: dict[tuple, list[dict[str, Any]]],
+    version: str,
+    output_options: tuple[int, str],
+) -> None:
+    result_cache = _get_result_cache()
+    for key, hits in results.items():
+        output = _format_search_results(hits, version, *output_options)
+        result_cache.put(key, output)
+        outputs[key] = output
+
+
+def _search_cache_key(
+    query: str,
+    filter_str: str,
+    db_path: Path,
+    table_name: str,
+    top_k: int,
+    mode: str,
+    output_options: tuple[int, str],
+) -> tuple:
+    if mode == "hybrid":
+        # Fusion settings change hybrid rankings, so they are part of the key
+        query_config = get_effective_config()["query"]
+        mode = f"hybrid:{query_config.get('fusion', DEFAULT_QUERY_FUSION)}"
+        if mode == "hybrid:linear":
+            mode += f":{query_config.get('linear_weight', DEFAULT_LINEAR_WEIGHT)}"
+    return (
+        str(db_path),
+        table_name,
+        table_version_token(db_path, table_name),
+        _normalize_query(query),
+        filter_str,
+        top_k,
+        mode,
+        output_options,
+    )
+
+
+def _resolve_output_options(
+    max_chars: int | None, output_format: str | None
+) -> tuple[int, str]:
+    """
+    Resolve (max_chars, output_format) from arguments and the ``query`` config.
+
+    Raises:
+        ValueError: If the output format is not one of OUTPUT_FORMATS.
+    """
+    query_config = get_effective_config()["query"]
+    if max_chars is None:
+        max_chars = int(query_config.get("max_chars", DEFAULT_QUERY_MAX_CHARS))
+    if output_format is None:
+        output_format = query_config.get("output_format", DEFAULT_OUTPUT_FORMAT)
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Invalid output format '{output_format}'. "
+            f"Must be one of: {', '.join(OUTPUT_FORMATS)}."
+        )
+    return max(0, max_chars), output_format
+
+
+# A single token that carries identifier punctuation or inner capitals, e.g.
+# ``np.array``, ``read_csv``, ``useState``, ``std::vector`` or ``--verbose``.
+_IDENTIFIER_RE = re.compile(
+    r"^(--?[\w-]+|[\w$]*(?:[._:$]|::|[a-z][A-Z])[\w.:$]*(?:\(\))?|[\w$]+\(\))$"
+)
+
+
+def _looks_like_identifier(query: str) -> bool:
+    """Return True for queries that look like code identifiers or CLI flags."""
+    return bool(_IDENTIFIER_RE.match(query.strip()))
 
-        score_str = ""
-        if isinstance(score, (int, float)):
-            score_str = f", score={score:.4f}"
-        elif score:
-            score_str = f", score={score}"
 
-        # Embed tool call hint for fetching full content
-        tool_hint = json.dumps(
-            {"tool": "get_full_content", "url": source, "version": item_version}
+def _resolve_search_mode(query: str, mode: str | None) -> str:
+    """
+    Resolve the retrieval mode for a query.
+
+    ``auto`` routes identifier-like queries to BM25 only, where exact token
+    matches are what matters and no query embedding is needed; everything
+    else uses hybrid search.
+
+    Raises:
+        ValueError: If the mode is not one of SEARCH_MODES.
+    """
+    if mode is None:
+        mode = get_effective_config()["query"].get("mode", DEFAULT_QUERY_MODE)
+    if mode not in SEARCH_MODES:
+        raise ValueError(
+            f"Invalid search mode '{mode}'. Must be one of: {', '.join(SEARCH_MODES)}."
+        )
+    if mode == "auto":
+        return "fts" if _looks_like_identifier(query) else "hybrid"
+    return mode
+
+
+def _get_reranker() -> Any:
+    """Build the hybrid fusion reranker selected by ``query.fusion``."""
+    from lancedb.rerankers import LinearCombinationReranker, RRFReranker
+
+    query_config = get_effective_config()["query"]
+    fusion = query_config.get("fusion", DEFAULT_QUERY_FUSION)
+    if fusion == "rrf":
+        return RRFReranker()
+    if fusion == "linear":
+        weight = float(query_config.get("linear_weight", DEFAULT_LINEAR_WEIGHT))
+        return LinearCombinationReranker(weight=weight)
+    raise ValueError(
+        f"Invalid query.fusion '{fusion}'. Must be one of: {', '.join(FUSION_METHODS)}. "
+        "Hint: run `openground config set query.fusion rrf`."
+    )
+
+
+def _run_search(
+    table: "lancedb.table.Table",
+    query: str,
+    query_vec: list[float] | None,
+    mode: str,
+    filter_str: str,
+    top_k: int,
+) -> list[dict[str, Any]]:
+    """Run one query in the given (resolved) mode and return the raw hits."""
+    if mode == "fts":
+        builder = table.search(query, query_type="fts")
+    elif mode == "vector":
+        builder = table.search(query_vec, query_type="vector")
+    else:
+        builder = (
+            table.search(query_type="hybrid")
+            .text(query)
+            .vector(query_vec)
+            .rerank(_get_reranker())
+        )
+    return builder.where(filter_str).limit(top_k).to_list()
+
+
+def _run_profiled_hybrid(
+    table: "lancedb.table.Table",
+    query: str,
+    query_vec: list[float],
+    filter_str: str,
+    top_k: int,
+    timings: dict[str, float] | None,
+) -> list[dict[str, Any]]:
+    """
+    Hybrid search with the vector leg, BM25 leg and fusion timed separately.
+
+    The legs run one after the other so each stage can be attributed; see
+    _fuse_hybrid for how they are combined.
+    """
+    with _stage(timings, "vector"):
+        vector_results = (
+            table.search(query_vec, query_type="vector")
+            .where(filter_str)
+            .limit(top_k)
+            .with_row_id(True)
+            .to_arrow()
+        )
+    with _stage(timings, "fts"):
+        fts_results = (
+            table.search(query, query_type="fts")
+            .where(filter_str)
+            .limit(top_k)
+            .with_row_id(True)
+            .to_arrow()
+        )
+    with _stage(timings, "fusion"):
+        return _fuse_hybrid(query, vector_results, fts_results, top_k)
+
+
+async def _async_run_profiled_hybrid(
+    table: "lancedb.table.AsyncTable",
+    query: str,
+    query_vec: list[float],
+    filter_str: str,
+    top_k: int,
+    timings: dict[str, float] | None,
+) -> list[dict[str, Any]]:
+    """Async variant of _run_profiled_hybrid; the two legs run concurrently."""
+
+    async def leg(stage: str, builder: Any) -> "pa.Table":
+        with _stage(timings, stage):
+            return await builder.where(filter_str).limit(top_k).with_row_id().to_arrow()
+
+    vector_results, fts_results = await asyncio.gather(
+        leg("vector", table.query().nearest_to(query_vec)),
+        leg("fts", table.query().nearest_to_text(query)),
+    )
+    with _stage(timings, "fusion"):
+        return _fuse_hybrid(query, vector_results, fts_results, top_k)
+
+
+def _fuse_hybrid(
+    query: str, vector_results: "pa.Table", fts_results: "pa.Table", top_k: int
+) -> list[dict[str, Any]]:
+    """
+    Fuse the two legs of a hybrid search with the configured reranker.
+
+    Mirrors LanceDB's own hybrid query: each leg's ``_distance`` / ``_score``
+    is min-max normalized before ``rerank_hybrid`` and the raw values are
+    restored afterwards, so the hits match an unprofiled hybrid search. The
+    legs must be fetched with row ids.
+    """
+    raw_scores: dict[str, dict[int, Any]] = {}
+    legs = {"_distance": vector_results, "_score": fts_results}
+    for column, leg in legs.items():
+        if leg.num_rows == 0:
+            continue
+        scores = leg[column]
+        raw_scores[column] = dict(zip(leg["_rowid"].to_pylist(), scores.to_pylist()))
+        legs[column] = leg.set_column(
+            leg.column_names.index(column), column, _normalize_scores(scores)
+        )
+    if not raw_scores:
+        return []
+
+    fused = _get_reranker().rerank_hybrid(query, legs["_distance"], legs["_score"])
+    hits = fused.slice(0, top_k).to_pylist()
+    for hit in hits:
+        row_id = hit.pop("_rowid", None)
+        for column, by_row_id in raw_scores.items():
+            if column in hit:
+                hit[column] = by_row_id.get(row_id)
+    return hits
+
+
+def _normalize_scores(scores: "pa.ChunkedArray") -> "pa.ChunkedArray":
+    """Min-max scale scores to [0, 1], as LanceDB does before hybrid reranking."""
+    import pyarrow.compute as pc
+
+    low, high = pc.min_max(scores).values()
+    spread = pc.subtract(high, low)
+    if spread.as_py() != 0:
+        return pc.divide(pc.subtract(scores, low), spread)
+    if high.as_py() != 0:
+        return pc.subtract(scores, low)
+    return scores
+
+
+async def _async_run_search(
+    table: "lancedb.table.AsyncTable",
+    query: str,
+    query_vec: list[float] | None,
+    mode: str,
+    filter_str: str,
+    top_k: int,
+) -> list[dict[str, Any]]:
+    """Run one query through the async API in the given (resolved) mode."""
+    builder = table.query()
+    if mode != "fts":
+        builder = builder.nearest_to(query_vec)
+    if mode != "vector":
+        builder = builder.nearest_to_text(query)
+    if mode == "hybrid":
+        builder = builder.rerank(_get_reranker())
+    return await builder.where(filter_str).limit(top_k).to_list()
+
+
+def _search_filter(
+    version: str,
+    library_name: str | None,
+    libraries: list[tuple[str, str]] | None = None,
+) -> str:
+    if libraries:
+        return _libraries_filter(libraries)
+    safe_version = escape_sql_string(version)
+    filter_str = f"version = '{safe_version}'"
+    if library_name:
+        safe_name = escape_sql_string(library_name)
+        filter_str += f" AND library_name = '{safe_name}'"
+    return filter_str
+
+
+def _libraries_filter(libraries: Iterable[tuple[str, str]]) -> str:
+    """Build a canonical filter matching any of the (library, version) pairs."""
+    names_by_version: dict[str, set[str]] = {}
+    for name, version in libraries:
+        names_by_version.setdefault(version, set()).add(name)
+    clauses = []
+    for version in sorted(names_by_version):
+        names = ", ".join(
+            f"'{escape_sql_string(name)}'" for name in sorted(names_by_version[version])
         )
+        clauses.append(
+            f"(version = '{escape_sql_string(version)}' AND library_name IN ({names}))"
+        )
+    return " OR ".join(clauses)
+
 
+def _format_search_results(
+    results: list[dict[str, Any]],
+    version: str,
+    max_chars: int = 0,
+    output_format: str = "full",
+) -> str:
+    """
+    Format search hits as a markdown list.
+
+    Hits from the same URL are collapsed into one entry. The "full" format shows
+    each chunk and a get_full_content hint per entry; "compact" trims snippets
+    and gives the hint once. Entries that would take the output past max_chars
+    (0 = unlimited) are dropped and counted in a closing note.
+    """
+    if not results:
+        return "Found 0 matches."
+
+    entries = _collapse_hits(results, version)
+    compact = output_format == "compact"
+
+    lines = [f"Found {len(entries)} match{'es' if len(entries) != 1 else ''}."]
+    if compact:
         lines.append(
-            f'{idx}. **{title}**: "{snippet}" (Source: {source}, Version: {item_version}{score_str})\n'
-            f"   To get full page content: {tool_hint}"
+            "Call get_full_content with a result's url and version for the full page."
         )
+    used = sum(len(line) + 1 for line in lines)
+
+    for idx, entry in enumerate(entries, start=1):
+        text = _format_entry(idx, entry, compact)
+        if max_chars and used + len(text) > max_chars:
+            if idx > 1:
+                omitted = len(entries) - idx + 1
+                lines.append(
+                    f"({omitted} more match{'es' if omitted != 1 else ''} omitted "
+                    f"to stay within {max_chars} characters.)"
+                )
+                break
+            # Always return something: shorten the first entry's snippet instead
+            overflow = used + len(text) - max_chars
+            text = _format_entry(
+                idx, entry, compact, snippet_limit=len(entry["snippet"]) - overflow
+            )
+        lines.append(text)
+        used += len(text) + 1
 
     return "\n".join(lines)
 
 
+def _collapse_hits(results: list[dict[str, Any]], version: str) -> list[dict[str, Any]]:
+    """Merge hits that share a URL and version into one entry, keeping the best hit's rank."""
+    entries: dict[tuple[str, str], dict[str, Any]] = {}
+    for item in results:
+        source = item.get("url") or "unknown"
+        item_version = item.get("version") or version
+        # Return the full chunk so downstream consumers (LLM) see the whole text.
+        snippet = (item.get("content") or "").strip()
+        key = (source, item_version)
+        if key in entries:
+            entries[key]["snippet"] += " [...] " + snippet
+            continue
+        entries[key] = {
+            "title": item.get("title") or "(no title)",
+            "source": source,
+            "version": item_version,
+            "score": item.get("_distance") or item.get("_score"),
+            "snippet": snippet,
+        }
+    return list(entries.values())
+
+
+def _format_entry(
+    idx: int, entry: dict[str, Any], compact: bool, snippet_limit: int | None = None
+) -> str:
+    title, source, item_version = entry["title"], entry["source"], entry["version"]
+    snippet = entry["snippet"]
+    if compact:
+        snippet_limit = min(
+            COMPACT_SNIPPET_CHARS if snippet_limit is None else snippet_limit,
+            COMPACT_SNIPPET_CHARS,
+        )
+    if snippet_limit is not None and len(snippet) > snippet_limit:
+        snippet = snippet[: max(snippet_limit - 3, 0)].rstrip() + "..."
+
+    score = entry["score"]
+    score_str = ""
+    if isinstance(score, (int, float)):
+        score_str = f", score={score:.4f}"
+    elif score:
+        score_str = f", score={score}"
+
+    if compact:
+        return f"{idx}. **{title}** ({source}, {item_version}{score_str})\n   {snippet}"
+
+    # Embed tool call hint for fetching full content
+    tool_hint = json.dumps(
+        {"tool": "get_full_content", "url": source, "version": item_version}
+    )
+    return (
+        f'{idx}. **{title}**: "{snippet}" (Source: {source}, Version: {item_version}{score_str})\n'
+        f"   To get full page content: {tool_hint}"
+    )
+
+
 def list_libraries(
     db_path: Path = DEFAULT_DB_PATH, table_name: str = DEFAULT_TABLE_NAME
 ) -> list[str]:
@@ -164,38 +1139,56 @@ def list_libraries_with_versions(
         Dictionary mapping library names to sorted lists of versions.
         Returns empty dict if no libraries found or table doesn't exist.
     """
+    import pyarrow.compute as pc
+
+    from openground.catalog import get_catalog_table_name, load_catalog_versions
+
     cache_key = (str(db_path), table_name)
-    if cache_key in _metadata_cache:
-        result = _metadata_cache[cache_key]
+    token = (
+        table_version_token(db_path, table_name),
+        table_version_token(db_path, get_catalog_table_name(table_name)),
+    )
+    cached = _metadata_cache.get(cache_key)
+    if cached is not None and cached[0] == token:
+        result = cached[1]
     else:
         table = _get_table(db_path, table_name)
         if table is None:
             return {}
 
-        # Load unique pairs efficiently
-        df = (
-            table.search()
-            .select(["library_name", "version"])
-            .to_pandas()
-            .drop_duplicates()
-            .dropna()
+        versions = load_catalog_versions(db_path, table_name)
+        if versions is None:
+            # Databases created before the catalog existed are backfilled by the
+            # next CLI write; reads only aggregate the documents table meanwhile
+            versions = (
+                table.search()
+                .select(["library_name", "version"])
+                .to_arrow()
+                .group_by(["library_name", "version"])
+                .aggregate([])
+            )
+
+        # Sort and group in Arrow; single-threaded grouping keeps sorted order
+        grouped = (
+            versions.filter(
+                pc.and_(
+                    pc.is_valid(versions["library_name"]),
+                    pc.is_valid(versions["version"]),
+                )
+            )
+            .sort_by([("library_name", "ascending"), ("version", "ascending")])
+            .group_by("library_name", use_threads=False)
+            .aggregate([("version", "list")])
+        )
+        result = dict(
+            zip(
+                grouped["library_name"].to_pylist(),
+                grouped["version_list"].to_pylist(),
+            )
         )
 
-        # Group by library name and collect unique versions
-        result = {}
-        for _, row in df.iterrows():
-            lib_name = row["library_name"]
-            version = row["version"]
-            if lib_name not in result:
-                result[lib_name] = []
-            if version not in result[lib_name]:
-                result[lib_name].append(version)
-
-        for lib_name in result:
-            result[lib_name] = sorted(result[lib_name])
-
-        # Cache the full results
-        _metadata_cache[cache_key] = result
+        # Cache the full results until either table changes
+        _metadata_cache[cache_key] = (token, result)
 
     if search_term:
         term_lower = search_term.lower()
@@ -208,6 +1201,77 @@ def list_libraries_with_versions(
     return dict(sorted(result.items()))
 
 
+def latest_version(versions: Iterable[str]) -> str:
+    """
+    Pick the newest of a library's versions.
+
+    "latest" (what sitemap sources are stored as) wins; otherwise versions are
+    compared naturally, so "v10" is newer than "v9".
+    """
+    versions = list(versions)
+    if DEFAULT_LIBRARY_VERSION in versions:
+        return DEFAULT_LIBRARY_VERSION
+    return max(versions, key=_natural_version_key)
+
+
+def _natural_version_key(version: str) -> list[Any]:
+    # re.split with a group alternates text and digit runs, so positions line up
+    return [
+        int(part) if idx % 2 else part
+        for idx, part in enumerate(re.split(r"(\d+)", version))
+    ]
+
+
+def resolve_libraries(
+    requested: list[tuple[str, str | None]] | None,
+    available: dict[str, list[str]],
+) -> list[tuple[str, str]]:
+    """
+    Pin requested libraries to concrete versions for a multi-library search.
+
+    Args:
+        requested: (library, version) pairs; a version of None selects the
+            library's latest version. None selects every library at its latest.
+        available: Output of list_libraries_with_versions().
+
+    Returns:
+        Deduplicated (library, version) pairs in request order.
+
+    Raises:
+        ValueError: If a library or version is not available.
+    """
+    if requested is None:
+        requested = [(name, None) for name in available]
+    resolved: list[tuple[str, str]] = []
+    for name, version in requested:
+        if name not in available:
+            names = ", ".join(sorted(available)) or "none"
+            raise ValueError(
+                f"Library '{name}' not found. Available libraries: {names}"
+            )
+        if version is None:
+            version = latest_version(available[name])
+        elif version not in available[name]:
+            raise ValueError(
+                f"Version '{version}' not found for library '{name}'. "
+                f"Available versions: {', '.join(available[name])}"
+            )
+        if (name, version) not in resolved:
+            resolved.append((name, version))
+    return resolved
+
+
+async def async_list_libraries_with_versions(
+    db_path: Path = DEFAULT_DB_PATH,
+    table_name: str = DEFAULT_TABLE_NAME,
+    search_term: str | None = None,
+) -> dict[str, list[str]]:
+    """Async variant of list_libraries_with_versions(); reads the catalog in a thread."""
+    return await asyncio.to_thread(
+        list_libraries_with_versions, db_path, table_name, search_term
+    )
+
+
 def get_full_content(
     url: str,
     version: str,
@@ -217,6 +1281,10 @@ def get_full_content(
     """
     Retrieve the full content of a document by its URL and version.
 
+    Served from the page store with one indexed lookup. Pages ingested before
+    the page store existed are rebuilt from their chunks with the overlap
+    between consecutive chunks removed.
+
     Args:
         url: URL of the document to retrieve.
         version: Version of the document to retrieve.
@@ -226,29 +1294,123 @@ def get_full_content(
     Returns:
         Formatted markdown string with title, source URL, and full content.
     """
+    from openground.page_store import get_pages_table_name
+
+    filter_str = _page_filter(url, version)
+    pages_table = _get_table(db_path, get_pages_table_name(table_name))
+    if pages_table is not None:
+        pages = (
+            pages_table.search()
+            .where(filter_str)
+            .select(["title", "content"])
+            .limit(1)
+            .to_list()
+        )
+        if pages:
+            return _format_page(url, version, pages[0]["title"], pages[0]["content"])
+
     table = _get_table(db_path, table_name)
     if table is None:
         return f"No content found for URL: {url}"
 
-    # Query all chunks for this URL and version
-    safe_url = _escape_sql_string(url)
-    safe_version = _escape_sql_string(version)
-    df = (
+    # Fall back to all chunks for this URL and version
+    chunks = (
         table.search()
-        .where(f"url = '{safe_url}' AND version = '{safe_version}'")
+        .where(filter_str)
+        .select(["title", "content", "chunk_index"])
+        .to_arrow()
+    )
+    return _format_full_content(url, version, chunks)
+
+
+async def async_get_full_content(
+    url: str,
+    version: str,
+    db_path: Path = DEFAULT_DB_PATH,
+    table_name: str = DEFAULT_TABLE_NAME,
+) -> str:
+    """Async variant of get_full_content() built on LanceDB's async API."""
+    from openground.page_store import get_pages_table_name
+
+    filter_str = _page_filter(url, version)
+    pages_table = await _get_async_table(db_path, get_pages_table_name(table_name))
+    if pages_table is not None:
+        pages = await (
+            pages_table.query()
+            .where(filter_str)
+            .select(["title", "content"])
+            .limit(1)
+            .to_list()
+        )
+        if pages:
+            return _format_page(url, version, pages[0]["title"], pages[0]["content"])
+
+    table = await _get_async_table(db_path, table_name)
+    if table is None:
+        return f"No content found for URL: {url}"
+
+    chunks = await (
+        table.query()
+        .where(filter_str)
         .select(["title", "content", "chunk_index"])
-        .to_pandas()
+        .to_arrow()
     )
+    return _format_full_content(url, version, chunks)
+
+
+def _page_filter(url: str, version: str) -> str:
+    safe_url = escape_sql_string(url)
+    safe_version = escape_sql_string(version)
+    return f"url = '{safe_url}' AND version = '{safe_version}'"
+
+
+def _format_page(url: str, version: str, title: str | None, content: str) -> str:
+    return (
+        f"# {title or '(no title)'}\n\nSource: {url}\nVersion: {version}\n\n{content}"
+    )
+
+
+def _format_full_content(url: str, version: str, chunks: "pa.Table") -> str:
+    """Rebuild a page from its chunks in chunk_index order under its title."""
+    import pyarrow.compute as pc
 
-    if df.empty:
+    if chunks.num_rows == 0:
         return f"No content found for URL: {url} (version: {version})"
 
-    # Sort by chunk_index and concatenate content
-    df = df.sort_values("chunk_index")
-    full_content = "\n\n".join(df["content"].tolist())
+    chunks = chunks.take(pc.sort_indices(chunks["chunk_index"]))
+    full_content = _merge_chunks(chunks["content"].to_pylist())
+    return _format_page(url, version, chunks["title"][0].as_py(), full_content)
 
-    title = df.iloc[0].get("title", "(no title)")
-    return f"# {title}\n\nSource: {url}\nVersion: {version}\n\n{full_content}"
+
+# Shorter suffix/prefix matches are too likely to be coincidental
+_MIN_CHUNK_OVERLAP = 10
+
+
+def _merge_chunks(contents: list[str]) -> str:
+    """
+    Join consecutive chunks, dropping the text each chunk repeats from the last.
+
+    Chunks share up to ``embeddings.chunk_overlap`` characters; where no overlap
+    is found the chunks are joined with a blank line, as the splitter removed
+    the separator there.
+    """
+    max_overlap = int(get_effective_config()["embeddings"]["chunk_overlap"])
+    merged = contents[0] if contents else ""
+    for content in contents[1:]:
+        limit = min(len(merged), len(content), max_overlap)
+        overlap = next(
+            (
+                size
+                for size in range(limit, _MIN_CHUNK_OVERLAP - 1, -1)
+                if merged.endswith(content[:size])
+            ),
+            0,
+        )
+        if overlap:
+            merged += content[overlap:]
+        else:
+            merged += "\n\n" + content
+    return merged
 
 
 def get_library_stats(
@@ -257,43 +1419,59 @@ def get_library_stats(
     db_path: Path = DEFAULT_DB_PATH,
     table_name: str = DEFAULT_TABLE_NAME,
 ) -> dict | None:
-    """Get statistics for a library version (chunk count, unique URLs, etc.)."""
+    """
+    Get statistics for a library version (chunk count, unique URLs, etc.).
+
+    Counts come from the library catalog, or from the documents table if the
+    database has no catalog yet; only a handful of first-chunk rows are read
+    from the documents table for sample titles.
+    """
+    import pyarrow.compute as pc
+
+    from openground.catalog import count_library_version, get_catalog_table_name
+
+    if not library_version_exists(library_name, version, db_path, table_name):
+        return None
     table = _get_table(db_path, table_name)
     if table is None:
         return None
 
-    safe_name = _escape_sql_string(library_name)
-    safe_version = _escape_sql_string(version)
+    safe_name = escape_sql_string(library_name)
+    safe_version = escape_sql_string(version)
     filter_str = f"library_name = '{safe_name}' AND version = '{safe_version}'"
 
-    # Use count_rows for chunk count
-    chunk_count = table.count_rows(filter=filter_str)
-    if chunk_count == 0:
+    catalog = _get_table(db_path, get_catalog_table_name(table_name))
+    if catalog is None:
+        chunk_count, page_count = count_library_version(table, library_name, version)
+        entries = [{"chunk_count": chunk_count, "page_count": page_count}]
+    else:
+        entries = (
+            catalog.search()
+            .where(filter_str)
+            .select(["chunk_count", "page_count"])
+            .limit(1)
+            .to_list()
+        )
+    if not entries:
         return None
 
-    # Get sample titles and unique URL count more efficiently
-    # We only need a few titles, so we can limit the search
-    df_titles = (
-        table.search().where(filter_str).select(["title", "url"]).limit(500).to_pandas()
+    # One row per page: the first chunk carries the page title
+    title_column = (
+        table.search()
+        .where(f"{filter_str} AND chunk_index = 0")
+        .select(["title"])
+        .limit(STATS_TITLE_SAMPLE)
+        .to_arrow()["title"]
     )
-
-    titles = [t for t in df_titles["title"].unique().tolist() if t and str(t).strip()][
-        :5
-    ]
-
-    unique_urls = df_titles["url"].nunique()
-    if chunk_count > 500:
-        # If there are more chunks, unique_urls might be higher than our sample
-        # For now, we'll just note it's at least this many, or we can load all URLs
-        # which is usually okay as URLs are small strings.
-        df_all_urls = table.search().where(filter_str).select(["url"]).to_pandas()
-        unique_urls = df_all_urls["url"].nunique()
+    # unique() keeps first-seen order; blank titles are dropped first
+    non_blank = pc.not_equal(pc.utf8_trim_whitespace(title_column), "")
+    titles = pc.unique(title_column.filter(non_blank)).to_pylist()[:5]
 
     return {
         "library_name": library_name,
         "version": version,
-        "chunk_count": chunk_count,
-        "unique_urls": unique_urls,
+        "chunk_count": entries[0]["chunk_count"],
+        "unique_urls": entries[0]["page_count"],
         "titles": titles,
     }
 
@@ -309,8 +1487,8 @@ def delete_library(
     if table is None:
         return 0
 
-    safe_name = _escape_sql_string(library_name)
-    safe_version = _escape_sql_string(version)
+    safe_name = escape_sql_string(library_name)
+    safe_version = escape_sql_string(version)
 
     # Get count before deletion
     count = table.count_rows(
@@ -319,6 +1497,12 @@ def delete_library(
 
     # Delete rows
     table.delete(f"library_name = '{safe_name}' AND version = '{safe_version}'")
+
+    from openground.catalog import remove_catalog_entry
+    from openground.page_store import delete_pages
+
+    delete_pages(library_name, version, db_path, table_name)
+    remove_catalog_entry(library_name, version, db_path, table_name)
     return count
 
 
@@ -349,17 +1533,15 @@ def delete_urls(
     if not urls:
         return 0
 
-    safe_name = _escape_sql_string(library_name)
-    safe_version = _escape_sql_string(version)
-
-    # Build WHERE clause with OR conditions for URLs to delete
-    safe_urls = [_escape_sql_string(url) for url in urls]
-    url_conditions = " OR ".join(f"url = '{url}'" for url in safe_urls)
-    filter_str = f"library_name = '{safe_name}' AND version = '{safe_version}' AND ({url_conditions})"
+    filter_str = url_filter(library_name, version, urls)
 
     count = table.count_rows(filter=filter_str)
 
     table.delete(filter_str)
+
+    from openground.page_store import delete_pages
+
+    delete_pages(library_name, version, db_path, table_name, urls=urls)
     return count
 
 
@@ -381,5 +1563,6 @@ def library_version_exists(
     Returns:
         True if library version exists, False otherwise
     """
-    stats = get_library_stats(library_name, version, db_path, table_name)
-    return stats is not None
+    # Answered from the (cached) library catalog, without scanning documents
+    libraries = list_libraries_with_versions(db_path, table_name)
+    return version in libraries.get(library_name, [])
@@ -0,0 +1,159 @@
+"""
+Bounded LRU + TTL cache for search results, optionally persisted to SQLite.
+
+Keys include the table version token, so a write to the documents table makes
+older entries unreachable instead of serving stale results. The SQLite store is
+shared by every openground process and is best effort: when it is locked or
+broken, lookups and stores fall back to the in-memory cache.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from pathlib import Path
+from typing import Any
+
+# Seconds a SQLite statement waits for another process's write lock
+_BUSY_TIMEOUT_SECONDS = 1.0
+# Persisted stores between trims of expired and least recent rows
+_TRIM_EVERY_STORES = 64
+
+
+class SearchResultCache:
+    """Thread-safe LRU cache with per-entry TTL and optional SQLite persistence."""
+
+    def __init__(
+        self, max_size: int, ttl_seconds: float, persist_path: Path | None = None
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._stores_since_trim = 0
+        if persist_path is not None:
+            try:
+                self._conn = _open_store(persist_path)
+            except sqlite3.Error:
+                self._conn = None
+
+    @property
+    def persistent(self) -> bool:
+        """Whether lookups and stores also go to the SQLite store."""
+        return self._conn is not None
+
+    def _expired(self, created: float) -> bool:
+        return time.time() - created > self.ttl_seconds
+
+    def get(self, key: Hashable, load: bool = True) -> Any | None:
+        """
+        Return the cached value for key, or None if missing or expired.
+
+        With load=False only the in-memory entries are checked, which never
+        touches SQLite.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and load and self._conn is not None:
+                entry = self._load(key)
+                if entry is not None:
+                    self._entries[key] = entry
+            if entry is None:
+                return None
+            created, value = entry
+            if self._expired(created):
+                self._entries.pop(key, None)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entries over max_size."""
+        if self.max_size <= 0:
+            return
+        created = time.time()
+        with self._lock:
+            self._entries[key] = (created, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            if self._conn is not None:
+                self._store(key, created, value)
+
+    def clear(self) -> None:
+        """Drop all in-memory and persisted entries."""
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM search_results")
+
+    def close(self) -> None:
+        """Close the SQLite connection; the cache keeps working in memory only."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self, key: Hashable) -> tuple[float, Any] | None:
+        assert self._conn is not None
+        try:
+            row = self._conn.execute(
+                "SELECT created, value FROM search_results WHERE key = ?",
+                (json.dumps(key),),
+            ).fetchone()
+        except sqlite3.Error:
+            # e.g. "database is locked" by another process: treat as a miss
+            return None
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def _store(self, key: Hashable, created: float, value: Any) -> None:
+        assert self._conn is not None
+        self._stores_since_trim += 1
+        trim = self._stores_since_trim >= _TRIM_EVERY_STORES
+        try:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO search_results (key, created, value) "
+                    "VALUES (?, ?, ?)",
+                    (json.dumps(key), created, json.dumps(value)),
+                )
+                if trim:
+                    self._conn.execute(
+                        "DELETE FROM search_results WHERE created < ? OR key NOT IN "
+                        "(SELECT key FROM search_results ORDER BY created DESC "
+                        "LIMIT ?)",
+                        (created - self.ttl_seconds, self.max_size),
+                    )
+        except sqlite3.Error:
+            # The entry stays in memory; the next store retries the trim
+            return
+        if trim:
+            self._stores_since_trim = 0
+
+
+def _open_store(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(
+        str(path), timeout=_BUSY_TIMEOUT_SECONDS, check_same_thread=False
+    )
+    try:
+        # WAL lets readers in other server processes proceed during a write
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_results "
+                "(key TEXT PRIMARY KEY, created REAL NOT NULL, value TEXT NOT NULL)"
+            )
+    except sqlite3.Error:
+        conn.close()
+        raise
+    return conn
@@ -1,7 +1,11 @@
+import argparse
+import asyncio
 import os
 import sys
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 
 # Silence stdout pollution from dependencies
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
@@ -10,15 +14,151 @@ os.environ["FAST_EMBED_IGNORE_TRANSFORMERS_LOGS"] = "1"
 
 from pathlib import Path
 
+import anyio
 from fastmcp import FastMCP
-
-from openground.config import get_effective_config
+from fastmcp.exceptions import ToolError
+from fastmcp.server.middleware import Middleware
+
+from openground.admission import ToolBusyError, ToolLimiter
+from openground.config import (
+    DEFAULT_DB_WATCH_POLL_SECONDS,
+    DEFAULT_MAX_CONCURRENT_TOOLS,
+    DEFAULT_MAX_QUEUED_TOOLS,
+    DEFAULT_SERVER_HOST,
+    DEFAULT_SERVER_HTTP_PATH,
+    DEFAULT_SERVER_MAX_CONNECTIONS,
+    DEFAULT_SERVER_PORT,
+    DEFAULT_SERVER_WORKER_THREADS,
+    DEFAULT_TOOL_CONCURRENCY,
+    DEFAULT_TOOL_QUEUE_TIMEOUT_SECONDS,
+    DEFAULT_WARMUP_WAIT_SECONDS,
+    get_effective_config,
+    get_server_url,
+)
 from openground.query import (
-    get_full_content,
+    SEARCH_MODES,
+    async_get_full_content,
+    async_list_libraries_with_versions,
+    async_refresh_table_caches,
+    async_search,
+    async_search_many,
+    async_warmup,
     list_libraries_with_versions,
-    search,
+    prefetch_table_files,
+    refresh_table_caches,
+    resolve_libraries,
 )
-from openground.stats import increment_tool_call
+from openground.stats import (
+    format_prometheus_metrics,
+    increment_tool_call,
+    load_stats,
+    record_query_timings,
+    record_tool_result,
+    summarize_tool_metrics,
+)
+from openground.watcher import watch_db_path
+
+_limiter: ToolLimiter | None = None
+
+
+def _get_limiter() -> ToolLimiter:
+    """Get the tool call limiter, built once from the server config."""
+    global _limiter
+    if _limiter is None:
+        server_config = _get_config()["server"]
+        _limiter = ToolLimiter(
+            max_concurrent=server_config.get(
+                "max_concurrent_tools", DEFAULT_MAX_CONCURRENT_TOOLS
+            ),
+            max_queued=server_config.get("max_queued_tools", DEFAULT_MAX_QUEUED_TOOLS),
+            queue_timeout=server_config.get(
+                "queue_timeout_seconds", DEFAULT_TOOL_QUEUE_TIMEOUT_SECONDS
+            ),
+            per_tool=server_config.get("tool_concurrency", DEFAULT_TOOL_CONCURRENCY),
+        )
+    return _limiter
+
+
+class _MetricsMiddleware(Middleware):
+    """Record latency, result size and errors of every tool call."""
+
+    async def on_call_tool(self, context, call_next):
+        start = time.perf_counter()
+        try:
+            result = await call_next(context)
+        except Exception:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            record_tool_result(context.message.name, elapsed_ms, 0, error=True)
+            raise
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        result_chars = sum(
+            len(getattr(block, "text", "") or "") for block in result.content
+        )
+        record_tool_result(context.message.name, elapsed_ms, result_chars)
+        return result
+
+
+class _AdmissionMiddleware(Middleware):
+    """Run tool calls through the limiter; reject them as busy when it is full."""
+
+    async def on_call_tool(self, context, call_next):
+        limiter = _get_limiter()
+        try:
+            if context.message.name in _WARMUP_GATED_TOOLS and not _ready.is_set():
+                # Waiting for warmup takes a queue place, but no slot or thread
+                async with limiter.queued_wait():
+                    await _wait_until_ready()
+            async with limiter.slot(context.message.name):
+                return await call_next(context)
+        except ToolBusyError as e:
+            raise ToolError(str(e)) from None
+
+
+async def _refresh_caches(db_path: Path, table_name: str) -> None:
+    """Reload changed table handles and the library listing off the request path."""
+    await asyncio.to_thread(refresh_table_caches, db_path, table_name)
+    await async_refresh_table_caches(db_path, table_name)
+
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP):
+    """
+    Bound the threads used for blocking work (embedding, catalog reads) and
+    watch db_path so writes from `openground add` refresh caches in the background.
+    """
+    config = _get_config()
+    server_config = config["server"]
+    workers = server_config.get("worker_threads", DEFAULT_SERVER_WORKER_THREADS)
+    executor = ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="openground-worker"
+    )
+    asyncio.get_running_loop().set_default_executor(executor)
+
+    watcher = None
+    stop_watching = asyncio.Event()
+    if server_config.get("watch_db", True):
+        db_path = Path(config["db_path"]).expanduser()
+        table_name = config["table_name"]
+        watcher = asyncio.create_task(
+            watch_db_path(
+                db_path,
+                table_name,
+                lambda: _refresh_caches(db_path, table_name),
+                poll_interval=server_config.get(
+                    "watch_poll_seconds", DEFAULT_DB_WATCH_POLL_SECONDS
+                ),
+                stop_event=stop_watching,
+            )
+        )
+    try:
+        yield
+    finally:
+        if watcher is not None:
+            stop_watching.set()
+            # fastmcp exits the lifespan inside a cancelled anyio scope
+            with anyio.CancelScope(shield=True):
+                await watcher
+
 
 mcp = FastMCP(
     "openground Documentation Search",
@@ -28,9 +168,17 @@ mcp = FastMCP(
     1. Whenever a user asks about specific libraries or frameworks, you MUST first check if official documentation is available using this server.
     2. Do NOT rely on your internal training data for syntax or API details if you can verify them here.
     3. Always start by listing or searching available libraries to confirm coverage.
-    4. If the library exists, use `search_documents_tool` to find the answer.""",
+    4. If the library exists, use `search_documents_tool` to find the answer.
+    5. When you have several related questions about one library, ask them together with `search_documents_batch_tool`.
+    6. When a question spans several libraries, search them together with `search_libraries_tool`.""",
+    # Metrics wrap admission so queueing time and busy rejections are counted
+    middleware=[_MetricsMiddleware(), _AdmissionMiddleware()],
+    lifespan=_lifespan,
 )
 
+# Maximum number of queries accepted by search_documents_batch_tool
+MAX_BATCH_QUERIES = 10
+
 _config = None
 
 
@@ -42,14 +190,71 @@ def _get_config():
     return _config
 
 
+class _Readiness:
+    """Warmup completion, set from the warmup thread and awaited on the event loop."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._done = True
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._event: asyncio.Event | None = None
+
+    def is_set(self) -> bool:
+        return self._done
+
+    def clear(self) -> None:
+        with self._lock:
+            self._done = False
+            if self._event is not None:
+                self._event.clear()
+
+    def set(self) -> None:
+        """Mark warmup finished and wake waiters; safe to call from any thread."""
+        with self._lock:
+            self._done = True
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._event.set)
+
+    async def wait(self) -> None:
+        """Wait on the running event loop until set() is called."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._loop is not loop:
+                self._loop = loop
+                self._event = asyncio.Event()
+            if self._done:
+                self._event.set()
+            event = self._event
+        await event.wait()
+
+
+# Set once startup warmup has finished (or was never started); searches wait
+# for it in the admission queue, so that they do not race the warmup for the
+# embedding model.
+_ready = _Readiness()
+_WARMUP_GATED_TOOLS = frozenset(
+    {"search_documents_tool", "search_documents_batch_tool", "search_libraries_tool"}
+)
+
+
+def _parse_library_specs(entries: list[str]) -> list[tuple[str, str | None]]:
+    """Parse "name" or "name@version" entries into (library, version) pairs."""
+    libraries = []
+    for entry in entries:
+        name, _, version = entry.partition("@")
+        libraries.append((name.strip(), version.strip() or None))
+    return libraries
+
+
 def _pre_load_resources():
-    """Warm up caches and pre-load embedding models in the background."""
+    """Warm up caches, embedding model and search indexes in the background."""
     start_time = time.time()
     sys.stderr.write("[info] Background initialization started...\n")
     try:
         config = _get_config()
         db_path = Path(config["db_path"]).expanduser()
         table_name = config["table_name"]
+        server_config = config["server"]
 
         # Warm up metadata cache
         list_libraries_with_versions(db_path=db_path, table_name=table_name)
@@ -59,6 +264,26 @@ def _pre_load_resources():
 
         generate_embeddings(["warmup"], show_progress=False)
 
+        if server_config.get("warmup", True):
+            # Pull index and data files into the page cache, then run one
+            # search per library so table handles and indexes are loaded
+            max_bytes = int(server_config.get("warmup_prefetch_mb", 0)) * 1024 * 1024
+            prefetched = prefetch_table_files(db_path, table_name, max_bytes)
+            searches = asyncio.run(
+                async_warmup(
+                    db_path=db_path,
+                    table_name=table_name,
+                    libraries=_parse_library_specs(
+                        server_config.get("warmup_libraries", [])
+                    )
+                    or None,
+                )
+            )
+            sys.stderr.write(
+                f"[info] Prefetched {prefetched / (1024 * 1024):.1f} MB and ran "
+                f"{searches} warmup searches.\n"
+            )
+
         duration = time.time() - start_time
         sys.stderr.write(
             f"[info] Background initialization complete (took {duration:.2f}s). Server is fully ready.\n"
@@ -67,13 +292,54 @@ def _pre_load_resources():
         # Background tasks should never crash the server
         sys.stderr.write(f"[error] Background initialization failed: {e}\n")
         pass
+    finally:
+        _ready.set()
+
+
+async def _wait_until_ready() -> None:
+    """Wait (bounded by server.warmup_wait_seconds) for startup warmup to finish."""
+    if _ready.is_set():
+        return
+    timeout = _get_config()["server"].get(
+        "warmup_wait_seconds", DEFAULT_WARMUP_WAIT_SECONDS
+    )
+    try:
+        await asyncio.wait_for(_ready.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def _check_library_version(
+    library_name: str, version: str, db_path: Path, table_name: str
+) -> str | None:
+    """Return an error message if the library version is not available, else None."""
+    # Uses the metadata cache if warmed up
+    available_libraries = await async_list_libraries_with_versions(
+        db_path=db_path,
+        table_name=table_name,
+    )
+
+    if library_name not in available_libraries:
+        available_lib_names = ", ".join(sorted(available_libraries.keys()))
+        if available_lib_names:
+            return f"Library '{library_name}' not found. Available libraries: {available_lib_names}"
+        else:
+            return f"Library '{library_name}' not found. No libraries are currently available in the database."
+
+    available_versions = available_libraries[library_name]
+    if version not in available_versions:
+        versions_str = ", ".join(available_versions)
+        return f"Version '{version}' not found for library '{library_name}'. Available versions: {versions_str}"
+
+    return None
 
 
 @mcp.tool
-def search_documents_tool(
+async def search_documents_tool(
     query: str,
     library_name: str,
     version: str,
+    mode: str | None = None,
 ) -> str:
     """
     Search the official documentation knowledge base to answer user questions.
@@ -83,44 +349,140 @@ def search_documents_tool(
 
     First call list_libraries_tool to see what libraries and versions are available,
     then filter by library_name and version.
+
+    Optionally set mode to "fts" for exact keyword/identifier lookups, "vector"
+    for purely semantic matches, or "hybrid"/"auto". Omit it to use the default.
     """
     increment_tool_call("search_documents_tool")
     config = _get_config()
     db_path = Path(config["db_path"]).expanduser()
     table_name = config["table_name"]
 
-    # Validate that library and version exist (uses cache if warmed up)
-    available_libraries = list_libraries_with_versions(
+    error_message = await _check_library_version(
+        library_name, version, db_path, table_name
+    )
+    if error_message:
+        return error_message
+
+    if mode is not None and mode not in SEARCH_MODES:
+        return f"Invalid mode '{mode}'. Must be one of: {', '.join(SEARCH_MODES)}."
+
+    # Library and version exist, proceed with search
+    timings: dict[str, float] = {}
+    result = await async_search(
+        query=query,
+        version=version,
         db_path=db_path,
         table_name=table_name,
+        library_name=library_name,
+        top_k=config["query"]["top_k"],
+        mode=mode,
+        timings=timings,
+        split_hybrid=config["server"].get("profile_hybrid", False),
     )
+    record_query_timings(timings)
+    return result
 
-    if library_name not in available_libraries:
-        available_lib_names = ", ".join(sorted(available_libraries.keys()))
-        if available_lib_names:
-            return f"Library '{library_name}' not found. Available libraries: {available_lib_names}"
-        else:
-            return f"Library '{library_name}' not found. No libraries are currently available in the database."
 
-    available_versions = available_libraries[library_name]
-    if version not in available_versions:
-        versions_str = ", ".join(available_versions)
-        return f"Version '{version}' not found for library '{library_name}'. Available versions: {versions_str}"
+@mcp.tool
+async def search_documents_batch_tool(
+    queries: list[str],
+    library_name: str,
+    version: str,
+) -> str:
+    """
+    Search the documentation of one library version for several queries at once.
 
-    # Library and version exist, proceed with search
-    return search(
-        query=query,
+    Prefer this over repeated search_documents_tool calls when you have multiple
+    related questions: the queries are embedded together and searched
+    concurrently. Results are grouped under a heading per query.
+    """
+    increment_tool_call("search_documents_batch_tool")
+    if not queries:
+        return "No queries provided."
+    if len(queries) > MAX_BATCH_QUERIES:
+        return f"Too many queries ({len(queries)}). Send at most {MAX_BATCH_QUERIES} per call."
+
+    config = _get_config()
+    db_path = Path(config["db_path"]).expanduser()
+    table_name = config["table_name"]
+
+    error_message = await _check_library_version(
+        library_name, version, db_path, table_name
+    )
+    if error_message:
+        return error_message
+
+    # Share the response budget between the queries
+    max_chars = int(config["query"].get("max_chars", 0))
+    results = await async_search_many(
+        queries=queries,
         version=version,
         db_path=db_path,
         table_name=table_name,
         library_name=library_name,
         top_k=config["query"]["top_k"],
-        show_progress=False,
+        max_chars=max_chars // len(queries) if max_chars else 0,
+    )
+    return "\n\n".join(
+        f"## Query {idx}: {query}\n{result}"
+        for idx, (query, result) in enumerate(zip(queries, results), start=1)
     )
 
 
 @mcp.tool
-def list_libraries_tool() -> dict[str, list[str]]:
+async def search_libraries_tool(
+    query: str,
+    libraries: list[str] | None = None,
+    mode: str | None = None,
+) -> str:
+    """
+    Search the documentation of several libraries at once, with one ranked result list.
+
+    Use this instead of one search_documents_tool call per library when a
+    question spans a stack (for example fastapi + pydantic + sqlalchemy).
+    Each entry of libraries is a library name, meaning its latest version, or
+    "name@version". Omit libraries to search the latest version of every library.
+    """
+    increment_tool_call("search_libraries_tool")
+    config = _get_config()
+    db_path = Path(config["db_path"]).expanduser()
+    table_name = config["table_name"]
+
+    if mode is not None and mode not in SEARCH_MODES:
+        return f"Invalid mode '{mode}'. Must be one of: {', '.join(SEARCH_MODES)}."
+
+    available = await async_list_libraries_with_versions(
+        db_path=db_path, table_name=table_name
+    )
+    if not available:
+        return "No libraries are currently available in the database."
+    try:
+        pairs = resolve_libraries(
+            _parse_library_specs(libraries) if libraries else None, available
+        )
+    except ValueError as e:
+        return str(e)
+
+    timings: dict[str, float] = {}
+    result = await async_search(
+        query=query,
+        version="",
+        db_path=db_path,
+        table_name=table_name,
+        top_k=config["query"]["top_k"],
+        mode=mode,
+        timings=timings,
+        split_hybrid=config["server"].get("profile_hybrid", False),
+        libraries=pairs,
+    )
+    record_query_timings(timings)
+    searched = ", ".join(f"{name}@{version}" for name, version in pairs)
+    return f"Searched: {searched}\n{result}"
+
+
+@mcp.tool
+async def list_libraries_tool() -> dict[str, list[str]]:
     """
     Retrieve a dictionary of available documentation libraries/frameworks with their versions.
 
@@ -134,7 +496,7 @@ def list_libraries_tool() -> dict[str, list[str]]:
     """
     increment_tool_call("list_libraries_tool")
     config = _get_config()
-    return list_libraries_with_versions(
+    return await async_list_libraries_with_versions(
         db_path=Path(config["db_path"]).expanduser(),
         table_name=config["table_name"],
         search_term=None,
@@ -142,7 +504,7 @@ def list_libraries_tool() -> dict[str, list[str]]:
 
 
 @mcp.tool
-def get_full_content_tool(url: str, version: str) -> str:
+async def get_full_content_tool(url: str, version: str) -> str:
     """
     Retrieve the full content of a document by its URL and version.
 
@@ -152,7 +514,7 @@ def get_full_content_tool(url: str, version: str) -> str:
     """
     increment_tool_call("get_full_content_tool")
     config = _get_config()
-    return get_full_content(
+    return await async_get_full_content(
         url=url,
         version=version,
         db_path=Path(config["db_path"]).expanduser(),
@@ -160,11 +522,88 @@ def get_full_content_tool(url: str, version: str) -> str:
     )
 
 
-def run_server():
+@mcp.tool
+async def server_stats_tool() -> dict:
+    """
+    Report per-tool call counts, errors, latency percentiles and result sizes.
+
+    Read-only; for monitoring the server itself, not for answering questions.
+    """
+    increment_tool_call("server_stats_tool")
+    stats = await asyncio.to_thread(load_stats)
+    limiter = _get_limiter()
+    return {
+        "tools": summarize_tool_metrics(stats["tool_metrics"]),
+        "running_calls": limiter.running,
+        "queued_calls": limiter.queued,
+    }
+
+
+async def _metrics_endpoint(request):
+    """Serve tool metrics in the Prometheus text format."""
+    from starlette.responses import PlainTextResponse
+
+    stats = await asyncio.to_thread(load_stats)
+    return PlainTextResponse(
+        format_prometheus_metrics(stats["tool_metrics"]),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse openground-mcp arguments; http options default to the server config."""
+    server_config = _get_config()["server"]
+    parser = argparse.ArgumentParser(
+        prog="openground-mcp", description="openground MCP server."
+    )
+    parser.add_argument(
+        "--transport",
+        choices=("stdio", "http"),
+        default="stdio",
+        help="stdio (one server per client, the default) or http (one shared server).",
+    )
+    parser.add_argument(
+        "--host",
+        default=server_config.get("host", DEFAULT_SERVER_HOST),
+        help="Address to bind in http mode.",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=server_config.get("port", DEFAULT_SERVER_PORT),
+        help="Port to bind in http mode.",
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=server_config.get("max_connections", DEFAULT_SERVER_MAX_CONNECTIONS),
+        help="Concurrent HTTP connections before new ones are refused with 503.",
+    )
+    return parser.parse_args(argv)
+
+
+def run_server(argv: list[str] | None = None):
     """Entry point for the MCP server."""
+    args = _parse_args(argv)
+
+    _ready.clear()
     threading.Thread(target=_pre_load_resources, daemon=True).start()
 
-    mcp.run(transport="stdio")
+    if args.transport == "http":
+        if _get_config()["server"].get("metrics_endpoint", True):
+            mcp.custom_route("/metrics", methods=["GET"])(_metrics_endpoint)
+        sys.stderr.write(
+            f"[info] Serving MCP over HTTP at {get_server_url(args.host, args.port)}\n"
+        )
+        mcp.run(
+            transport="http",
+            host=args.host,
+            port=args.port,
+            path=DEFAULT_SERVER_HTTP_PATH,
+            uvicorn_config={"limit_concurrency": args.max_connections},
+        )
+    else:
+        mcp.run(transport="stdio")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,91 @@
+"""
+Single-flight coalescing of identical in-flight calls.
+
+When several callers ask for the same key at the same time, only the first one
+runs the work; the others wait for it and receive the same result (or
+exception). Once the call finishes the key is free again, so later callers run
+(or hit a cache) as usual.
+"""
+
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from concurrent.futures import Future
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesce identical concurrent calls made from threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Run fn for key, or wait for the call already running for key.
+
+        Returns:
+            The result of the shared call; its exception is raised in every caller.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """Coalesce identical concurrent calls made from coroutines."""
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await fn() for key, or join the call already running for key.
+
+        The work runs in its own task, so a caller that is cancelled (e.g. a
+        client that disconnects) does not cancel it for the others.
+
+        Returns:
+            The result of the shared call; its exception is raised in every caller.
+        """
+        loop = asyncio.get_running_loop()
+        task = self._calls.get(key)
+        # A task left behind by a closed event loop can never be awaited here
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Retrieved here so a failure nobody waited for is not logged as lost
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,48 @@
+"""Helpers for building LanceDB SQL WHERE clauses from untrusted strings."""
+
+from collections.abc import Iterable
+
+
+def escape_sql_string(value: str) -> str:
+    """
+    Escape a string value for safe use in LanceDB SQL WHERE clauses.
+
+    This function escapes single quotes and backslashes to prevent SQL injection.
+    Note: LanceDB uses DataFusion which parses SQL, so proper escaping is critical.
+
+    Args:
+        value: The string value to escape
+
+    Returns:
+        Escaped string safe for use in SQL string literals
+    """
+    # Remove null bytes (can cause string truncation in some parsers)
+    value = value.replace("\x00", "")
+    # Escape backslashes first (must be done before escaping quotes)
+    value = value.replace("\\", "\\\\")
+    # Escape single quotes (SQL standard: ' becomes '')
+    value = value.replace("'", "''")
+    return value
+
+
+def library_version_filter(library_name: str, version: str) -> str:
+    """Build a WHERE clause matching every row of one library version."""
+    safe_name = escape_sql_string(library_name)
+    safe_version = escape_sql_string(version)
+    return f"library_name = '{safe_name}' AND version = '{safe_version}'"
+
+
+def url_filter(library_name: str, version: str, urls: Iterable[str]) -> str:
+    """
+    Build a WHERE clause matching the given URLs of one library version.
+
+    Uses a single IN list, which DataFusion evaluates as a set lookup rather
+    than a chain of OR comparisons per row.
+    """
+    safe_name = escape_sql_string(library_name)
+    safe_version = escape_sql_string(version)
+    url_list = ", ".join(f"'{escape_sql_string(url)}'" for url in urls)
+    return (
+        f"library_name = '{safe_name}' AND version = '{safe_version}' "
+        f"AND url IN ({url_list})"
+    )
@@ -1,26 +1,78 @@
+"""
+Tool-call counts, per-tool latency histograms and query timing aggregates.
+
+Recording a call or a query only updates in-memory counters; a background
+timer (and interpreter exit) flushes them to a SQLite database in WAL mode.
+Each flush adds to the stored totals in one transaction, so several server
+processes can share the store without losing updates.
+"""
+
+import atexit
+import bisect
 import json
-import tempfile
+import sqlite3
+import threading
+from collections.abc import Callable
 from pathlib import Path
-from typing import Any, Callable, TypeVar, TypedDict
+from typing import Any, TypedDict, TypeVar
 
 from openground.config import DEFAULT_DB_PATH, DEFAULT_TABLE_NAME, get_data_home
 from openground.query import _get_table, list_libraries_with_versions
 
 F = TypeVar("F", bound=Callable[..., Any])
 
+# Seconds between background flushes of buffered counters
+STATS_FLUSH_INTERVAL_SECONDS = 2.0
+
+# Upper bounds (ms) of the tool latency histogram buckets; a final bucket
+# catches everything slower
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class StageTiming(TypedDict):
+    count: int
+    total_ms: float
+    max_ms: float
+
+
+class ToolMetrics(TypedDict):
+    calls: int
+    errors: int
+    total_ms: float
+    max_ms: float
+    result_chars: int
+    max_result_chars: int
+    # Call counts per LATENCY_BUCKETS_MS bucket, plus the overflow bucket
+    buckets: list[int]
+
 
 class StatsJson(TypedDict):
     tool_calls: dict[str, int]
+    query_timings: dict[str, StageTiming]
+    tool_metrics: dict[str, ToolMetrics]
     libraries_count: int
     total_chunks: int
 
 
+# Counters recorded since the last flush, guarded by _lock
+_lock = threading.Lock()
+_pending_calls: dict[str, int] = {}
+_pending_timings: dict[str, StageTiming] = {}
+_pending_metrics: dict[str, ToolMetrics] = {}
+_flush_timer: threading.Timer | None = None
+
+
 def get_stats_path() -> Path:
-    """Get the path to the stats file.
+    """Get the path to the stats database.
 
     Returns:
-        Path to stats.json in the data home directory.
+        Path to stats.db in the data home directory.
     """
+    return get_data_home() / "stats.db"
+
+
+def _get_legacy_stats_path() -> Path:
+    """Path of the JSON stats file used before the SQLite store."""
     return get_data_home() / "stats.json"
 
 
@@ -33,16 +85,217 @@ def get_default_stats() -> StatsJson:
     return StatsJson(
         tool_calls={
             "search_documents_tool": 0,
+            "search_documents_batch_tool": 0,
+            "search_libraries_tool": 0,
             "list_libraries_tool": 0,
             "get_full_content_tool": 0,
+            "server_stats_tool": 0,
         },
+        query_timings={},
+        tool_metrics={},
         libraries_count=0,
         total_chunks=0,
     )
 
 
+def _connect() -> sqlite3.Connection:
+    """Open the stats database, creating it and importing stats.json if needed."""
+    stats_path = get_stats_path()
+    stats_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(stats_path), timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    with conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tool_calls "
+            "(tool_name TEXT PRIMARY KEY, count INTEGER NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_timings (stage TEXT PRIMARY KEY, "
+            "count INTEGER NOT NULL, total_ms REAL NOT NULL, max_ms REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tool_metrics (tool_name TEXT PRIMARY KEY, "
+            "calls INTEGER NOT NULL, errors INTEGER NOT NULL, "
+            "total_ms REAL NOT NULL, max_ms REAL NOT NULL, "
+            "result_chars INTEGER NOT NULL, max_result_chars INTEGER NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tool_latency_buckets (tool_name TEXT NOT NULL, "
+            "bucket INTEGER NOT NULL, count INTEGER NOT NULL, "
+            "PRIMARY KEY (tool_name, bucket))"
+        )
+    _migrate_legacy_stats(conn)
+    return conn
+
+
+def _migrate_legacy_stats(conn: sqlite3.Connection) -> None:
+    """
+    Fold a pre-SQLite stats.json into the database once.
+
+    The file is renamed before it is read, so only one process imports it;
+    it is kept as stats.json.migrated.
+
+    Raises ValueError if the file contains invalid JSON.
+    """
+    legacy_path = _get_legacy_stats_path()
+    if not legacy_path.exists():
+        return
+    migrated_path = legacy_path.with_name(legacy_path.name + ".migrated")
+    try:
+        legacy_path.replace(migrated_path)
+    except FileNotFoundError:
+        # Another process got there first
+        return
+
+    try:
+        content = migrated_path.read_text(encoding="utf-8").strip()
+        loaded = json.loads(content) if content else {}
+    except json.JSONDecodeError as e:
+        raise ValueError(
+            f"Invalid JSON in stats file {migrated_path}: {e}. "
+            "Hint: fix or delete the file; new statistics are stored in "
+            f"{get_stats_path()}."
+        ) from e
+
+    _write_counters(
+        conn,
+        loaded.get("tool_calls", {}),
+        loaded.get("query_timings", {}),
+    )
+
+
+def _write_counters(
+    conn: sqlite3.Connection,
+    tool_calls: dict[str, int],
+    query_timings: dict[str, StageTiming],
+    tool_metrics: dict[str, ToolMetrics] | None = None,
+) -> None:
+    """Add counters to the stored totals in one transaction."""
+    with conn:
+        conn.executemany(
+            "INSERT INTO tool_calls (tool_name, count) VALUES (?, ?) "
+            "ON CONFLICT(tool_name) DO UPDATE SET count = count + excluded.count",
+            tool_calls.items(),
+        )
+        conn.executemany(
+            "INSERT INTO query_timings (stage, count, total_ms, max_ms) "
+            "VALUES (?, ?, ?, ?) ON CONFLICT(stage) DO UPDATE SET "
+            "count = count + excluded.count, "
+            "total_ms = total_ms + excluded.total_ms, "
+            "max_ms = MAX(max_ms, excluded.max_ms)",
+            [
+                (stage, entry["count"], entry["total_ms"], entry["max_ms"])
+                for stage, entry in query_timings.items()
+            ],
+        )
+        tool_metrics = tool_metrics or {}
+        conn.executemany(
+            "INSERT INTO tool_metrics (tool_name, calls, errors, total_ms, max_ms, "
+            "result_chars, max_result_chars) VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(tool_name) DO UPDATE SET "
+            "calls = calls + excluded.calls, errors = errors + excluded.errors, "
+            "total_ms = total_ms + excluded.total_ms, "
+            "max_ms = MAX(max_ms, excluded.max_ms), "
+            "result_chars = result_chars + excluded.result_chars, "
+            "max_result_chars = MAX(max_result_chars, excluded.max_result_chars)",
+            [
+                (
+                    tool_name,
+                    entry["calls"],
+                    entry["errors"],
+                    entry["total_ms"],
+                    entry["max_ms"],
+                    entry["result_chars"],
+                    entry["max_result_chars"],
+                )
+                for tool_name, entry in tool_metrics.items()
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO tool_latency_buckets (tool_name, bucket, count) "
+            "VALUES (?, ?, ?) ON CONFLICT(tool_name, bucket) "
+            "DO UPDATE SET count = count + excluded.count",
+            [
+                (tool_name, bucket, count)
+                for tool_name, entry in tool_metrics.items()
+                for bucket, count in enumerate(entry["buckets"])
+                if count
+            ],
+        )
+
+
+def flush_stats() -> None:
+    """Write counters recorded in this process to the stats database."""
+    global _pending_calls, _pending_timings, _pending_metrics, _flush_timer
+    with _lock:
+        tool_calls, query_timings = _pending_calls, _pending_timings
+        tool_metrics = _pending_metrics
+        _pending_calls, _pending_timings, _pending_metrics = {}, {}, {}
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+    if not tool_calls and not query_timings and not tool_metrics:
+        return
+    try:
+        conn = _connect()
+        try:
+            _write_counters(conn, tool_calls, query_timings, tool_metrics)
+        finally:
+            conn.close()
+    except BaseException:
+        # Keep the counters for the next flush instead of losing them
+        with _lock:
+            _merge_pending(tool_calls, query_timings, tool_metrics)
+        raise
+
+
+def _merge_pending(
+    tool_calls: dict[str, int],
+    query_timings: dict[str, StageTiming],
+    tool_metrics: dict[str, ToolMetrics],
+) -> None:
+    """Add unwritten counters back into the pending buffers. Call with _lock held."""
+    for tool_name, count in tool_calls.items():
+        _pending_calls[tool_name] = _pending_calls.get(tool_name, 0) + count
+    for stage, timing in query_timings.items():
+        entry = _pending_timings.get(stage)
+        if entry is None:
+            _pending_timings[stage] = timing
+            continue
+        entry["count"] += timing["count"]
+        entry["total_ms"] += timing["total_ms"]
+        entry["max_ms"] = max(entry["max_ms"], timing["max_ms"])
+    for tool_name, metrics in tool_metrics.items():
+        entry = _pending_metrics.get(tool_name)
+        if entry is None:
+            _pending_metrics[tool_name] = metrics
+            continue
+        for key in ("calls", "errors", "total_ms", "result_chars"):
+            entry[key] += metrics[key]
+        entry["max_ms"] = max(entry["max_ms"], metrics["max_ms"])
+        entry["max_result_chars"] = max(
+            entry["max_result_chars"], metrics["max_result_chars"]
+        )
+        entry["buckets"] = [a + b for a, b in zip(entry["buckets"], metrics["buckets"])]
+
+
+def _schedule_flush() -> None:
+    """Start the flush timer unless one is pending. Call with _lock held."""
+    global _flush_timer
+    if _flush_timer is None:
+        _flush_timer = threading.Timer(STATS_FLUSH_INTERVAL_SECONDS, flush_stats)
+        _flush_timer.daemon = True
+        _flush_timer.start()
+
+
+atexit.register(flush_stats)
+
+
 def load_stats(db_path: Path | None = None, table_name: str | None = None) -> StatsJson:
-    """Load statistics from the stats file.
+    """Load statistics from the stats database.
+
+    Counters still buffered in this process are flushed first.
 
     Args:
         db_path: Optional path to LanceDB storage for computing libraries_count and total_chunks.
@@ -51,40 +304,42 @@ def load_stats(db_path: Path | None = None, table_name: str | None = None) -> St
     Returns:
         StatsJson with loaded stats. Computed fields are calculated if db_path/table_name provided.
 
-    Raises ValueError if file contains invalid JSON.
+    Raises ValueError if a legacy stats.json being migrated contains invalid JSON.
     """
-    stats_path = get_stats_path()
-
-    default = get_default_stats()
+    flush_stats()
 
-    if not stats_path.exists():
-        stats = default.copy()
-    else:
-        try:
-            with open(stats_path, "r", encoding="utf-8") as f:
-                content = f.read().strip()
-                if not content:
-                    stats = default.copy()
-                else:
-                    loaded = json.loads(content)
-
-                    if "tool_calls" not in loaded:
-                        stats = default.copy()
-                    else:
-                        tool_calls = loaded["tool_calls"].copy()
-                        for tool_name in default["tool_calls"]:
-                            if tool_name not in tool_calls:
-                                tool_calls[tool_name] = 0
-
-                        stats = StatsJson(
-                            tool_calls=tool_calls,
-                            libraries_count=0,
-                            total_chunks=0,
-                        )
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON in stats file {stats_path}: {e}") from e
-        except Exception as e:
-            raise ValueError(f"Error reading stats file {stats_path}: {e}") from e
+    stats = get_default_stats()
+    conn = _connect()
+    try:
+        for tool_name, count in conn.execute("SELECT tool_name, count FROM tool_calls"):
+            stats["tool_calls"][tool_name] = count
+        for stage, count, total_ms, max_ms in conn.execute(
+            "SELECT stage, count, total_ms, max_ms FROM query_timings"
+        ):
+            stats["query_timings"][stage] = StageTiming(
+                count=count, total_ms=total_ms, max_ms=max_ms
+            )
+        for row in conn.execute(
+            "SELECT tool_name, calls, errors, total_ms, max_ms, result_chars, "
+            "max_result_chars FROM tool_metrics"
+        ):
+            stats["tool_metrics"][row[0]] = ToolMetrics(
+                calls=row[1],
+                errors=row[2],
+                total_ms=row[3],
+                max_ms=row[4],
+                result_chars=row[5],
+                max_result_chars=row[6],
+                buckets=[0] * (len(LATENCY_BUCKETS_MS) + 1),
+            )
+        for tool_name, bucket, count in conn.execute(
+            "SELECT tool_name, bucket, count FROM tool_latency_buckets"
+        ):
+            metrics = stats["tool_metrics"].get(tool_name)
+            if metrics is not None and bucket < len(metrics["buckets"]):
+                metrics["buckets"][bucket] = count
+    finally:
+        conn.close()
 
     if db_path is not None and table_name is not None:
         stats["libraries_count"] = get_libraries_count(
@@ -95,53 +350,171 @@ def load_stats(db_path: Path | None = None, table_name: str | None = None) -> St
     return stats
 
 
-def save_stats(stats: StatsJson) -> None:
-    """Save statistics to the stats file atomically.
+def increment_tool_call(tool_name: str) -> None:
+    """Increment the call count for a tool.
 
-    Only saves tool_calls to JSON; computed fields (libraries_count, total_chunks) are not persisted.
+    Only updates an in-memory counter; see flush_stats().
 
     Args:
-        stats: StatsJson to save. Only tool_calls will be written to file.
-
-    Creates the stats directory if it doesn't exist.
+        tool_name: Name of the tool to increment.
     """
-    stats_path = get_stats_path()
-    stats_path.parent.mkdir(parents=True, exist_ok=True)
+    with _lock:
+        _pending_calls[tool_name] = _pending_calls.get(tool_name, 0) + 1
+        _schedule_flush()
 
-    save_data = {"tool_calls": stats["tool_calls"]}
 
-    tmp_path = None
-    try:
-        with tempfile.NamedTemporaryFile(
-            mode="w",
-            encoding="utf-8",
-            dir=stats_path.parent,
-            delete=False,
-            suffix=".tmp",
-        ) as tmp_file:
-            json.dump(save_data, tmp_file, indent=2, ensure_ascii=False)
-            tmp_path = Path(tmp_file.name)
-
-        tmp_path.replace(stats_path)
-    except Exception:
-        if tmp_path and tmp_path.exists():
-            tmp_path.unlink()
-        raise
+def record_query_timings(timings: dict[str, float]) -> None:
+    """Fold one query's per-stage timings into the running aggregates.
 
+    Only updates in-memory aggregates; see flush_stats().
 
-def increment_tool_call(tool_name: str) -> None:
-    """Increment the call count for a tool.
+    Args:
+        timings: Stage name to wall time in milliseconds, as filled in by
+            openground.query.search(timings=...).
+    """
+    if not timings:
+        return
+    with _lock:
+        for stage, elapsed_ms in timings.items():
+            entry = _pending_timings.setdefault(
+                stage, StageTiming(count=0, total_ms=0.0, max_ms=0.0)
+            )
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        _schedule_flush()
+
+
+def record_tool_result(
+    tool_name: str, elapsed_ms: float, result_chars: int, error: bool = False
+) -> None:
+    """Record the latency, result size and outcome of one tool call.
+
+    Only updates in-memory aggregates; see flush_stats().
 
     Args:
-        tool_name: Name of the tool to increment.
+        tool_name: Name of the tool.
+        elapsed_ms: Wall time of the call in milliseconds.
+        result_chars: Size of the returned text in characters.
+        error: Whether the call failed (including busy rejections).
     """
-    stats = load_stats()
-    if "tool_calls" not in stats:
-        stats["tool_calls"] = {}
-    if tool_name not in stats["tool_calls"]:
-        stats["tool_calls"][tool_name] = 0
-    stats["tool_calls"][tool_name] += 1
-    save_stats(stats)
+    bucket = bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)
+    with _lock:
+        entry = _pending_metrics.get(tool_name)
+        if entry is None:
+            entry = _pending_metrics[tool_name] = ToolMetrics(
+                calls=0,
+                errors=0,
+                total_ms=0.0,
+                max_ms=0.0,
+                result_chars=0,
+                max_result_chars=0,
+                buckets=[0] * (len(LATENCY_BUCKETS_MS) + 1),
+            )
+        entry["calls"] += 1
+        entry["errors"] += int(error)
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        entry["result_chars"] += result_chars
+        entry["max_result_chars"] = max(entry["max_result_chars"], result_chars)
+        entry["buckets"][bucket] += 1
+        _schedule_flush()
+
+
+def latency_percentile(metrics: ToolMetrics, quantile: float) -> float:
+    """Estimate a latency percentile (ms) from a tool's histogram.
+
+    Interpolates linearly inside the bucket holding the quantile, like
+    Prometheus' histogram_quantile, and never reports more than max_ms.
+
+    Args:
+        metrics: Aggregates for one tool.
+        quantile: Quantile between 0 and 1, e.g. 0.95.
+
+    Returns:
+        Estimated latency in milliseconds, or 0.0 without any calls.
+    """
+    total = sum(metrics["buckets"])
+    if not total:
+        return 0.0
+    target = quantile * total
+    seen = 0
+    lower = 0.0
+    for idx, count in enumerate(metrics["buckets"]):
+        upper = (
+            float(LATENCY_BUCKETS_MS[idx])
+            if idx < len(LATENCY_BUCKETS_MS)
+            else max(metrics["max_ms"], lower)
+        )
+        if count and seen + count >= target:
+            estimate = lower + (upper - lower) * (target - seen) / count
+            return min(estimate, metrics["max_ms"])
+        seen += count
+        lower = upper
+    return metrics["max_ms"]
+
+
+def summarize_tool_metrics(
+    tool_metrics: dict[str, ToolMetrics],
+) -> dict[str, dict[str, float | int]]:
+    """Condense per-tool aggregates into calls, errors, percentiles and sizes."""
+    return {
+        tool_name: {
+            "calls": metrics["calls"],
+            "errors": metrics["errors"],
+            "p50_ms": round(latency_percentile(metrics, 0.50), 1),
+            "p95_ms": round(latency_percentile(metrics, 0.95), 1),
+            "p99_ms": round(latency_percentile(metrics, 0.99), 1),
+            "max_ms": round(metrics["max_ms"], 1),
+            "avg_result_chars": (
+                round(metrics["result_chars"] / metrics["calls"])
+                if metrics["calls"]
+                else 0
+            ),
+            "max_result_chars": metrics["max_result_chars"],
+        }
+        for tool_name, metrics in sorted(tool_metrics.items())
+    }
+
+
+def format_prometheus_metrics(tool_metrics: dict[str, ToolMetrics]) -> str:
+    """Render per-tool aggregates in the Prometheus text exposition format."""
+    lines = [
+        "# HELP openground_tool_latency_seconds Tool call latency.",
+        "# TYPE openground_tool_latency_seconds histogram",
+    ]
+    for tool_name, metrics in sorted(tool_metrics.items()):
+        label = f'tool="{tool_name}"'
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, metrics["buckets"]):
+            cumulative += count
+            lines.append(
+                f'openground_tool_latency_seconds_bucket{{{label},le="{bound / 1000:g}"}} '
+                f"{cumulative}"
+            )
+        lines.append(
+            f'openground_tool_latency_seconds_bucket{{{label},le="+Inf"}} '
+            f"{sum(metrics['buckets'])}"
+        )
+        lines.append(
+            f"openground_tool_latency_seconds_sum{{{label}}} {metrics['total_ms'] / 1000:g}"
+        )
+        lines.append(
+            f"openground_tool_latency_seconds_count{{{label}}} {metrics['calls']}"
+        )
+    for name, field, help_text in (
+        ("openground_tool_errors_total", "errors", "Failed tool calls."),
+        (
+            "openground_tool_result_chars_total",
+            "result_chars",
+            "Characters returned by tool calls.",
+        ),
+    ):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for tool_name, metrics in sorted(tool_metrics.items()):
+            lines.append(f'{name}{{tool="{tool_name}"}} {metrics[field]}')
+    return "\n".join(lines) + "\n"
 
 
 def get_libraries_count(
@@ -179,10 +552,16 @@ def get_total_chunks(
 
 
 def reset_stats() -> None:
-    """Reset tool call counts to their default values (all zeros)."""
-    stats = load_stats()
-    default = get_default_stats()
-    stats["tool_calls"] = default["tool_calls"].copy()
-    stats["libraries_count"] = default["libraries_count"]
-    stats["total_chunks"] = default["total_chunks"]
-    save_stats(stats)
+    """Reset tool call counts, query timings and tool metrics to their default values."""
+    global _pending_calls, _pending_timings, _pending_metrics
+    with _lock:
+        _pending_calls, _pending_timings, _pending_metrics = {}, {}, {}
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute("DELETE FROM tool_calls")
+            conn.execute("DELETE FROM query_timings")
+            conn.execute("DELETE FROM tool_metrics")
+            conn.execute("DELETE FROM tool_latency_buckets")
+    finally:
+        conn.close()
@@ -5,9 +5,13 @@ This module provides fixtures that ensure every test runs in a temporary
 sandbox environment, never touching real user data.
 """
 
-import pytest
+from unittest.mock import patch
+
 import httpx
+import pytest
+
 from openground.config import clear_config_cache
+from openground.query import clear_query_caches
 
 
 @pytest.fixture(autouse=True)
@@ -18,9 +22,9 @@ def mock_isolated_env(monkeypatch, tmp_path):
     This fixture runs automatically before each test function:
     1. Creates a temp dir (tmp_path) unique to this test
     2. Overrides XDG_DATA_HOME and XDG_CONFIG_HOME to point to temp dir
-    3. Clears openground's internal config cache
+    3. Clears openground's internal config and query caches
     4. Yields control to the test
-    5. Cleans up cache after test (tmp_path auto-deleted by pytest)
+    5. Cleans up caches after test (tmp_path auto-deleted by pytest)
     """
     # Create subdirectories for realism
     fake_data = tmp_path / "data"
@@ -34,11 +38,13 @@ def mock_isolated_env(monkeypatch, tmp_path):
 
     # CRITICAL: Reset the singleton config cache so app re-reads new paths
     clear_config_cache()
+    clear_query_caches()
 
     yield fake_data  # Test runs here
 
-    # Cleanup - clear cache again for safety
+    # Cleanup - clear caches again for safety
     clear_config_cache()
+    clear_query_caches()
 
 
 @pytest.fixture
@@ -116,3 +122,26 @@ def sample_pages():
             content="Content of page 3",
         ),
     ]
+
+
+def _fake_embeddings(texts, show_progress=True):
+    # Derived from the text, so tests can check which vector belongs to a chunk
+    return [[float(len(text) % 97 + 1)] * 384 for text in texts]
+
+
+@pytest.fixture
+def fake_embeddings():
+    """Deterministic stand-in for generate_embeddings (no model download)."""
+    return _fake_embeddings
+
+
+@pytest.fixture
+def ingested_db(temp_db_path, sample_pages, fake_embeddings):
+    """A LanceDB with the sample pages ingested as testlib/latest."""
+    from openground.ingest import ingest_pages_to_lancedb
+
+    with patch("openground.ingest.generate_embeddings", side_effect=fake_embeddings):
+        ingest_pages_to_lancedb(
+            sample_pages, temp_db_path, "docs", source="https://example.com"
+        )
+    return temp_db_path
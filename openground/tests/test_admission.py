@@ -0,0 +1,132 @@
+"""
+Tests for tool call admission control.
+"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from openground.admission import ToolBusyError, ToolLimiter
+
+
+async def _hold(limiter: ToolLimiter, tool_name: str, release: asyncio.Event) -> None:
+    async with limiter.slot(tool_name):
+        await release.wait()
+
+
+class TestToolLimiter:
+    """Test global and per-tool limits, queueing and busy rejection."""
+
+    def test_queued_call_runs_when_a_slot_frees(self):
+        """A call over the limit should wait, then run once a slot is released."""
+
+        async def scenario():
+            limiter = ToolLimiter(max_concurrent=1, max_queued=1, queue_timeout=5)
+            release = asyncio.Event()
+            first = asyncio.create_task(_hold(limiter, "search", release))
+            await asyncio.sleep(0)
+            second = asyncio.create_task(_hold(limiter, "search", release))
+            await asyncio.sleep(0)
+            assert (limiter.running, limiter.queued) == (1, 1)
+
+            release.set()
+            await asyncio.gather(first, second)
+            return limiter.running, limiter.queued
+
+        assert asyncio.run(scenario()) == (0, 0)
+
+    def test_full_queue_rejects_immediately(self):
+        """With no queue room left, a call should fail fast as busy."""
+
+        async def scenario():
+            limiter = ToolLimiter(max_concurrent=1, max_queued=0, queue_timeout=5)
+            release = asyncio.Event()
+            holder = asyncio.create_task(_hold(limiter, "search", release))
+            await asyncio.sleep(0)
+            try:
+                with pytest.raises(ToolBusyError, match="Server busy"):
+                    async with limiter.slot("search"):
+                        pass
+            finally:
+                release.set()
+                await holder
+
+        asyncio.run(scenario())
+
+    def test_queue_timeout_rejects(self):
+        """A queued call should be rejected after queue_timeout."""
+
+        async def scenario():
+            limiter = ToolLimiter(max_concurrent=1, max_queued=1, queue_timeout=0.05)
+            release = asyncio.Event()
+            holder = asyncio.create_task(_hold(limiter, "search", release))
+            await asyncio.sleep(0)
+            try:
+                with pytest.raises(ToolBusyError, match="within 0.05s"):
+                    async with limiter.slot("search"):
+                        pass
+                assert limiter.queued == 0
+            finally:
+                release.set()
+                await holder
+
+        asyncio.run(scenario())
+
+    def test_per_tool_cap_leaves_room_for_other_tools(self):
+        """A capped tool should queue while other tools still get slots."""
+
+        async def scenario():
+            limiter = ToolLimiter(
+                max_concurrent=4, max_queued=0, queue_timeout=5, per_tool={"batch": 1}
+            )
+            release = asyncio.Event()
+            holder = asyncio.create_task(_hold(limiter, "batch", release))
+            await asyncio.sleep(0)
+            try:
+                with pytest.raises(ToolBusyError):
+                    async with limiter.slot("batch"):
+                        pass
+                async with limiter.slot("search"):
+                    assert limiter.running == 2
+            finally:
+                release.set()
+                await holder
+
+        asyncio.run(scenario())
+
+    def test_warmup_wait_does_not_hold_a_slot(self, monkeypatch):
+        """Searches waiting for warmup should queue, leaving slots and threads free."""
+        from openground import server
+
+        limiter = ToolLimiter(max_concurrent=1, max_queued=1, queue_timeout=5)
+        ready = server._Readiness()
+        ready.clear()
+        monkeypatch.setattr(server, "_limiter", limiter)
+        monkeypatch.setattr(server, "_ready", ready)
+
+        def call(tool_name: str):
+            context = SimpleNamespace(message=SimpleNamespace(name=tool_name))
+
+            async def call_next(_):
+                return tool_name
+
+            return server._AdmissionMiddleware().on_call_tool(context, call_next)
+
+        async def scenario():
+            search = asyncio.create_task(call("search_documents_tool"))
+            await asyncio.sleep(0.05)
+            assert not search.done()
+            assert limiter.queued == 1
+            # The only slot is still free while the search waits for warmup
+            assert await call("list_libraries_tool") == "list_libraries_tool"
+            # A second waiter finds the queue full instead of piling up
+            with pytest.raises(server.ToolError, match="Server busy"):
+                await call("search_documents_tool")
+            # Warmup finishes on its own thread
+            threading.Thread(target=ready.set).start()
+            return await search
+
+        assert asyncio.run(scenario()) == "search_documents_tool"
+        assert limiter.queued == 0
@@ -0,0 +1,203 @@
+"""
+Tests for the library catalog maintained alongside the documents table.
+"""
+
+from unittest.mock import patch
+
+import lancedb
+
+from openground.catalog import (
+    get_catalog_table_name,
+    load_catalog,
+    remove_catalog_entry,
+)
+from openground.ingest import ingest_pages_to_lancedb
+from openground.query import (
+    delete_library,
+    get_library_stats,
+    library_version_exists,
+    list_libraries_with_versions,
+)
+
+
+class TestCatalog:
+    """Test that the catalog tracks ingest and delete."""
+
+    def test_ingest_records_counts_and_source(self, ingested_db):
+        """Ingesting pages should create a catalog row with counts and source."""
+        # Act: Read the catalog
+        entries = load_catalog(ingested_db, "docs")
+
+        # Assert: One row describing the ingested library version
+        assert entries is not None
+        assert len(entries) == 1
+        entry = entries[0]
+        assert (entry["library_name"], entry["version"]) == ("testlib", "latest")
+        assert entry["chunk_count"] == 3
+        assert entry["page_count"] == 3
+        assert entry["source"] == "https://example.com"
+
+    def test_delete_removes_entry(self, ingested_db):
+        """Deleting a library version should remove it from the catalog."""
+        # Act: Delete the only library version
+        delete_library("testlib", "latest", ingested_db, "docs")
+
+        # Assert: Catalog and listing are empty
+        assert load_catalog(ingested_db, "docs") == []
+        assert list_libraries_with_versions(ingested_db, "docs") == {}
+
+    def test_listing_groups_and_sorts_versions(self, ingested_db):
+        """Catalog rows in any order should list as sorted libraries and versions."""
+        # Arrange: Add rows out of order, straight into the catalog
+        catalog = lancedb.connect(str(ingested_db)).open_table(
+            get_catalog_table_name("docs")
+        )
+        base = load_catalog(ingested_db, "docs")[0]
+        catalog.add(
+            [
+                dict(base, library_name="zlib", version="v2"),
+                dict(base, library_name="alib", version="v1"),
+                dict(base, library_name="zlib", version="v1"),
+            ]
+        )
+
+        # Act: List libraries
+        libraries = list_libraries_with_versions(ingested_db, "docs")
+
+        # Assert: Libraries and their versions are sorted
+        assert libraries == {
+            "alib": ["v1"],
+            "testlib": ["latest"],
+            "zlib": ["v1", "v2"],
+        }
+        assert list(libraries) == ["alib", "testlib", "zlib"]
+
+    def test_reads_without_catalog_do_not_write(self, ingested_db):
+        """Databases without a catalog should be read from the documents table."""
+        # Arrange: Drop the catalog to simulate an older database
+        lancedb.connect(str(ingested_db)).drop_table(get_catalog_table_name("docs"))
+
+        # Act: List libraries and read stats
+        libraries = list_libraries_with_versions(ingested_db, "docs")
+        stats = get_library_stats("testlib", "latest", ingested_db, "docs")
+
+        # Assert: Reads work and leave the catalog to the next write
+        assert libraries == {"testlib": ["latest"]}
+        assert stats is not None
+        assert (stats["chunk_count"], stats["unique_urls"]) == (3, 3)
+        assert load_catalog(ingested_db, "docs") is None
+
+    def test_first_write_without_catalog_keeps_other_libraries(
+        self, ingested_db, sample_pages, fake_embeddings
+    ):
+        """Writing one library to a pre-catalog database should not hide others."""
+        # Arrange: Two libraries in the documents table and no catalog
+        other_pages = [dict(page, library_name="otherlib") for page in sample_pages]
+        with patch(
+            "openground.ingest.generate_embeddings", side_effect=fake_embeddings
+        ):
+            ingest_pages_to_lancedb(other_pages, ingested_db, "docs")
+        lancedb.connect(str(ingested_db)).drop_table(get_catalog_table_name("docs"))
+
+        # Act: Re-ingest one library through the upsert path
+        with patch(
+            "openground.ingest.generate_embeddings", side_effect=fake_embeddings
+        ):
+            ingest_pages_to_lancedb(other_pages[:1], ingested_db, "docs", upsert=True)
+
+        # Assert: Both libraries are still listed and found
+        assert list_libraries_with_versions(ingested_db, "docs") == {
+            "otherlib": ["latest"],
+            "testlib": ["latest"],
+        }
+        assert library_version_exists("testlib", "latest", ingested_db, "docs")
+
+    def test_first_delete_without_catalog_keeps_other_libraries(self, ingested_db):
+        """Deleting from a pre-catalog database should backfill the rest first."""
+        # Arrange: Drop the catalog to simulate an older database
+        lancedb.connect(str(ingested_db)).drop_table(get_catalog_table_name("docs"))
+
+        # Act: Remove a library version that was never in the catalog
+        remove_catalog_entry("otherlib", "latest", ingested_db, "docs")
+
+        # Assert: The catalog was backfilled with the remaining library
+        entries = load_catalog(ingested_db, "docs")
+        assert entries is not None
+        assert [entry["library_name"] for entry in entries] == ["testlib"]
+
+
+class TestCacheInvalidation:
+    """Test that cached handles and listings follow writes from other processes."""
+
+    def test_listing_sees_external_catalog_write(self, ingested_db):
+        """A catalog write through another connection should refresh the listing."""
+        # Arrange: Warm the listing cache
+        assert list_libraries_with_versions(ingested_db, "docs") == {
+            "testlib": ["latest"]
+        }
+
+        # Act: Add a catalog row without going through openground's caches
+        catalog = lancedb.connect(str(ingested_db)).open_table(
+            get_catalog_table_name("docs")
+        )
+        row = dict(load_catalog(ingested_db, "docs")[0], library_name="otherlib")
+        catalog.add([row])
+
+        # Assert: The new library is listed without clearing caches
+        assert list_libraries_with_versions(ingested_db, "docs") == {
+            "otherlib": ["latest"],
+            "testlib": ["latest"],
+        }
+
+    def test_table_handle_sees_external_delete(self, ingested_db):
+        """Table lookups should follow the latest table version."""
+        from openground.query import _get_table
+
+        # Arrange: Warm the table cache
+        assert _get_table(ingested_db, "docs").count_rows() == 3
+
+        # Act: Delete rows through another connection
+        lancedb.connect(str(ingested_db)).open_table("docs").delete(
+            "url = 'https://example.com/page1'"
+        )
+
+        # Assert: The lookup reflects the delete
+        assert _get_table(ingested_db, "docs").count_rows() == 2
+
+    def test_new_version_does_not_move_handles_in_use(self, ingested_db):
+        """A handle another thread holds should keep its version after a write."""
+        from openground.query import _get_table
+
+        # Arrange: A handle handed out before the write
+        in_use = _get_table(ingested_db, "docs")
+
+        # Act: Delete rows through another connection, then look up again
+        lancedb.connect(str(ingested_db)).open_table("docs").delete(
+            "url = 'https://example.com/page1'"
+        )
+        latest = _get_table(ingested_db, "docs")
+
+        # Assert: The lookup gets a fresh handle; the old one is untouched
+        assert latest is not in_use
+        assert latest.count_rows() == 2
+        assert in_use.count_rows() == 3
+
+
+class TestCatalogBackedStats:
+    """Test existence and stats queries answered from the catalog."""
+
+    def test_library_version_exists(self, ingested_db):
+        """Existence should reflect the catalog for present and missing versions."""
+        assert library_version_exists("testlib", "latest", ingested_db, "docs")
+        assert not library_version_exists("testlib", "v2", ingested_db, "docs")
+        assert not library_version_exists("otherlib", "latest", ingested_db, "docs")
+
+    def test_get_library_stats(self, ingested_db):
+        """Stats should report catalog counts and sample titles."""
+        stats = get_library_stats("testlib", "latest", ingested_db, "docs")
+
+        assert stats is not None
+        assert stats["chunk_count"] == 3
+        assert stats["unique_urls"] == 3
+        assert stats["titles"] == ["Page 1", "Page 2", "Page 3"]
+        assert get_library_stats("testlib", "v2", ingested_db, "docs") is None
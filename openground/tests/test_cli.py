@@ -495,6 +495,72 @@ def test_install_mcp_wsl_generates_wsl_config():
     assert "wsl.exe" in result.stdout
 
 
+def test_install_mcp_claude_code_registers_url():
+    """
+    Test that install-mcp --claude-code --url registers an HTTP server.
+    AAA Pattern:
+    - Arrange: Mock subprocess.run to return success
+    - Act: Invoke install-mcp --claude-code with --url
+    - Assert: Verify the add call uses the http transport and the URL
+    """
+    # Arrange
+    with patch("subprocess.run") as mock_run:
+        mock_run.return_value = MagicMock(returncode=0)
+
+        # Act
+        result = runner.invoke(
+            app, ["install-mcp", "--claude-code", "--url", "http://127.0.0.1:9000/mcp"]
+        )
+
+        # Assert
+        assert result.exit_code == 0
+        add_call = mock_run.call_args_list[1][0][0]
+        assert add_call == [
+            "claude",
+            "mcp",
+            "add",
+            "--transport",
+            "http",
+            "--scope",
+            "user",
+            "openground",
+            "http://127.0.0.1:9000/mcp",
+        ]
+
+
+def test_install_mcp_http_uses_configured_url():
+    """
+    Test that install-mcp --http prints a URL config built from server settings.
+    AAA Pattern:
+    - Arrange: No mocks needed (default server config)
+    - Act: Invoke install-mcp with --http
+    - Assert: Verify the JSON points at the default server URL
+    """
+    # Act
+    result = runner.invoke(app, ["install-mcp", "--http"])
+
+    # Assert
+    assert result.exit_code == 0
+    assert '"url": "http://127.0.0.1:8765/mcp"' in result.stdout
+    assert '"command"' not in result.stdout
+
+
+def test_install_mcp_rejects_invalid_url():
+    """
+    Test that install-mcp --url rejects values that are not HTTP URLs.
+    AAA Pattern:
+    - Arrange: No mocks needed
+    - Act: Invoke install-mcp with a bare host name
+    - Assert: Verify a non-zero exit and a hint
+    """
+    # Act
+    result = runner.invoke(app, ["install-mcp", "--url", "localhost:8765"])
+
+    # Assert
+    assert result.exit_code == 1
+    assert "Hint" in result.output
+
+
 class TestAddUpdateDetection:
     """Test that add correctly detects new vs existing libraries."""
 
@@ -682,6 +748,7 @@ class TestAddUpdateDetection:
 
         # Note: We can't test the full update flow due to fastembed import issues
         # But we can verify the detection logic works correctly
+        summary = {"added": 0, "modified": 1, "deleted": 0, "unchanged": 2}
         with (
             patch(
                 "openground.extract.sitemap.extract_pages",
@@ -689,6 +756,9 @@ class TestAddUpdateDetection:
             ),
             patch("openground.ingest.ingest_to_lancedb"),
             patch("openground.ingest.load_parsed_pages", return_value=[]),
+            patch(
+                "openground.update.perform_update", return_value=summary
+            ) as mock_update,
         ):
             # Act: Run add command
             result = runner.invoke(
@@ -717,6 +787,10 @@ class TestAddUpdateDetection:
         # Verify the deleted file (page2.json) was recreated
         assert (output_dir / "page2.json").exists(), "Deleted file should be recreated"
 
+        # LanceDB is the source of truth: the incremental update path was taken
+        mock_update.assert_called_once()
+        assert "Update Summary" in result.stdout
+
 
 # Tests for local path extraction
 
@@ -1070,3 +1144,40 @@ class TestLocalPathExtraction:
 
         # Should have markdown and code from notebook
         assert "Notebook Title" in content or "print" in content
+
+
+class TestUpdateAll:
+    """Test the parallel `update --all` scheduler."""
+
+    def test_updates_every_version_and_reports_timings(self, mock_config):
+        """
+        Every library version with a source should be updated, failures should not
+        stop the others, and the summary should include per-library timings.
+        """
+        # Arrange: Two libraries with sources, one of which fails to update
+        libraries = {"lib-a": ["1.0", "latest"], "lib-b": ["latest"]}
+        sources = {"lib-a": {"type": "sitemap"}, "lib-b": {"type": "sitemap"}}
+        updated = []
+
+        def fake_add(library, version, **kwargs):
+            if library == "lib-b":
+                raise RuntimeError("clone failed")
+            updated.append((library, version))
+
+        with (
+            patch("openground.cli.load_source_file", return_value=sources),
+            patch(
+                "openground.query.list_libraries_with_versions", return_value=libraries
+            ),
+            patch("openground.cli.add", side_effect=fake_add),
+        ):
+            # Act: Run update --all with two concurrent jobs
+            result = runner.invoke(app, ["update", "--all", "--jobs", "2"])
+
+        # Assert: All versions attempted, failure reported, timings shown
+        assert result.exit_code == 0, result.stdout
+        assert sorted(updated) == [("lib-a", "1.0"), ("lib-a", "latest")]
+        assert "Successful: 2" in result.stdout
+        assert "Failed: 1" in result.stdout
+        assert "lib-a (v1.0):" in result.stdout
+        assert "lib-b (vlatest): clone failed" in result.stdout
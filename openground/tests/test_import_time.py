@@ -0,0 +1,52 @@
+"""
+Import regression checks for the `openground` and `openground-mcp` entry points.
+
+Each entry module is imported in a fresh interpreter, and the checks assert that
+heavy dependencies stay deferred until a command or tool call needs them.
+"""
+
+import subprocess
+import sys
+
+# Modules that only specific commands or tool calls need
+HEAVY_MODULES = (
+    "lancedb",
+    "pandas",
+    "pyarrow",
+    "tqdm",
+    "fastembed",
+    "sentence_transformers",
+    "openground.embeddings",
+)
+
+
+def _imported_modules(module: str) -> set[str]:
+    """Import module in a fresh interpreter and return the names in sys.modules."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys, {module}; print('\\n'.join(sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.split())
+
+
+class TestImportTime:
+    """Test that entry points defer heavy dependencies."""
+
+    def test_cli_import_is_light(self):
+        """The CLI should not import search, embedding or async machinery."""
+        modules = _imported_modules("openground.cli")
+
+        deferred = HEAVY_MODULES + ("asyncio", "openground.query")
+        assert [name for name in deferred if name in modules] == []
+
+    def test_server_import_defers_heavy_modules(self):
+        """The MCP server should not load the database or embedding stack."""
+        modules = _imported_modules("openground.server")
+
+        assert [name for name in HEAVY_MODULES if name in modules] == []
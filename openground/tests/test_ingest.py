@@ -0,0 +1,111 @@
+"""
+Tests for loading raw data pages and ingesting them.
+"""
+
+import asyncio
+import json
+from types import GeneratorType
+from unittest.mock import patch
+
+import pytest
+
+from openground.extract.common import (
+    PARQUET_PAGES_FILE,
+    count_raw_pages,
+    get_raw_data_format,
+    save_results,
+    update_raw_data_directory,
+)
+from openground.ingest import load_parsed_pages
+
+
+class TestLoadParsedPages:
+    """Test lazy loading of raw data pages."""
+
+    def test_missing_directory_raises(self, tmp_path):
+        """Should fail fast when the data directory does not exist."""
+        with pytest.raises(FileNotFoundError):
+            load_parsed_pages(tmp_path / "missing")
+
+    def test_yields_only_json_pages(self, temp_raw_data_dir, sample_pages):
+        """Should lazily yield pages from .json files and ignore other files."""
+        # Arrange: Save pages as JSON alongside a markdown file
+        lib_dir = temp_raw_data_dir / "testlib" / "latest"
+        lib_dir.mkdir(parents=True)
+        for idx, page in enumerate(sample_pages):
+            (lib_dir / f"page{idx}.json").write_text(json.dumps(page))
+        (lib_dir / "notes.md").write_text("# Not a page")
+
+        # Act: Load pages
+        pages = load_parsed_pages(lib_dir)
+
+        # Assert: A generator over the JSON pages only
+        assert isinstance(pages, GeneratorType)
+        assert [p["url"] for p in pages] == [p["url"] for p in sample_pages]
+
+
+class TestParquetRawData:
+    """Test the single-file Parquet raw data format."""
+
+    @pytest.fixture(autouse=True)
+    def parquet_format(self):
+        with patch(
+            "openground.extract.common.get_configured_raw_data_format",
+            return_value="parquet",
+        ):
+            yield
+
+    def test_save_and_load_round_trip(self, temp_raw_data_dir, sample_pages):
+        """Should write one Parquet file and load the same pages back."""
+        # Arrange: Output directory for a library version
+        lib_dir = temp_raw_data_dir / "testlib" / "latest"
+
+        # Act: Save and reload pages
+        asyncio.run(save_results(sample_pages, lib_dir))
+        pages = list(load_parsed_pages(lib_dir))
+
+        # Assert: One file on disk, identical pages
+        assert [p.name for p in lib_dir.iterdir()] == [PARQUET_PAGES_FILE]
+        assert get_raw_data_format(lib_dir) == "parquet"
+        assert count_raw_pages(lib_dir) == 3
+        assert pages == sample_pages
+
+    def test_colliding_slugs_are_kept(self, temp_raw_data_dir, sample_pages):
+        """Pages whose URL paths share a slug should not overwrite each other."""
+        # Arrange: Two URLs that map to the same JSON filename
+        lib_dir = temp_raw_data_dir / "testlib" / "latest"
+        pages = [
+            {**sample_pages[0], "url": "https://example.com/a/b"},
+            {**sample_pages[1], "url": "https://example.com/a-b"},
+        ]
+
+        # Act: Save pages
+        asyncio.run(save_results(pages, lib_dir))
+
+        # Assert: Both pages survive
+        assert count_raw_pages(lib_dir) == 2
+
+    def test_update_replaces_and_deletes(self, temp_raw_data_dir, sample_pages):
+        """Should rewrite the Parquet file with new, modified and deleted pages applied."""
+        # Arrange: Existing Parquet data
+        lib_dir = temp_raw_data_dir / "testlib" / "latest"
+        asyncio.run(save_results(sample_pages, lib_dir))
+        modified = {**sample_pages[0], "content": "Changed"}
+        new = {**sample_pages[0], "url": "https://example.com/page4"}
+
+        # Act: Apply an update
+        update_raw_data_directory(
+            raw_data_dir=lib_dir,
+            new_pages=[new],
+            modified_pages=[(modified["url"], modified)],
+            deleted_urls=[sample_pages[1]["url"]],
+        )
+
+        # Assert: Page set reflects the update
+        pages = {p["url"]: p for p in load_parsed_pages(lib_dir)}
+        assert set(pages) == {
+            sample_pages[0]["url"],
+            sample_pages[2]["url"],
+            "https://example.com/page4",
+        }
+        assert pages[sample_pages[0]["url"]]["content"] == "Changed"
@@ -0,0 +1,594 @@
+"""
+Tests for query-layer caching, batching, async variants and output formatting.
+"""
+
+import asyncio
+import sqlite3
+import threading
+from unittest.mock import patch
+
+import lancedb
+import pytest
+
+from openground.query import (
+    _format_search_results,
+    _get_result_cache,
+    _get_table,
+    _run_profiled_hybrid,
+    _run_search,
+    async_get_full_content,
+    async_search,
+    async_search_many,
+    async_warmup,
+    clear_query_caches,
+    get_full_content,
+    latest_version,
+    prefetch_table_files,
+    resolve_libraries,
+    search,
+    search_many,
+)
+from openground.result_cache import SearchResultCache
+
+
+class TestSearchResultCache:
+    """Test LRU, TTL and persistence of the result cache."""
+
+    def test_evicts_least_recently_used(self):
+        """Entries beyond max_size should evict the least recently used key."""
+        cache = SearchResultCache(max_size=2, ttl_seconds=60)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+
+        assert cache.get("a") == "1"
+        assert cache.get("b") is None
+        assert cache.get("c") == "3"
+
+    def test_expired_entries_are_misses(self):
+        """Entries older than the TTL should not be returned."""
+        cache = SearchResultCache(max_size=2, ttl_seconds=60)
+        with patch("openground.result_cache.time.time", return_value=1000.0):
+            cache.put("a", "1")
+        with patch("openground.result_cache.time.time", return_value=1061.0):
+            assert cache.get("a") is None
+
+    def test_persisted_entries_survive_restart(self, tmp_path):
+        """A new cache on the same file should see earlier entries."""
+        path = tmp_path / "cache.sqlite3"
+        SearchResultCache(max_size=4, ttl_seconds=60, persist_path=path).put(
+            ("q", "lib", 5), "result"
+        )
+
+        restarted = SearchResultCache(max_size=4, ttl_seconds=60, persist_path=path)
+        assert restarted.get(("q", "lib", 5)) == "result"
+
+    def test_clear_query_caches_closes_persisted_store(self, tmp_path, monkeypatch):
+        """Dropping the cache should close its SQLite connection."""
+        cache = SearchResultCache(
+            max_size=4, ttl_seconds=60, persist_path=tmp_path / "cache.sqlite3"
+        )
+        conn = cache._conn
+        monkeypatch.setattr("openground.query._result_cache", cache)
+
+        clear_query_caches()
+
+        assert cache._conn is None
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    def test_locked_store_falls_back_to_memory(self, tmp_path, monkeypatch):
+        """A store locked by another process should not fail gets or puts."""
+        monkeypatch.setattr("openground.result_cache._BUSY_TIMEOUT_SECONDS", 0.05)
+        path = tmp_path / "cache.sqlite3"
+        cache = SearchResultCache(max_size=4, ttl_seconds=60, persist_path=path)
+        other = sqlite3.connect(str(path))
+        other.execute("BEGIN EXCLUSIVE")
+        try:
+            cache.put("a", "1")
+            assert cache.get("a") == "1"
+            assert cache.get("b") is None
+        finally:
+            other.rollback()
+            other.close()
+
+
+class TestSearchCaching:
+    """Test that search reuses results until the table changes."""
+
+    def test_repeated_query_skips_embedding(self, ingested_db, fake_embeddings):
+        """A repeat of a normalized query should be served from the cache."""
+        with patch(
+            "openground.query.generate_embeddings", side_effect=fake_embeddings
+        ) as mock_embed:
+            first = search("content  of page", "latest", ingested_db, "docs")
+            second = search("Content of page", "latest", ingested_db, "docs")
+
+        assert first == second
+        assert mock_embed.call_count == 1
+
+    def test_table_write_invalidates_results(self, ingested_db, fake_embeddings):
+        """Writing to the table should make cached results unreachable."""
+        with patch(
+            "openground.query.generate_embeddings", side_effect=fake_embeddings
+        ) as mock_embed:
+            search("content of page", "latest", ingested_db, "docs")
+            lancedb.connect(str(ingested_db)).open_table("docs").delete(
+                "url = 'https://example.com/page1'"
+            )
+            result = search("content of page", "latest", ingested_db, "docs")
+
+        assert mock_embed.call_count == 2
+        assert "https://example.com/page1" not in result
+
+
+class TestSearchMany:
+    """Test batched searches."""
+
+    def test_embeds_unique_queries_once(self, ingested_db, fake_embeddings):
+        """Queries should be embedded in one call, skipping duplicates."""
+        queries = ["page one", "page two", "Page  one"]
+        with patch(
+            "openground.query.generate_embeddings", side_effect=fake_embeddings
+        ) as mock_embed:
+            results = search_many(queries, "latest", ingested_db, "docs", top_k=2)
+
+        assert mock_embed.call_count == 1
+        assert mock_embed.call_args.args[0] == ["page one", "page two"]
+        assert len(results) == 3
+        assert results[0] == results[2]
+        assert all(result.startswith("Found 2 matches.") for result in results)
+
+    def test_reuses_single_search_cache(self, ingested_db, fake_embeddings):
+        """Results cached by search should be served to search_many."""
+        with patch(
+            "openground.query.generate_embeddings", side_effect=fake_embeddings
+        ) as mock_embed:
+            single = search("page one", "latest", ingested_db, "docs", top_k=2)
+            batch = search_many(["page one"], "latest", ingested_db, "docs", top_k=2)
+
+        assert batch == [single]
+        assert mock_embed.call_count == 1
+
+
+class TestAsyncQueries:
+    """Test the async query variants against the sync ones."""
+
+    def test_async_search_matches_sync(self, ingested_db, fake_embeddings):
+        """async_search should return the same hits as search."""
+        with patch("openground.query.generate_embeddings", side_effect=fake_embeddings):
+            expected = search("page one", "latest", ingested_db, "docs", top_k=2)
+            clear_query_caches()
+            first = asyncio.run(
+                async_search("page one", "latest", ingested_db, "docs", top_k=2)
+            )
+            # A second event loop must be able to reuse the cached async handle
+            batch = asyncio.run(
+                async_search_many(["page two"], "latest", ingested_db, "docs", top_k=2)
+            )
+
+        assert first == expected
+        assert batch[0].startswith("Found 2 matches.")
+
+    def test_async_search_keeps_persisted_cache_off_the_loop(
+        self, ingested_db, fake_embeddings, tmp_path, monkeypatch
+    ):
+        """SQLite lookups and stores should run in worker threads."""
+        cache = SearchResultCache(
+            max_size=4, ttl_seconds=60, persist_path=tmp_path / "cache.sqlite3"
+        )
+        monkeypatch.setattr("openground.query._result_cache", cache)
+        sqlite_threads = []
+        for name in ("_load", "_store"):
+            original = getattr(cache, name)
+
+            def record(*args, _original=original):
+                sqlite_threads.append(threading.current_thread())
+                return _original(*args)
+
+            monkeypatch.setattr(cache, name, record)
+
+        async def search_twice() -> tuple[str, str]:
+            first = await async_search("page one", "latest", ingested_db, "docs")
+            cache._entries.clear()
+            second = await async_search("page one", "latest", ingested_db, "docs")
+            return first, second
+
+        with patch("openground.query.generate_embeddings", side_effect=fake_embeddings):
+            first, second = asyncio.run(search_twice())
+
+        assert first == second
+        assert len(sqlite_threads) == 3
+        assert threading.main_thread() not in sqlite_threads
+
+    def test_async_get_full_content_matches_sync(self, ingested_db):
+        """async_get_full_content should return the same page as get_full_content."""
+        url = "https://example.com/page2"
+
+        expected = get_full_content(url, "latest", ingested_db, "docs")
+        result = asyncio.run(async_get_full_content(url, "latest", ingested_db, "docs"))
+
+        assert result == expected
+        assert "Content of page 2" in result
+
+
+class TestSearchModes:
+    """Test retrieval mode selection and fusion settings."""
+
+    def test_fts_mode_skips_embedding(self, ingested_db):
+        """BM25-only search should not embed the query."""
+        with patch("openground.query.generate_embeddings") as mock_embed:
+            result = search("page", "latest", ingested_db, "docs", mode="fts")
+            async_result = asyncio.run(
+                async_search("content", "latest", ingested_db, "docs", mode="fts")
+            )
+
+        mock_embed.assert_not_called()
+        assert result.startswith("Found 3 matches.")
+        assert async_result.startswith("Found 3 matches.")
+
+    def test_auto_mode_routes_identifiers_to_fts(self, ingested_db, fake_embeddings):
+        """Identifier-like queries should use BM25 only; prose stays hybrid."""
+        with patch(
+            "openground.query.generate_embeddings", side_effect=fake_embeddings
+        ) as mock_embed:
+            search("read_csv", "latest", ingested_db, "docs", mode="auto")
+            assert mock_embed.call_count == 0
+
+            search("how to read a page", "latest", ingested_db, "docs", mode="auto")
+            assert mock_embed.call_count == 1
+
+    def test_linear_fusion_and_vector_mode(
+        self, ingested_db, monkeypatch, fake_embeddings
+    ):
+        """Linear fusion and vector-only mode should both return hits."""
+        from openground.config import get_effective_config
+
+        monkeypatch.setitem(get_effective_config()["query"], "fusion", "linear")
+        with patch("openground.query.generate_embeddings", side_effect=fake_embeddings):
+            hybrid = search("page", "latest", ingested_db, "docs", top_k=2)
+            vector = search(
+                "page", "latest", ingested_db, "docs", top_k=2, mode="vector"
+            )
+
+        assert hybrid.startswith("Found 2 matches.")
+        assert vector.startswith("Found 2 matches.")
+
+    def test_invalid_mode_raises(self, ingested_db):
+        """Unknown modes should be rejected with the valid choices."""
+        with pytest.raises(ValueError, match="hybrid, vector, fts, auto"):
+            search("page", "latest", ingested_db, "docs", mode="semantic")
+
+
+class TestFullContent:
+    """Test full-page retrieval from the page store and the chunk fallback."""
+
+    @pytest.fixture
+    def long_page_db(self, temp_db_path, sample_pages, fake_embeddings):
+        """A LanceDB holding one page long enough to span several chunks."""
+        from openground.ingest import ingest_pages_to_lancedb
+
+        paragraphs = [
+            f"Paragraph {i}: " + " ".join(f"word{i}_{j}" for j in range(12))
+            for i in range(20)
+        ]
+        page = dict(sample_pages[0], content="\n\n".join(paragraphs))
+        with patch(
+            "openground.ingest.generate_embeddings", side_effect=fake_embeddings
+        ):
+            ingest_pages_to_lancedb([page], temp_db_path, "docs")
+        return temp_db_path, page
+
+    def test_served_from_page_store_without_overlap(self, long_page_db):
+        """The page store should return the original page text exactly."""
+        db_path, page = long_page_db
+
+        result = get_full_content(page["url"], "latest", db_path, "docs")
+        async_result = asyncio.run(
+            async_get_full_content(page["url"], "latest", db_path, "docs")
+        )
+
+        assert result == (
+            f"# Page 1\n\nSource: {page['url']}\nVersion: latest\n\n{page['content']}"
+        )
+        assert async_result == result
+
+    def test_chunk_fallback_removes_overlap(self, long_page_db):
+        """Without a page store, chunks should be merged without repeated text."""
+        from openground.page_store import get_pages_table_name
+
+        db_path, page = long_page_db
+        lancedb.connect(str(db_path)).drop_table(get_pages_table_name("docs"))
+        clear_query_caches()
+
+        result = get_full_content(page["url"], "latest", db_path, "docs")
+
+        assert result.endswith(page["content"])
+        assert result.count("Paragraph") == 20
+
+    def test_delete_urls_removes_pages(self, ingested_db):
+        """Deleted URLs should disappear from the page store too."""
+        from openground.query import delete_urls
+
+        url = "https://example.com/page1"
+        delete_urls([url], "testlib", "latest", ingested_db, "docs")
+
+        assert get_full_content(url, "latest", ingested_db, "docs").startswith(
+            "No content found"
+        )
+
+
+class TestOutputBudget:
+    """Test collapsing, compact formatting and the character budget."""
+
+    @staticmethod
+    def _hits():
+        return [
+            {"url": "https://e.com/a", "title": "A", "content": "alpha " * 50},
+            {"url": "https://e.com/b", "title": "B", "content": "beta " * 50},
+            {"url": "https://e.com/a", "title": "A", "content": "again " * 50},
+            {"url": "https://e.com/c", "title": "C", "content": "gamma " * 50},
+        ]
+
+    def test_hits_from_same_url_are_collapsed(self):
+        """Two hits on one URL should produce a single entry."""
+        output = _format_search_results(self._hits(), "v1")
+
+        assert output.startswith("Found 3 matches.")
+        assert output.count("https://e.com/a") == 2  # source and tool hint
+        assert "alpha alpha" in output and "again again" in output
+
+    def test_budget_drops_trailing_entries(self):
+        """Entries beyond max_chars should be omitted with a note."""
+        output = _format_search_results(self._hits(), "v1", max_chars=900)
+
+        assert "**A**" in output
+        assert "**C**" not in output
+        assert "omitted to stay within 900 characters" in output
+        assert len(output.rsplit("\n", 1)[0]) <= 900
+
+    def test_budget_shortens_oversized_first_entry(self):
+        """A first entry larger than the budget should be trimmed, not dropped."""
+        output = _format_search_results(self._hits(), "v1", max_chars=200)
+
+        assert "**A**" in output
+        assert len(output.rsplit("\n", 1)[0]) <= 200
+
+    def test_compact_format(self):
+        """Compact output should trim snippets and state the tool hint once."""
+        output = _format_search_results(self._hits(), "v1", output_format="compact")
+
+        assert output.count("get_full_content") == 1
+        assert len(output) < len(_format_search_results(self._hits(), "v1"))
+
+    def test_search_honours_max_chars(self, ingested_db, fake_embeddings):
+        """search() should apply the budget and cache per budget."""
+        with patch("openground.query.generate_embeddings", side_effect=fake_embeddings):
+            full = search("page", "latest", ingested_db, "docs", max_chars=0)
+            limited = search("page", "latest", ingested_db, "docs", max_chars=250)
+
+        assert "omitted" not in full
+        assert "omitted" in limited
+
+
+class TestSearchTimings:
+    """Test per-stage timings and their aggregation in stats."""
+
+    @pytest.fixture
+    def varied_db(self, temp_db_path, sample_pages, fake_embeddings):
+        """Pages whose vector distances and BM25 scores all differ."""
+        from openground.ingest import ingest_pages_to_lancedb
+
+        contents = [
+            "page one",
+            "page one page one page",
+            "one",
+            "page",
+            "unrelated text about something else entirely",
+            "page page page one one",
+        ]
+        pages = [
+            dict(sample_pages[0], url=f"https://example.com/p{i}", content=content)
+            for i, content in enumerate(contents)
+        ]
+        with patch(
+            "openground.ingest.generate_embeddings", side_effect=fake_embeddings
+        ):
+            ingest_pages_to_lancedb(pages, temp_db_path, "docs")
+        return temp_db_path
+
+    @pytest.mark.parametrize("fusion", ["rrf", "linear"])
+    def test_profiled_hybrid_matches_unprofiled(
+        self, varied_db, fake_embeddings, monkeypatch, fusion
+    ):
+        """Timing the hybrid legs separately should not change the results."""
+        from openground.config import get_effective_config
+
+        monkeypatch.setitem(get_effective_config()["query"], "fusion", fusion)
+        sync_timings: dict[str, float] = {}
+        async_timings: dict[str, float] = {}
+        with (
+            patch("openground.query.generate_embeddings", side_effect=fake_embeddings),
+            patch("openground.query.load_embedding_model"),
+        ):
+            expected = search("page one", "latest", varied_db, "docs", top_k=3)
+            clear_query_caches()
+            profiled = search(
+                "page one",
+                "latest",
+                varied_db,
+                "docs",
+                top_k=3,
+                timings=sync_timings,
+                split_hybrid=True,
+            )
+            clear_query_caches()
+            async_profiled = asyncio.run(
+                async_search(
+                    "page one",
+                    "latest",
+                    varied_db,
+                    "docs",
+                    top_k=3,
+                    timings=async_timings,
+                    split_hybrid=True,
+                )
+            )
+
+        assert expected.startswith("Found 3 matches.")
+        assert profiled == expected
+        assert async_profiled == expected
+
+        # Fused hits, relevance scores included, match LanceDB's hybrid query
+        query_vec = fake_embeddings(["page one"])[0]
+        filter_str = "version = 'latest'"
+        table = _get_table(varied_db, "docs")
+        assert _run_profiled_hybrid(
+            table, "page one", query_vec, filter_str, 3, {}
+        ) == _run_search(table, "page one", query_vec, "hybrid", filter_str, 3)
+        for timings in (sync_timings, async_timings):
+            for stage in ("cache", "model_load", "embed", "vector", "fts", "fusion"):
+                assert timings[stage] >= 0
+        assert sync_timings["total"] >= sync_timings["vector"] + sync_timings["fts"]
+
+    def test_hybrid_is_one_stage_unless_split(self, varied_db, fake_embeddings):
+        """Without split_hybrid, LanceDB's hybrid query runs and is timed as one."""
+        timings: dict[str, float] = {}
+        with (
+            patch("openground.query.generate_embeddings", side_effect=fake_embeddings),
+            patch("openground.query.load_embedding_model"),
+            patch(
+                "openground.query._run_profiled_hybrid",
+                side_effect=AssertionError("hybrid was split"),
+            ),
+        ):
+            result = search(
+                "page one", "latest", varied_db, "docs", top_k=3, timings=timings
+            )
+
+        assert result.startswith("Found 3 matches.")
+        assert "hybrid" in timings
+        assert not {"vector", "fts", "fusion"} & set(timings)
+
+    def test_cache_hit_records_only_lookup(self, ingested_db, fake_embeddings):
+        """A cached result should report the cache stage and the total only."""
+        with patch("openground.query.generate_embeddings", side_effect=fake_embeddings):
+            search("page", "latest", ingested_db, "docs", mode="fts")
+            timings: dict[str, float] = {}
+            search("page", "latest", ingested_db, "docs", mode="fts", timings=timings)
+
+        assert set(timings) == {"cache", "total"}
+
+    def test_timings_are_aggregated_in_stats(self):
+        """record_query_timings should keep count, total and max per stage."""
+        from openground.stats import load_stats, record_query_timings, reset_stats
+
+        record_query_timings({"embed": 4.0, "total": 10.0})
+        record_query_timings({"embed": 2.0, "total": 6.0})
+
+        embed = load_stats()["query_timings"]["embed"]
+        assert embed == {"count": 2, "total_ms": 6.0, "max_ms": 4.0}
+
+        reset_stats()
+        assert load_stats()["query_timings"] == {}
+
+
+class TestWarmup:
+    """Test startup warmup helpers."""
+
+    def test_prefetch_respects_budget(self, ingested_db):
+        """Prefetching should read table files up to the byte budget."""
+        everything = prefetch_table_files(ingested_db, "docs", 1 << 30)
+
+        assert everything > 0
+        assert prefetch_table_files(ingested_db, "docs", 10) < everything
+        assert prefetch_table_files(ingested_db, "missing", 1 << 30) == 0
+
+    def test_searches_each_requested_library_version(
+        self, ingested_db, fake_embeddings
+    ):
+        """One search should run per matching library version, uncached."""
+        with patch(
+            "openground.query.generate_embeddings", side_effect=fake_embeddings
+        ) as mock_embed:
+            everything = asyncio.run(async_warmup(ingested_db, "docs"))
+            pinned = asyncio.run(
+                async_warmup(ingested_db, "docs", [("testlib", "latest")])
+            )
+            unknown = asyncio.run(
+                async_warmup(ingested_db, "docs", [("testlib", "v9"), ("nope", None)])
+            )
+
+        assert (everything, pinned, unknown) == (1, 1, 0)
+        assert mock_embed.call_count == 2
+        assert len(_get_result_cache()) == 0
+
+
+class TestMultiLibrarySearch:
+    """Test searching several library versions in one query."""
+
+    @pytest.fixture
+    def multi_library_db(self, ingested_db, fake_embeddings):
+        from openground.extract.common import ParsedPage
+        from openground.ingest import ingest_pages_to_lancedb
+
+        pages = [
+            ParsedPage(
+                url=f"https://other.dev/{version}",
+                library_name="otherlib",
+                version=version,
+                title=f"Other {version}",
+                description="",
+                last_modified="",
+                content=f"Content of otherlib {version}",
+            )
+            for version in ("v9", "v10")
+        ]
+        with patch(
+            "openground.ingest.generate_embeddings", side_effect=fake_embeddings
+        ):
+            ingest_pages_to_lancedb(pages, ingested_db, "docs")
+        return ingested_db
+
+    def test_latest_version(self):
+        """The "latest" version wins; otherwise versions compare naturally."""
+        assert latest_version(["v2", "latest"]) == "latest"
+        assert latest_version(["v9", "v10", "v1.2"]) == "v10"
+
+    def test_resolve_libraries(self):
+        """Requests should be pinned to versions and validated."""
+        available = {"a": ["v1", "v2"], "b": ["latest"]}
+
+        assert resolve_libraries(None, available) == [("a", "v2"), ("b", "latest")]
+        assert resolve_libraries([("a", "v1"), ("a", "v1")], available) == [("a", "v1")]
+        with pytest.raises(ValueError, match="Available libraries: a, b"):
+            resolve_libraries([("c", None)], available)
+        with pytest.raises(ValueError, match="Available versions: v1, v2"):
+            resolve_libraries([("a", "v3")], available)
+
+    def test_one_ranking_across_libraries(self, multi_library_db, fake_embeddings):
+        """Hits from every requested library version should share one result list."""
+        libraries = [("testlib", "latest"), ("otherlib", "v10")]
+        with patch(
+            "openground.query.generate_embeddings", side_effect=fake_embeddings
+        ) as mock_embed:
+            result = search(
+                "content", "", multi_library_db, "docs", top_k=10, libraries=libraries
+            )
+            async_result = asyncio.run(
+                async_search(
+                    "content",
+                    "",
+                    multi_library_db,
+                    "docs",
+                    top_k=10,
+                    libraries=libraries,
+                )
+            )
+
+        assert mock_embed.call_count == 1
+        assert async_result == result
+        assert result.startswith("Found 4 matches.")
+        assert "https://other.dev/v10" in result
+        assert "https://other.dev/v9" not in result
@@ -0,0 +1,147 @@
+"""
+Tests for single-flight coalescing of identical in-flight searches.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from openground.query import async_search, search
+from openground.single_flight import AsyncSingleFlight, SingleFlight
+
+
+class TestSingleFlight:
+    """Test the thread and asyncio coalescers."""
+
+    def test_concurrent_threads_share_one_call(self):
+        """Callers arriving while a call runs should get its result."""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def work():
+            calls.append(1)
+            release.wait(timeout=5)
+            return "shared"
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(flight.do, "key", work) for _ in range(5)]
+            # Let every caller reach do() before the leader finishes
+            threading.Event().wait(0.1)
+            release.set()
+            results = [future.result() for future in futures]
+
+        assert results == ["shared"] * 5
+        assert len(calls) == 1
+        assert len(flight) == 0
+
+    def test_exception_reaches_every_caller_and_frees_key(self):
+        """A failed call should raise in all waiters and not stick around."""
+        flight = AsyncSingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        async def scenario():
+            results = await asyncio.gather(
+                *(flight.do("key", failing) for _ in range(3)), return_exceptions=True
+            )
+            assert all(isinstance(r, RuntimeError) for r in results)
+            assert len(flight) == 0
+            return await flight.do("key", lambda: asyncio.sleep(0, result="again"))
+
+        assert asyncio.run(scenario()) == "again"
+
+    def test_cancelled_caller_does_not_cancel_shared_call(self):
+        """Cancelling one waiter should leave the shared work running for others."""
+        flight = AsyncSingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        async def scenario():
+            first = asyncio.create_task(flight.do("key", work))
+            second = asyncio.create_task(flight.do("key", work))
+            await asyncio.sleep(0)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            return await second
+
+        assert asyncio.run(scenario()) == "done"
+
+
+class TestSearchCoalescing:
+    """Test that identical concurrent searches embed and search once."""
+
+    @staticmethod
+    def _slow_embeddings(texts, show_progress=True):
+        # Slow enough that every concurrent caller is in flight together
+        threading.Event().wait(0.2)
+        return [[0.1] * 384 for _ in texts]
+
+    def test_concurrent_async_searches_embed_once(self, ingested_db):
+        """N identical async searches should share one embedding, even profiled."""
+        timings = [{} for _ in range(5)]
+
+        async def scenario():
+            # The MCP server always asks for stage timings
+            return await asyncio.gather(
+                *(
+                    async_search(
+                        "page",
+                        "latest",
+                        ingested_db,
+                        "docs",
+                        mode="vector",
+                        timings=call_timings,
+                    )
+                    for call_timings in timings
+                )
+            )
+
+        with (
+            patch(
+                "openground.query.generate_embeddings",
+                side_effect=self._slow_embeddings,
+            ) as mock_embed,
+            patch("openground.query.load_embedding_model"),
+        ):
+            results = asyncio.run(scenario())
+
+        assert mock_embed.call_count == 1
+        assert sum("embed" in call_timings for call_timings in timings) == 1
+        assert all("total" in call_timings for call_timings in timings)
+        assert len(set(results)) == 1
+        assert results[0].startswith("Found")
+
+    def test_concurrent_thread_searches_embed_once(self, ingested_db):
+        """N identical searches from threads should share one embedding."""
+        with (
+            patch(
+                "openground.query.generate_embeddings",
+                side_effect=self._slow_embeddings,
+            ) as mock_embed,
+            ThreadPoolExecutor(max_workers=5) as executor,
+        ):
+            futures = [
+                executor.submit(
+                    search,
+                    "page",
+                    "latest",
+                    ingested_db,
+                    "docs",
+                    show_progress=False,
+                    mode="vector",
+                )
+                for _ in range(5)
+            ]
+            results = [future.result() for future in futures]
+
+        assert mock_embed.call_count == 1
+        assert len(set(results)) == 1
@@ -0,0 +1,171 @@
+"""
+Tests for the SQLite-backed tool call statistics.
+"""
+
+import json
+import multiprocessing
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from openground.stats import (
+    flush_stats,
+    format_prometheus_metrics,
+    get_stats_path,
+    increment_tool_call,
+    load_stats,
+    record_query_timings,
+    record_tool_result,
+    reset_stats,
+    summarize_tool_metrics,
+)
+
+
+def _count_calls(calls: int) -> None:
+    # Spawned workers inherit the sandboxed XDG_DATA_HOME from the test
+    for _ in range(calls):
+        increment_tool_call("search_documents_tool")
+        flush_stats()
+
+
+class TestStatsStore:
+    """Test buffering, persistence and migration of tool call counts."""
+
+    def test_increments_are_buffered_until_flush(self):
+        """Recording a call should not touch the database until a flush."""
+        increment_tool_call("search_documents_tool")
+        assert not get_stats_path().exists()
+
+        flush_stats()
+        stats = load_stats()
+
+        assert stats["tool_calls"]["search_documents_tool"] == 1
+        assert stats["tool_calls"]["list_libraries_tool"] == 0
+
+    def test_reset_clears_stored_and_buffered_counts(self):
+        """reset_stats should zero flushed and pending counters."""
+        increment_tool_call("list_libraries_tool")
+        flush_stats()
+        increment_tool_call("list_libraries_tool")
+
+        reset_stats()
+        flush_stats()
+
+        assert load_stats()["tool_calls"]["list_libraries_tool"] == 0
+
+    def test_failed_flush_keeps_counters(self):
+        """Counters from a failed write should be written by the next flush."""
+        increment_tool_call("search_documents_tool")
+        record_query_timings({"embed": 4.0})
+        record_tool_result("search_documents_tool", 3.0, 10)
+        with (
+            patch(
+                "openground.stats._write_counters",
+                side_effect=sqlite3.OperationalError("database is locked"),
+            ),
+            pytest.raises(sqlite3.OperationalError),
+        ):
+            flush_stats()
+        increment_tool_call("search_documents_tool")
+        record_query_timings({"embed": 6.0})
+        record_tool_result("search_documents_tool", 30.0, 20)
+
+        stats = load_stats()
+
+        assert stats["tool_calls"]["search_documents_tool"] == 2
+        assert stats["query_timings"]["embed"] == {
+            "count": 2,
+            "total_ms": 10.0,
+            "max_ms": 6.0,
+        }
+        metrics = stats["tool_metrics"]["search_documents_tool"]
+        assert (metrics["calls"], metrics["result_chars"]) == (2, 30)
+        assert sum(metrics["buckets"]) == 2
+
+    def test_concurrent_processes_do_not_lose_updates(self):
+        """Counts flushed by several processes should add up."""
+        ctx = multiprocessing.get_context("spawn")
+        workers = [ctx.Process(target=_count_calls, args=(20,)) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=60)
+
+        assert all(worker.exitcode == 0 for worker in workers)
+        assert load_stats()["tool_calls"]["search_documents_tool"] == 60
+
+    def test_migrates_legacy_json(self, mock_isolated_env):
+        """An existing stats.json should be imported once and kept aside."""
+        legacy_path = mock_isolated_env / "openground" / "stats.json"
+        legacy_path.parent.mkdir(parents=True, exist_ok=True)
+        legacy_path.write_text(
+            json.dumps({"tool_calls": {"get_full_content_tool": 4}}), encoding="utf-8"
+        )
+
+        assert load_stats()["tool_calls"]["get_full_content_tool"] == 4
+        assert load_stats()["tool_calls"]["get_full_content_tool"] == 4
+        assert not legacy_path.exists()
+        assert legacy_path.with_name("stats.json.migrated").exists()
+
+    def test_invalid_legacy_json_raises(self, mock_isolated_env):
+        """A corrupt stats.json should surface as a ValueError with a hint."""
+        legacy_path = mock_isolated_env / "openground" / "stats.json"
+        legacy_path.parent.mkdir(parents=True, exist_ok=True)
+        legacy_path.write_text("{not json", encoding="utf-8")
+
+        with pytest.raises(ValueError, match="Hint"):
+            load_stats()
+
+
+class TestToolMetrics:
+    """Test per-tool latency histograms and their summaries."""
+
+    def test_records_latency_errors_and_result_size(self):
+        """Recorded results should be aggregated per tool after a flush."""
+        record_tool_result("search_documents_tool", 12.0, 100)
+        record_tool_result("search_documents_tool", 40.0, 300)
+        record_tool_result("search_documents_tool", 700.0, 0, error=True)
+
+        metrics = load_stats()["tool_metrics"]["search_documents_tool"]
+
+        assert metrics["calls"] == 3
+        assert metrics["errors"] == 1
+        assert metrics["max_ms"] == 700.0
+        assert metrics["max_result_chars"] == 300
+        assert sum(metrics["buckets"]) == 3
+
+    def test_percentiles_stay_within_bucket_bounds(self):
+        """Percentiles should land in the right bucket and never exceed max."""
+        for _ in range(99):
+            record_tool_result("list_libraries_tool", 8.0, 10)
+        record_tool_result("list_libraries_tool", 300.0, 10)
+
+        summary = summarize_tool_metrics(load_stats()["tool_metrics"])
+        row = summary["list_libraries_tool"]
+
+        assert 5.0 <= row["p50_ms"] <= 10.0
+        assert row["p99_ms"] <= 10.0
+        assert row["max_ms"] == 300.0
+        assert row["avg_result_chars"] == 10
+
+    def test_prometheus_text_has_cumulative_buckets(self):
+        """The exposition should include cumulative buckets, sum and count."""
+        record_tool_result("get_full_content_tool", 3.0, 50)
+        record_tool_result("get_full_content_tool", 20000.0, 50, error=True)
+
+        text = format_prometheus_metrics(load_stats()["tool_metrics"])
+
+        assert (
+            'openground_tool_latency_seconds_bucket{tool="get_full_content_tool",le="0.005"} 1'
+            in text
+        )
+        assert (
+            'openground_tool_latency_seconds_bucket{tool="get_full_content_tool",le="+Inf"} 2'
+            in text
+        )
+        assert (
+            'openground_tool_latency_seconds_count{tool="get_full_content_tool"} 2'
+            in text
+        )
+        assert 'openground_tool_errors_total{tool="get_full_content_tool"} 1' in text
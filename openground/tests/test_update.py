@@ -13,6 +13,7 @@ from openground.update import (
     compute_content_hash,
     load_existing_pages_hashes,
     compare_pages,
+    compute_page_hash,
     perform_update,
 )
 from openground.extract.common import ParsedPage
@@ -156,11 +157,9 @@ class TestComparePages:
         assert len(diff["unchanged"]) == 0
 
     def test_identifies_unchanged_pages(self, sample_pages):
-        """Should identify pages with same content hash."""
+        """Should identify pages with the same page hash."""
         # Arrange: Existing pages have same content (same hash)
-        existing = {
-            page["url"]: compute_content_hash(page["content"]) for page in sample_pages
-        }
+        existing = {page["url"]: compute_page_hash(page) for page in sample_pages}
 
         # Act: Compare pages
         diff = compare_pages(sample_pages, existing)
@@ -173,8 +172,8 @@ class TestComparePages:
         """Test with new, deleted, modified, and unchanged pages."""
         # Arrange: Create a mix of scenarios
         existing = {
-            # page1: unchanged (same content)
-            sample_pages[0]["url"]: compute_content_hash(sample_pages[0]["content"]),
+            # page1: unchanged (same content and metadata)
+            sample_pages[0]["url"]: compute_page_hash(sample_pages[0]),
             # page2: modified (different content)
             sample_pages[1]["url"]: compute_content_hash("OLD content"),
             # deleted page: exists in old but not in extracted
@@ -192,6 +191,22 @@ class TestComparePages:
         assert len(diff["modified"]) == 0  # page2 is deleted, not modified
         assert len(diff["unchanged"]) == 1  # page1
 
+    def test_streams_pages_and_last_duplicate_wins(self, sample_pages):
+        """A one-shot iterator should work; a repeated URL keeps its last page."""
+        # Arrange: page1 unchanged, then repeated with new content
+        existing = {sample_pages[0]["url"]: compute_page_hash(sample_pages[0])}
+        changed = dict(sample_pages[0], content="NEW content")
+        extracted = iter([sample_pages[0], sample_pages[1], changed])
+
+        # Act: Compare pages
+        diff = compare_pages(extracted, existing)
+
+        # Assert: The later copy of page1 is modified, not unchanged
+        assert diff["modified"] == [(changed["url"], changed)]
+        assert diff["unchanged"] == []
+        assert diff["new"] == [sample_pages[1]]
+        assert diff["deleted"] == []
+
 
 class TestPerformUpdate:
     """Test the complete update flow."""
@@ -383,6 +398,173 @@ class TestPerformUpdate:
         assert not any("page2" in f.name for f in json_files)
 
 
+class TestUpsertUpdate:
+    """Test that updates merge chunks into LanceDB instead of delete-then-add."""
+
+    def test_update_replaces_chunks_of_changed_pages(
+        self, temp_raw_data_dir, temp_db_path, sample_pages, fake_embeddings
+    ):
+        """Shrunk pages lose stale chunks, deleted pages vanish, others stay."""
+        lib_dir = temp_raw_data_dir / "testlib" / "latest"
+        lib_dir.mkdir(parents=True)
+        long_page = dict(
+            sample_pages[0],
+            content="\n\n".join(f"Paragraph {i}. " + "text " * 60 for i in range(6)),
+        )
+
+        with patch(
+            "openground.ingest.generate_embeddings", side_effect=fake_embeddings
+        ):
+            # Arrange: Initial add with a multi-chunk page1
+            perform_update(
+                [long_page, *sample_pages[1:]],
+                "testlib",
+                "latest",
+                lib_dir,
+                temp_db_path,
+                "docs",
+            )
+            table = lancedb.connect(str(temp_db_path)).open_table("docs")
+            assert table.count_rows("url = 'https://example.com/page1'") > 1
+
+            # Act: page1 shrinks to one chunk, page2 is deleted
+            summary = perform_update(
+                [sample_pages[0], sample_pages[2]],
+                "testlib",
+                "latest",
+                lib_dir,
+                temp_db_path,
+                "docs",
+            )
+
+        # Assert: One chunk per remaining page with the new content
+        assert (summary["modified"], summary["deleted"]) == (1, 1)
+        table.checkout_latest()
+        rows = table.search().select(["url", "content", "chunk_index"]).to_list()
+        assert sorted((row["url"], row["chunk_index"]) for row in rows) == [
+            ("https://example.com/page1", 0),
+            ("https://example.com/page3", 0),
+        ]
+        assert "Content of page 1" in [row["content"] for row in rows]
+
+    def test_update_embeds_only_changed_chunks(
+        self, temp_raw_data_dir, temp_db_path, sample_pages, fake_embeddings
+    ):
+        """Unchanged chunks keep their vectors even when their chunk_index moves."""
+        lib_dir = temp_raw_data_dir / "testlib" / "latest"
+        lib_dir.mkdir(parents=True)
+        # Each paragraph is too long to share a chunk with the next one
+        paragraphs = [f"Paragraph {i}. " + " ".join(["text"] * 115) for i in range(6)]
+        page = dict(sample_pages[0], content="\n\n".join(paragraphs))
+
+        with patch(
+            "openground.ingest.generate_embeddings", side_effect=fake_embeddings
+        ) as mock_embed:
+            # Arrange: Initial add
+            perform_update([page], "testlib", "latest", lib_dir, temp_db_path, "docs")
+            mock_embed.reset_mock()
+
+            # Act: Prepend a paragraph and fix a typo in another one
+            edited = ["Intro. " + " ".join(["new"] * 140), *paragraphs]
+            edited[4] = edited[4].replace("Paragraph 3.", "Paragraph three.")
+            summary = perform_update(
+                [dict(page, content="\n\n".join(edited))],
+                "testlib",
+                "latest",
+                lib_dir,
+                temp_db_path,
+                "docs",
+            )
+
+        # Assert: Only the two new chunks were embedded
+        assert summary["modified"] == 1
+        embedded = [text for call in mock_embed.call_args_list for text in call.args[0]]
+        assert sorted(embedded) == sorted([edited[0], edited[4]])
+
+        # Assert: Chunks are renumbered and every vector matches its content
+        table = lancedb.connect(str(temp_db_path)).open_table("docs")
+        rows = sorted(
+            table.search().select(["content", "chunk_index", "vector"]).to_list(),
+            key=lambda row: row["chunk_index"],
+        )
+        assert [row["content"] for row in rows] == edited
+        assert [row["chunk_index"] for row in rows] == list(range(7))
+        assert [row["vector"] for row in rows] == fake_embeddings(edited)
+
+    def test_update_rewrites_metadata_of_unchanged_chunks(
+        self, temp_raw_data_dir, temp_db_path, sample_pages, fake_embeddings
+    ):
+        """A title-only change should reach every chunk without re-embedding."""
+        lib_dir = temp_raw_data_dir / "testlib" / "latest"
+        lib_dir.mkdir(parents=True)
+        paragraphs = [f"Paragraph {i}. " + " ".join(["text"] * 115) for i in range(4)]
+        page = dict(sample_pages[0], content="\n\n".join(paragraphs))
+
+        with patch(
+            "openground.ingest.generate_embeddings", side_effect=fake_embeddings
+        ) as mock_embed:
+            # Arrange: Initial add
+            perform_update([page], "testlib", "latest", lib_dir, temp_db_path, "docs")
+            mock_embed.reset_mock()
+
+            # Act: Rename the page without touching its content
+            summary = perform_update(
+                [dict(page, title="Renamed page")],
+                "testlib",
+                "latest",
+                lib_dir,
+                temp_db_path,
+                "docs",
+            )
+
+        # Assert: The page is modified and no chunk was re-embedded
+        assert summary["modified"] == 1
+        mock_embed.assert_not_called()
+
+        # Assert: Every chunk carries the new title
+        table = lancedb.connect(str(temp_db_path)).open_table("docs")
+        titles = [row["title"] for row in table.search().select(["title"]).to_list()]
+        assert len(titles) == len(paragraphs)
+        assert set(titles) == {"Renamed page"}
+
+    def test_update_leaves_unchanged_chunks_in_place(
+        self, temp_raw_data_dir, temp_db_path, sample_pages, fake_embeddings
+    ):
+        """Only the edited chunk should be rewritten; the others keep their rows."""
+        lib_dir = temp_raw_data_dir / "testlib" / "latest"
+        lib_dir.mkdir(parents=True)
+        paragraphs = [f"Paragraph {i}. " + " ".join(["text"] * 115) for i in range(4)]
+        page = dict(sample_pages[0], content="\n\n".join(paragraphs))
+
+        def row_ids() -> dict[int, int]:
+            table = lancedb.connect(str(temp_db_path)).open_table("docs")
+            rows = table.search().select(["chunk_index"]).with_row_id(True).to_list()
+            return {row["chunk_index"]: row["_rowid"] for row in rows}
+
+        with patch(
+            "openground.ingest.generate_embeddings", side_effect=fake_embeddings
+        ):
+            # Arrange: Initial add
+            perform_update([page], "testlib", "latest", lib_dir, temp_db_path, "docs")
+            before = row_ids()
+
+            # Act: Fix a typo in one paragraph
+            edited = list(paragraphs)
+            edited[2] = edited[2].replace("Paragraph 2.", "Paragraph two.")
+            perform_update(
+                [dict(page, content="\n\n".join(edited))],
+                "testlib",
+                "latest",
+                lib_dir,
+                temp_db_path,
+                "docs",
+            )
+
+        # Assert: Only the edited chunk moved to a new row
+        after = row_ids()
+        assert {idx for idx in after if after[idx] != before[idx]} == {2}
+
+
 class TestDeleteUrls:
     """Test the delete_urls function in query.py."""
 
@@ -0,0 +1,86 @@
+"""
+Tests for the db_path watcher that refreshes query caches in the background.
+"""
+
+import asyncio
+import sys
+
+import lancedb
+import pytest
+
+from openground.catalog import get_catalog_table_name, load_catalog
+from openground.query import (
+    _metadata_cache,
+    list_libraries_with_versions,
+    refresh_table_caches,
+    table_version_token,
+)
+from openground.watcher import watch_db_path
+
+
+def _add_catalog_row(db_path, library_name: str) -> None:
+    """Write to the catalog through a separate connection, like another process."""
+    catalog = lancedb.connect(str(db_path)).open_table(get_catalog_table_name("docs"))
+    catalog.add([dict(load_catalog(db_path, "docs")[0], library_name=library_name)])
+
+
+async def _watch_and_write(db_path, write: bool) -> int:
+    """Run the watcher around an optional catalog write; return refresh count."""
+    refreshed = asyncio.Event()
+    calls = 0
+
+    async def on_change():
+        nonlocal calls
+        calls += 1
+        await asyncio.to_thread(refresh_table_caches, db_path, "docs")
+        refreshed.set()
+
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(
+        watch_db_path(db_path, "docs", on_change, poll_interval=0.05, stop_event=stop)
+    )
+    try:
+        # Give watchfiles time to register before writing
+        await asyncio.sleep(0.3)
+        if write:
+            await asyncio.to_thread(_add_catalog_row, db_path, "otherlib")
+            await asyncio.wait_for(refreshed.wait(), timeout=10)
+        else:
+            await asyncio.sleep(0.3)
+    finally:
+        stop.set()
+        await asyncio.wait_for(watcher, timeout=10)
+    return calls
+
+
+class TestWatchDbPath:
+    """Test that writes from other processes refresh the listing cache."""
+
+    @pytest.fixture(params=["watchfiles", "polling"])
+    def watch_backend(self, request, monkeypatch):
+        """Run each test with watchfiles and with the polling fallback."""
+        if request.param == "watchfiles":
+            pytest.importorskip("watchfiles")
+        else:
+            # A None entry makes `import watchfiles` raise ImportError
+            monkeypatch.setitem(sys.modules, "watchfiles", None)
+        return request.param
+
+    def test_write_refreshes_listing_in_background(self, ingested_db, watch_backend):
+        """A catalog write should refresh the cached listing without a tool call."""
+        assert list_libraries_with_versions(ingested_db, "docs") == {
+            "testlib": ["latest"]
+        }
+
+        calls = asyncio.run(_watch_and_write(ingested_db, write=True))
+
+        assert calls >= 1
+        cached_token, cached = _metadata_cache[(str(ingested_db), "docs")]
+        assert cached_token[1] == table_version_token(
+            ingested_db, get_catalog_table_name("docs")
+        )
+        assert cached == {"otherlib": ["latest"], "testlib": ["latest"]}
+
+    def test_no_refresh_without_writes(self, ingested_db, watch_backend):
+        """Without writes the watcher should not call on_change."""
+        assert asyncio.run(_watch_and_write(ingested_db, write=False)) == 0
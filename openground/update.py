@@ -1,13 +1,17 @@
-from typing import TypedDict
 import hashlib
 import json
+from collections.abc import Iterable
 from pathlib import Path
-from urllib.parse import urlparse
-from tqdm import tqdm
+from typing import TypedDict
 
-from openground.extract.common import ParsedPage
-from openground.query import delete_urls
+from openground.catalog import refresh_catalog_entry
 from openground.config import DEFAULT_DB_PATH, DEFAULT_TABLE_NAME
+from openground.extract.common import (
+    ParsedPage,
+    iter_raw_pages,
+    update_raw_data_directory,
+)
+from openground.query import delete_urls
 
 
 class PageDiff(TypedDict):
@@ -37,119 +41,135 @@ def compute_content_hash(content: str) -> str:
     return hashlib.sha256(content.encode("utf-8")).hexdigest()
 
 
+def compute_page_hash(page: ParsedPage) -> str:
+    """
+    Compute SHA-256 hash of a page's content and the metadata stored with it.
+
+    Every chunk row copies the page's title, description and last_modified, so
+    a change to any of them has to mark the page as modified.
+
+    Args:
+        page: The page to hash
+
+    Returns:
+        Hexadecimal SHA-256 hash
+    """
+    fields = [
+        page.get("title"),
+        page.get("description"),
+        page.get("last_modified"),
+        page["content"],
+    ]
+    return compute_content_hash(json.dumps(fields))
+
+
 def load_existing_pages_hashes(raw_data_dir: Path) -> dict[str, str]:
     """
     Load existing pages and return {url: hash} dict.
 
-    Only reads url and content fields for efficiency.
-
     Args:
-        raw_data_dir: Directory containing JSON page files
+        raw_data_dir: Raw data directory (JSON page files or a Parquet pages file)
 
     Returns:
-        Dictionary mapping URLs to content hashes
+        Dictionary mapping URLs to page hashes
     """
     hashes: dict[str, str] = {}
     if not raw_data_dir.exists():
         return hashes
 
-    for json_file in raw_data_dir.glob("*.json"):
-        try:
-            with open(json_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                url = data.get("url")
-                content = data.get("content", "")
-                if url:
-                    hashes[url] = compute_content_hash(content)
-        except (json.JSONDecodeError, KeyError):
-            continue
+    for page in iter_raw_pages(raw_data_dir, skip_invalid=True):
+        if page["url"]:
+            hashes[page["url"]] = compute_page_hash(page)
 
     return hashes
 
 
 def compare_pages(
-    extracted_pages: list[ParsedPage], existing_hashes: dict[str, str]
+    extracted_pages: Iterable[ParsedPage], existing_hashes: dict[str, str]
 ) -> PageDiff:
     """
     Compare extracted pages with existing and return diff.
 
+    Pages are consumed one at a time and compared by URL using page hashes;
+    only new and modified pages are kept, unchanged pages are reduced to their
+    URL. If a URL appears more than once, the last page wins.
+
     Args:
-        extracted_pages: List of newly extracted pages
+        extracted_pages: Newly extracted pages; may be a lazy iterator
         existing_hashes: Dict of {url: hash} from existing data
 
     Returns:
         PageDiff with new, deleted, modified, and unchanged pages
     """
-    extracted_dict: dict[str, ParsedPage] = {
-        page["url"]: page for page in extracted_pages
-    }
-    extracted_urls = set(extracted_dict.keys())
-    existing_urls = set(existing_hashes.keys())
-
-    new_urls = extracted_urls - existing_urls
-    deleted_urls = existing_urls - extracted_urls
-    common_urls = extracted_urls & existing_urls
-
-    new_pages = [extracted_dict[url] for url in new_urls]
-
-    modified: list[tuple[str, ParsedPage]] = []
-    unchanged: list[str] = []
-
-    for url in common_urls:
-        page = extracted_dict[url]
-        existing_hash = existing_hashes[url]
-        new_hash = compute_content_hash(page["content"])
-        if existing_hash != new_hash:
-            modified.append((url, page))
+    new_pages: dict[str, ParsedPage] = {}
+    modified: dict[str, ParsedPage] = {}
+    unchanged: dict[str, None] = {}
+
+    for page in extracted_pages:
+        url = page["url"]
+        existing_hash = existing_hashes.get(url)
+        if existing_hash is None:
+            new_pages[url] = page
+            continue
+        modified.pop(url, None)
+        unchanged.pop(url, None)
+        if existing_hash != compute_page_hash(page):
+            modified[url] = page
         else:
-            unchanged.append(url)
+            unchanged[url] = None
+
+    deleted_urls = existing_hashes.keys() - modified.keys() - unchanged.keys()
 
     return PageDiff(
-        new=new_pages,
+        new=list(new_pages.values()),
         deleted=sorted(deleted_urls),
-        modified=modified,
-        unchanged=unchanged,
+        modified=list(modified.items()),
+        unchanged=list(unchanged),
     )
 
 
 def perform_update(
-    extracted_pages: list[ParsedPage],
+    extracted_pages: Iterable[ParsedPage],
     library_name: str,
     version: str,
     raw_data_dir: Path,
     db_path: Path = DEFAULT_DB_PATH,
     table_name: str = DEFAULT_TABLE_NAME,
+    source: str | None = None,
 ) -> UpdateSummary:
     """
     Perform complete update flow.
 
     1. Compute diff between extracted and existing pages
-    2. Delete LanceDB records for modified+deleted pages
-    3. Embed and insert new+modified pages
-    4. Update raw data folder to match
+    2. Delete LanceDB records for deleted pages
+    3. Embed and upsert new+modified pages (stale chunks of modified pages
+       are removed in the same merge)
+    4. Refresh the library catalog
+    5. Update raw data folder to match
 
     Args:
-        extracted_pages: List of newly extracted pages
+        extracted_pages: Newly extracted pages; may be a lazy iterator
         library_name: Name of the library
         version: Version string
         db_path: Path to LanceDB database
         table_name: Name of the LanceDB table
         raw_data_dir: Path to raw data directory for this library/version
+        source: Source URL or path recorded in the library catalog
 
     Returns:
         UpdateSummary with counts of added, deleted, modified, and unchanged pages
     """
-    if not extracted_pages:
-        raise ValueError(
-            "Extraction produced no pages. Please check your source configuration."
-        )
-
     # Load existing hashes and compute diff
     existing_hashes = load_existing_pages_hashes(raw_data_dir)
     diff = compare_pages(extracted_pages, existing_hashes)
 
-    # Delete LanceDB records for modified and deleted pages
-    urls_to_delete = diff["deleted"] + [url for url, _ in diff["modified"]]
+    if not (diff["new"] or diff["modified"] or diff["unchanged"]):
+        raise ValueError(
+            "Extraction produced no pages. Please check your source configuration."
+        )
+
+    # Delete LanceDB records for deleted pages; modified pages are upserted
+    urls_to_delete = diff["deleted"]
     if urls_to_delete:
         batch_size = 1000
         for i in range(0, len(urls_to_delete), batch_size):
@@ -162,7 +182,7 @@ def perform_update(
                 table_name=table_name,
             )
 
-    # Embed and insert new and modified pages
+    # Embed and upsert new and modified pages
     pages_to_ingest = diff["new"] + [page for _, page in diff["modified"]]
     if pages_to_ingest:
         from openground.ingest import ingest_pages_to_lancedb
@@ -171,23 +191,19 @@ def perform_update(
             pages=pages_to_ingest,
             db_path=db_path,
             table_name=table_name,
+            source=source,
+            upsert=True,
         )
+    elif urls_to_delete:
+        refresh_catalog_entry(library_name, version, db_path, table_name, source)
 
     # Update raw data folder
-    # Delete JSON files for deleted URLs
-    for url in diff["deleted"]:
-        slug = urlparse(url).path.strip("/").replace("/", "-") or "home"
-        file_name = raw_data_dir / f"{slug}.json"
-        if file_name.exists():
-            file_name.unlink()
-
-    # Save new and modified pages
-    pages_to_save = pages_to_ingest
-    for page in tqdm(pages_to_save, desc="Updating raw data files", unit="file"):
-        slug = urlparse(page["url"]).path.strip("/").replace("/", "-") or "home"
-        file_name = raw_data_dir / f"{slug}.json"
-        with open(file_name, "w", encoding="utf-8") as f:
-            json.dump(page, f, indent=2)
+    update_raw_data_directory(
+        raw_data_dir=raw_data_dir,
+        new_pages=diff["new"],
+        modified_pages=diff["modified"],
+        deleted_urls=diff["deleted"],
+    )
 
     return UpdateSummary(
         added=len(diff["new"]),
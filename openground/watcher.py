@@ -0,0 +1,84 @@
+"""
+Watch the LanceDB directory for writes from other processes.
+
+Every Lance commit adds a manifest to a table's ``_versions`` directory, so the
+version tokens of the documents, page store and catalog tables change whenever
+e.g. `openground add` writes to the database. The watcher reacts to those
+changes right away, so caches can be refreshed before the next tool call needs
+them. It uses watchfiles (inotify/FSEvents) when installed and the database
+directory exists, and falls back to polling the version tokens otherwise.
+"""
+
+import asyncio
+import sys
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from openground.query import table_version_token, watched_table_names
+
+# Quiet period (ms) watchfiles waits for before reporting a batch of changes
+_WATCH_DEBOUNCE_MS = 500
+
+
+def _snapshot(db_path: Path, table_name: str) -> tuple:
+    """Version tokens of every table the query caches depend on."""
+    return tuple(
+        table_version_token(db_path, name) for name in watched_table_names(table_name)
+    )
+
+
+async def watch_db_path(
+    db_path: Path,
+    table_name: str,
+    on_change: Callable[[], Awaitable[None]],
+    poll_interval: float,
+    stop_event: asyncio.Event | None = None,
+) -> None:
+    """
+    Await on_change each time one of the watched tables gets a new version.
+
+    Runs until cancelled or until stop_event is set. Errors raised by on_change
+    are reported on stderr and do not stop the watcher.
+
+    Args:
+        db_path: Path to LanceDB storage.
+        table_name: Documents table; its page store and catalog are watched too.
+        on_change: Coroutine function called after each change.
+        poll_interval: Seconds between checks when polling.
+        stop_event: Optional event that stops the watcher when set.
+    """
+    stop_event = stop_event or asyncio.Event()
+    last = _snapshot(db_path, table_name)
+
+    async def check() -> None:
+        nonlocal last
+        current = _snapshot(db_path, table_name)
+        if current == last:
+            return
+        last = current
+        # The watcher must outlive any refresh failure
+        try:
+            await on_change()
+        except Exception as e:  # noqa: BLE001
+            sys.stderr.write(
+                f"[warn] Refreshing caches after a db change failed: {e}\n"
+            )
+
+    try:
+        from watchfiles import awatch
+    except ImportError:
+        awatch = None
+
+    if awatch is not None and db_path.is_dir():
+        # Data file writes arrive before the manifest; only new versions count
+        async for _ in awatch(
+            db_path, stop_event=stop_event, debounce=_WATCH_DEBOUNCE_MS
+        ):
+            await check()
+        return
+
+    while not stop_event.is_set():
+        try:
+            await asyncio.wait_for(stop_event.wait(), poll_interval)
+        except asyncio.TimeoutError:
+            await check()